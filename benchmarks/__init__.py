@@ -0,0 +1 @@
+# Paquete Python
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Benchmark del motor de audio: costo de CPU por bloque a cada frecuencia de muestreo
+
+Uso:
+    python -m benchmarks.bench_audio [--blocks N] [--buffer-size N] [--output archivo]
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from ui.audio.audio_thread import AudioThread
+from ui.audio.reverb import ConvolutionReverb
+from ui.utils.constants import AudioConstants
+
+
+def build_scene(thread):
+    """Escena mixta representativa: senos, ruidos, binaural y barrido"""
+    tone_id = 0
+    for i in range(8):
+        thread.add_tone(tone_id, 110.0 * (i + 1), 0.1, 'seno', True, (i % 3 - 1) * 0.5)
+        tone_id += 1
+    for wave_type in ('cuadrada', 'triángulo', 'sierra'):
+        thread.add_tone(tone_id, 220.0, 0.1, wave_type, True, 0.0)
+        tone_id += 1
+    for noise in ('white_noise', 'pink_noise', 'brown_noise', 'grey_noise'):
+        thread.add_tone(tone_id, 0, 0.05, noise, True, 0.0)
+        tone_id += 1
+    thread.add_tone(tone_id, 200.0, 0.1, 'binaural', True, 0.0, {'beat': 10.0})
+    tone_id += 1
+    thread.add_tone(tone_id, 100.0, 0.1, 'barrido', True, 0.0,
+                    {'sweep_start': 100, 'sweep_end': 2000, 'sweep_duration': 5.0,
+                     'sweep_mode': 'log', 'sweep_repeat': True})
+    return tone_id + 1
+
+
+def measure(thread, blocks):
+    """Renderiza `blocks` bloques y retorna los tiempos por bloque en segundos"""
+    frames = thread.buffer_size
+    for _ in range(10):  # Calentamiento: cachés de curvas y envolventes en sostenido
+        thread._generate_audio_buffer(frames)
+
+    timings = np.empty(blocks)
+    for i in range(blocks):
+        start = time.perf_counter()
+        thread._generate_audio_buffer(frames)
+        timings[i] = time.perf_counter() - start
+    return timings
+
+
+def bench_sample_rates(blocks, buffer_size):
+    """Mide la escena a cada frecuencia soportada y retorna filas de resultados"""
+    results = []
+    for rate in AudioConstants.SUPPORTED_SAMPLE_RATES:
+        thread = AudioThread(sample_rate=rate, buffer_size=buffer_size, negotiate=False)
+        tone_count = build_scene(thread)
+        timings = measure(thread, blocks)
+        deadline = buffer_size / rate
+        results.append({
+            'sample_rate': rate,
+            'tones': tone_count,
+            'mean_ms': timings.mean() * 1000,
+            'p99_ms': np.percentile(timings, 99) * 1000,
+            'deadline_ms': deadline * 1000,
+            'dsp_load': timings.mean() / deadline * 100
+        })
+    return results
+
+
+def bench_channels(blocks, buffer_size, channel_counts=(1, 2, 4, 6, 8, 16)):
+    """Mide la escena con distintos canales de salida (la mezcla es un producto matricial)"""
+    results = []
+    for channels in channel_counts:
+        thread = AudioThread(sample_rate=AudioConstants.SAMPLE_RATE, buffer_size=buffer_size,
+                             negotiate=False, channels=channels)
+        build_scene(thread)
+        timings = measure(thread, blocks)
+        results.append({'channels': channels, 'mean_ms': timings.mean() * 1000,
+                        'p99_ms': np.percentile(timings, 99) * 1000})
+    return results
+
+
+def bench_filters(blocks, buffer_size, layer_counts=(1, 2, 4, 8, 16)):
+    """Mide capas de ruido rosa filtradas (paso bajo + campana) por tono"""
+    bands = [{'type': 'lowpass', 'frequency': 2000.0},
+             {'type': 'peak', 'frequency': 500.0, 'q': 1.5, 'gain_db': 4.0}]
+    results = []
+    for layers in layer_counts:
+        row = {'layers': layers}
+        for filtered in (False, True):
+            thread = AudioThread(sample_rate=AudioConstants.SAMPLE_RATE, buffer_size=buffer_size,
+                                 negotiate=False)
+            for tone_id in range(layers):
+                thread.add_tone(tone_id, 0, 0.05, 'pink_noise', True, 0.0)
+                if filtered:
+                    thread.set_tone_filter(tone_id, bands)
+            timings = measure(thread, blocks)
+            row['filtered_ms' if filtered else 'plain_ms'] = timings.mean() * 1000
+        results.append(row)
+    return results
+
+
+def bench_reverb(blocks, buffer_size, durations=(1.0, 4.0), channels=2):
+    """Mide la convolución particionada con respuestas al impulso sintéticas (ruido con caída exponencial)"""
+    rate = AudioConstants.SAMPLE_RATE
+    rng = np.random.default_rng(0)
+    results = []
+    for seconds in durations:
+        frames = int(seconds * rate)
+        decay = np.exp(-6.9 * np.arange(frames) / frames)[:, None]  # -60 dB al final
+        impulse = (rng.standard_normal((frames, channels)) * decay).astype(np.float32)
+        reverb = ConvolutionReverb(impulse, rate, rate, buffer_size, channels, mix=0.3)
+        block = rng.standard_normal((buffer_size, channels)).astype(np.float32) * 0.1
+        for _ in range(10):
+            reverb.process(block)
+        
+        timings = np.empty(blocks)
+        for i in range(blocks):
+            start = time.perf_counter()
+            reverb.process(block)
+            timings[i] = time.perf_counter() - start
+        deadline = buffer_size / rate
+        results.append({'seconds': seconds, 'partitions': reverb.partitions,
+                        'mean_ms': timings.mean() * 1000, 'p99_ms': np.percentile(timings, 99) * 1000,
+                        'deadline_ms': deadline * 1000, 'dsp_load': timings.mean() / deadline * 100})
+    return results
+
+
+def format_reverb_results(results):
+    lines = [f"{'IR s':>5} {'Particiones':>12} {'Media ms':>9} {'p99 ms':>8} {'Límite ms':>10} {'Carga DSP':>10}"]
+    for row in results:
+        lines.append(f"{row['seconds']:>5.1f} {row['partitions']:>12} {row['mean_ms']:>9.3f} "
+                     f"{row['p99_ms']:>8.3f} {row['deadline_ms']:>10.2f} {row['dsp_load']:>9.1f}%")
+    return "\n".join(lines)
+
+
+def bench_hrtf(blocks, buffer_size, position_counts=(1, 4, 32), tones=32):
+    """Mide 32 tonos posicionados con HRTF repartidos en distintas posiciones"""
+    results = []
+    for positions in position_counts:
+        thread = AudioThread(sample_rate=AudioConstants.SAMPLE_RATE, buffer_size=buffer_size,
+                             negotiate=False)
+        thread.set_hrtf_mode(True)
+        azimuths = np.linspace(-180, 180, positions, endpoint=False)
+        for tone_id in range(tones):
+            thread.add_tone(tone_id, 110.0 + 20 * tone_id, 0.02, 'seno', True, 0.0,
+                            {'azimuth': float(azimuths[tone_id % positions])})
+        timings = measure(thread, blocks)
+        results.append({'positions': positions, 'tones': tones, 'mean_ms': timings.mean() * 1000,
+                        'p99_ms': np.percentile(timings, 99) * 1000})
+    return results
+
+
+def format_hrtf_results(results):
+    lines = [f"{'Tonos':>6} {'Posiciones':>11} {'Media ms':>9} {'p99 ms':>8}"]
+    for row in results:
+        lines.append(f"{row['tones']:>6} {row['positions']:>11} {row['mean_ms']:>9.3f} {row['p99_ms']:>8.3f}")
+    return "\n".join(lines)
+
+
+def format_filter_results(results):
+    lines = [f"{'Capas':>6} {'Sin filtro ms':>14} {'Con filtro ms':>14} {'ms/capa':>8}"]
+    for row in results:
+        per_layer = (row['filtered_ms'] - row['plain_ms']) / row['layers']
+        lines.append(f"{row['layers']:>6} {row['plain_ms']:>14.3f} {row['filtered_ms']:>14.3f} "
+                     f"{per_layer:>8.3f}")
+    return "\n".join(lines)
+
+
+def format_channel_results(results):
+    lines = [f"{'Canales':>8} {'Media ms':>9} {'p99 ms':>8}"]
+    for row in results:
+        lines.append(f"{row['channels']:>8} {row['mean_ms']:>9.3f} {row['p99_ms']:>8.3f}")
+    return "\n".join(lines)
+
+
+def format_results(results, buffer_size):
+    lines = [f"Bloque: {buffer_size} muestras",
+             f"{'Frecuencia':>10} {'Tonos':>6} {'Media ms':>9} {'p99 ms':>8} {'Límite ms':>10} {'Carga DSP':>10}"]
+    for row in results:
+        lines.append(f"{row['sample_rate']:>10} {row['tones']:>6} {row['mean_ms']:>9.3f} "
+                     f"{row['p99_ms']:>8.3f} {row['deadline_ms']:>10.2f} {row['dsp_load']:>9.1f}%")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del motor de audio")
+    parser.add_argument('--blocks', type=int, default=500, help="Bloques medidos por escenario")
+    parser.add_argument('--buffer-size', type=int, default=AudioConstants.BUFFER_SIZE)
+    parser.add_argument('--output', help="Guardar también el reporte en un archivo")
+    args = parser.parse_args(argv)
+
+    print("⏱️  Frecuencias de muestreo")
+    report = format_results(bench_sample_rates(args.blocks, args.buffer_size), args.buffer_size)
+    print(report)
+    
+    print("\n⏱️  Canales de salida")
+    channel_report = format_channel_results(bench_channels(args.blocks, args.buffer_size))
+    print(channel_report)
+    report += "\n\n" + channel_report
+
+    print("\n⏱️  Filtros biquad por tono")
+    filter_report = format_filter_results(bench_filters(args.blocks, args.buffer_size))
+    print(filter_report)
+    report += "\n\n" + filter_report
+    
+    print("\n⏱️  Reverberación por convolución (estéreo)")
+    reverb_report = format_reverb_results(bench_reverb(args.blocks, args.buffer_size))
+    print(reverb_report)
+    report += "\n\n" + reverb_report
+    
+    print("\n⏱️  Espacialización HRTF (tonos agrupados por posición)")
+    hrtf_report = format_hrtf_results(bench_hrtf(args.blocks, args.buffer_size))
+    print(hrtf_report)
+    report += "\n\n" + hrtf_report
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
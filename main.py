@@ -34,6 +34,13 @@ def check_dependencies():
         print("⚠️  SoundDevice: No disponible (audio simulado)")
         missing.append("sounddevice")
     
+    try:
+        import scipy.signal
+        print("✅ SciPy: OK")
+    except ImportError:
+        print("⚠️  SciPy: No disponible (filtros de tonos y buses desactivados)")
+        missing.append("scipy")
+    
     return True, missing
 
 def create_directory_structure():
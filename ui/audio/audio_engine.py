@@ -2,10 +2,26 @@
 Motor de audio mejorado - Con generación real de tonos y ruidos
 """
 
-from typing import Dict, Optional
-from PySide6.QtCore import QObject, Signal
+from typing import Dict, Iterable, List, Optional
+from PySide6.QtCore import QObject, QThread, Signal
 from .audio_thread import AudioThread
+from .ring_buffer import AudioRingBuffer
 from ..utils.constants import AudioConstants
+from ..utils.app_config import update_audio_config
+
+class AutotuneWorker(QThread):
+    """Mide los bloques candidatos fuera del hilo del GUI"""
+    
+    measured = Signal(object)  # Resultado de `AudioThread.measure_block_sizes`
+    
+    def __init__(self, audio_thread, parameters):
+        super().__init__()
+        self.audio_thread = audio_thread
+        self.parameters = parameters
+        self.sample_rate = audio_thread.sample_rate
+    
+    def run(self):
+        self.measured.emit(self.audio_thread.measure_block_sizes(self.parameters))
 
 class AudioEngine(QObject):
     """
@@ -18,15 +34,21 @@ class AudioEngine(QObject):
     tone_added = Signal(int)
     tone_removed = Signal(int)
     audio_stats_updated = Signal(dict)  # Para estadísticas en tiempo real
+    event_notified = Signal(str)  # Evento 'notify' planificado que ya ocurrió
+    autotune_finished = Signal(object)  # Resultado del auto-ajuste (dict) o None
     
     def __init__(self):
         super().__init__()
         self.audio_thread = AudioThread()
         self.is_running = False
         self._active_tones: Dict[int, dict] = {}
+        self._groups: Dict[str, dict] = {}
+        self._autotune_worker: Optional[AutotuneWorker] = None
+        self._autotune_persist = True
         
         # Conectar señales del hilo de audio
         self.audio_thread.stats_updated.connect(self.audio_stats_updated.emit)
+        self.audio_thread.event_notified.connect(self.event_notified.emit)
     
     def start_audio(self) -> bool:
         """Inicia el sistema de audio"""
@@ -54,10 +76,11 @@ class AudioEngine(QObject):
         self.audio_stopped.emit()
     
     def add_tone(self, tone_id: int, frequency: float, volume: float, 
-                 wave_type: str = "seno", panning: float = 0.0) -> bool:
+                 wave_type: str = "seno", panning: float = 0.0,
+                 options: Optional[dict] = None) -> bool:
         """Agrega un tono al sistema"""
         if tone_id in self._active_tones:
-            return self.update_tone(tone_id, frequency, volume, wave_type, panning)
+            return self.update_tone(tone_id, frequency, volume, wave_type, panning, options)
         
         if len(self._active_tones) >= AudioConstants.MAX_CONCURRENT_TONES:
             print(f"Máximo de {AudioConstants.MAX_CONCURRENT_TONES} tonos simultáneos")
@@ -68,11 +91,13 @@ class AudioEngine(QObject):
             'volume': volume,
             'wave_type': wave_type,
             'panning': panning,
-            'active': True
+            'active': True,
+            'options': dict(options or {}),
+            'group': None
         }
         
         self._active_tones[tone_id] = tone_config
-        self.audio_thread.add_tone(tone_id, frequency, volume, wave_type, True, panning)
+        self.audio_thread.add_tone(tone_id, frequency, volume, wave_type, True, panning, options)
         self.tone_added.emit(tone_id)
         return True
     
@@ -87,24 +112,30 @@ class AudioEngine(QObject):
         return True
     
     def update_tone(self, tone_id: int, frequency: float, volume: float,
-                   wave_type: str, panning: float) -> bool:
-        """Actualiza un tono existente"""
+                   wave_type: str, panning: float, options: Optional[dict] = None) -> bool:
+        """
+        Actualiza un tono existente.
+        
+        `options` admite parámetros propios del tipo de onda, por ejemplo
+        para 'barrido': sweep_start, sweep_end (Hz), sweep_duration (s),
+        sweep_mode ('linear' o 'log') y sweep_repeat.
+        """
         if tone_id not in self._active_tones:
             return False
         
-        # Limpiar tono anterior si cambió el tipo de onda
-        old_wave_type = self._active_tones[tone_id].get('wave_type', '')
-        if old_wave_type != wave_type:
-            self.audio_thread.clear_tone_audio(tone_id)
-        
+        # El hilo de audio conserva la fase y hace un fundido cruzado
+        # si cambió el tipo de onda, por lo que no es necesario reiniciarlo
         self._active_tones[tone_id].update({
             'frequency': frequency,
             'volume': volume,
             'wave_type': wave_type,
             'panning': panning
         })
+        if options:
+            self._active_tones[tone_id]['options'].update(options)
         
-        self.audio_thread.add_tone(tone_id, frequency, volume, wave_type, True, panning)
+        active = self._active_tones[tone_id]['active']
+        self.audio_thread.add_tone(tone_id, frequency, volume, wave_type, active, panning, options)
         return True
     
     def set_tone_active(self, tone_id: int, active: bool) -> bool:
@@ -116,14 +147,386 @@ class AudioEngine(QObject):
         self.audio_thread.set_tone_active(tone_id, active)
         return True
     
+    def set_tones_active(self, tone_ids: Iterable[int], active: bool) -> None:
+        """Activa/desactiva varios tonos con una sola actualización del hilo de audio"""
+        tone_ids = [tone_id for tone_id in tone_ids if tone_id in self._active_tones]
+        for tone_id in tone_ids:
+            self._active_tones[tone_id]['active'] = active
+        if tone_ids:
+            self.audio_thread.set_tones_active(tone_ids, active)
+    
+    # Grupos (buses de mezcla)
+    def create_group(self, name: str, gain: float = 1.0) -> bool:
+        """Crea un grupo de tonos con su propio bus de mezcla"""
+        if name in self._groups:
+            return False
+        self._groups[name] = {'gain': gain, 'mute': False, 'solo': False, 'filters': [], 'delays': [], 'position': None}
+        self.audio_thread.update_bus(name, gain=gain, mute=False, solo=False)
+        return True
+    
+    def remove_group(self, name: str) -> bool:
+        """Elimina un grupo; sus tonos pasan a sonar directo al maestro"""
+        if self._groups.pop(name, None) is None:
+            return False
+        for tone in self._active_tones.values():
+            if tone['group'] == name:
+                tone['group'] = None
+        self.audio_thread.remove_bus(name)
+        return True
+    
+    def assign_to_group(self, tone_ids: Iterable[int], name: Optional[str]) -> bool:
+        """Asigna tonos a un grupo (None = sin grupo)"""
+        if name is not None and name not in self._groups:
+            self.create_group(name)
+        tone_ids = [tone_id for tone_id in tone_ids if tone_id in self._active_tones]
+        for tone_id in tone_ids:
+            self._active_tones[tone_id]['group'] = name
+        self.audio_thread.set_tone_bus(tone_ids, name)
+        return True
+    
+    def update_group(self, name: str, gain: Optional[float] = None,
+                     mute: Optional[bool] = None, solo: Optional[bool] = None) -> bool:
+        """Cambia ganancia, silencio y/o solo de un grupo en una sola actualización"""
+        group = self._groups.get(name)
+        if group is None:
+            return False
+        for key, value in (('gain', gain), ('mute', mute), ('solo', solo)):
+            if value is not None:
+                group[key] = value
+        self.audio_thread.update_bus(name, gain, mute, solo)
+        return True
+    
+    def set_group_gain(self, name: str, gain: float) -> bool:
+        return self.update_group(name, gain=gain)
+    
+    def set_group_mute(self, name: str, mute: bool) -> bool:
+        return self.update_group(name, mute=mute)
+    
+    def set_group_solo(self, name: str, solo: bool) -> bool:
+        return self.update_group(name, solo=solo)
+    
+    def set_reverb(self, path: Optional[str], mix: Optional[float] = None,
+                   persist: bool = True) -> bool:
+        """
+        Activa la reverberación por convolución del bus maestro con una
+        respuesta al impulso WAV (None la desactiva).
+        """
+        try:
+            reverb = self.audio_thread.set_reverb(path, mix)
+        except (OSError, ValueError) as e:
+            print(f"Error cargando respuesta al impulso: {e}")
+            return False
+        if persist:
+            update_audio_config(reverb_ir=path and str(path),
+                                reverb_mix=reverb.mix if reverb else AudioConstants.REVERB_MIX)
+        return True
+    
+    def set_reverb_mix(self, mix: float, persist: bool = True) -> None:
+        """Proporción de señal reverberada (0-1)"""
+        mix = max(0.0, min(1.0, float(mix)))
+        self.audio_thread.set_reverb_mix(mix)
+        if persist:
+            update_audio_config(reverb_mix=mix)
+    
+    def set_subsonic_frequency(self, frequency: float, persist: bool = True) -> None:
+        """Corte del paso alto subsónico del maestro en Hz (0 lo desactiva; la continua se bloquea siempre)"""
+        frequency = max(0.0, float(frequency))
+        self.audio_thread.set_subsonic_frequency(frequency)
+        if persist:
+            update_audio_config(subsonic_frequency=frequency)
+    
+    def set_hrtf_mode(self, enabled: bool, hrir_path: Optional[str] = None,
+                      persist: bool = True) -> bool:
+        """
+        Espacialización binaural para auriculares: los tonos y grupos con
+        posición se convolucionan con HRIR (directorio de WAV o modelo
+        sintético de cabeza esférica si `hrir_path` es None).
+        """
+        try:
+            self.audio_thread.set_hrtf_mode(enabled, hrir_path)
+        except (OSError, ValueError) as e:
+            print(f"Error cargando HRIR: {e}")
+            return False
+        if persist:
+            update_audio_config(hrtf_mode=bool(enabled), hrir_path=hrir_path and str(hrir_path))
+        return True
+    
+    def set_tone_position(self, tone_id: int, azimuth: Optional[float],
+                          elevation: float = 0.0) -> bool:
+        """Posición 3D de un tono en grados (acimut negativo = izquierda; None = sin posición)"""
+        if tone_id not in self._active_tones:
+            return False
+        config = self._active_tones[tone_id]
+        return self.update_tone(tone_id, config['frequency'], config['volume'],
+                                config['wave_type'], config['panning'],
+                                {'azimuth': azimuth, 'elevation': elevation})
+    
+    def set_group_position(self, name: str, azimuth: Optional[float],
+                           elevation: float = 0.0) -> bool:
+        """Posición compartida por los tonos del grupo que no tienen una propia"""
+        if name not in self._groups:
+            return False
+        self._groups[name]['position'] = None if azimuth is None else (azimuth, elevation)
+        self.audio_thread.set_bus_position(name, azimuth, elevation)
+        return True
+    
+    def set_tone_delay(self, tone_id: int, effects: Optional[List[dict]]) -> bool:
+        """
+        Efectos de retardo de un tono, en cadena: {'type': 'haas', 'time', 'channel', 'mix'},
+        {'type': 'chorus', 'time', 'depth', 'rate', 'mix'} o
+        {'type': 'echo', 'time', 'feedback', 'mix'} (tiempos en segundos); None los quita.
+        """
+        if tone_id not in self._active_tones:
+            return False
+        try:
+            self.audio_thread.set_tone_delay(tone_id, effects)
+        except ValueError as e:
+            print(f"Error configurando retardo: {e}")
+            return False
+        self._active_tones[tone_id]['delays'] = list(effects or [])
+        return True
+    
+    def set_group_delay(self, name: str, effects: Optional[List[dict]]) -> bool:
+        """Efectos de retardo sobre la submezcla de un grupo (ver set_tone_delay)"""
+        if name not in self._groups:
+            return False
+        try:
+            self.audio_thread.set_bus_delay(name, effects)
+        except ValueError as e:
+            print(f"Error configurando retardo: {e}")
+            return False
+        self._groups[name]['delays'] = list(effects or [])
+        return True
+    
+    def set_group_filter(self, name: str, bands: Optional[List[dict]]) -> bool:
+        """Filtros sobre la submezcla de un grupo (ver set_tone_filter)"""
+        if name not in self._groups:
+            return False
+        try:
+            self.audio_thread.set_bus_filter(name, bands)
+        except ValueError as e:
+            print(f"Error configurando filtro: {e}")
+            return False
+        self._groups[name]['filters'] = list(bands or [])
+        return True
+    
+    def set_group_active(self, name: str, active: bool) -> None:
+        """Activa/desactiva todos los tonos de un grupo"""
+        self.set_tones_active(self.get_group_tones(name), active)
+    
+    def get_group_tones(self, name: Optional[str]) -> List[int]:
+        """Tonos asignados a un grupo"""
+        return [tone_id for tone_id, tone in self._active_tones.items() if tone['group'] == name]
+    
+    def get_groups(self) -> Dict[str, dict]:
+        """Configuración de los grupos"""
+        return {name: dict(group) for name, group in self._groups.items()}
+    
+    def set_tone_filter(self, tone_id: int, bands: Optional[List[dict]]) -> bool:
+        """
+        Configura la etapa de filtros de un tono.
+        
+        `bands` es una lista de biquads en cascada, cada uno
+        {'type': 'lowpass'|'highpass'|'bandpass'|'notch'|'peak'|'lowshelf'|'highshelf',
+        'frequency': Hz, 'q': factor Q, 'gain_db': dB (peak/shelf)}; None la quita.
+        """
+        if tone_id not in self._active_tones:
+            return False
+        try:
+            self.audio_thread.set_tone_filter(tone_id, bands)
+        except ValueError as e:
+            print(f"Error configurando filtro: {e}")
+            return False
+        self._active_tones[tone_id]['filters'] = list(bands or [])
+        return True
+    
+    def set_tone_envelope(self, tone_id: int, attack: Optional[float] = None,
+                          decay: Optional[float] = None, sustain: Optional[float] = None,
+                          release: Optional[float] = None) -> bool:
+        """Configura la envolvente ADSR (segundos y nivel de sostenido) de un tono"""
+        if tone_id not in self._active_tones:
+            return False
+        
+        self.audio_thread.set_tone_envelope(tone_id, attack, decay, sustain, release)
+        return True
+    
+    def add_modulation(self, source_type: str, source_id, target_tone_id: int,
+                       destination: str, depth: float) -> Optional[int]:
+        """
+        Enruta un tono o LFO ('tone'/'lfo') hacia la amplitud, frecuencia o
+        panorama ('amplitude'/'frequency'/'pan') de otro tono.
+        
+        Retorna el id de la ruta o None si no es válida (p. ej. un ciclo).
+        """
+        if target_tone_id not in self._active_tones:
+            return None
+        
+        try:
+            return self.audio_thread.add_modulation((source_type, source_id), target_tone_id,
+                                                    destination, depth)
+        except ValueError as e:
+            print(f"Modulación no válida: {e}")
+            return None
+    
+    def remove_modulation(self, route_id: int) -> bool:
+        """Elimina una ruta de modulación"""
+        return self.audio_thread.remove_modulation(route_id)
+    
+    def set_modulation_depth(self, route_id: int, depth: float) -> bool:
+        """Cambia la profundidad de una ruta de modulación"""
+        return self.audio_thread.set_modulation_depth(route_id, depth)
+    
+    def set_lfo(self, lfo_id, rate: float, shape: str = "seno") -> bool:
+        """Crea o actualiza un LFO dedicado (frecuencia en Hz)"""
+        try:
+            self.audio_thread.set_lfo(lfo_id, rate, shape)
+            return True
+        except ValueError as e:
+            print(f"LFO no válido: {e}")
+            return False
+    
+    def remove_lfo(self, lfo_id) -> bool:
+        """Elimina un LFO y las rutas que lo usan"""
+        return self.audio_thread.remove_lfo(lfo_id)
+    
+    def schedule_event(self, delay: float, action: str, **params) -> int:
+        """
+        Planifica una acción del motor con precisión de muestra.
+        
+        El evento se ejecuta en el hilo de audio exactamente `delay` segundos
+        (en tiempo de muestra) después de la llamada, sin depender del GUI.
+        """
+        return self.audio_thread.schedule_event(delay, action, **params)
+    
+    def cancel_scheduled_event(self, event_id: int) -> bool:
+        """Cancela un evento planificado"""
+        return self.audio_thread.cancel_event(event_id)
+    
+    def set_noise_texture_mode(self, enabled: bool, prewarm: bool = False) -> None:
+        """Activa/desactiva el banco compartido de texturas de ruido"""
+        self.audio_thread.set_noise_texture_mode(enabled, prewarm)
+    
     def set_master_volume(self, volume: float) -> None:
         """Establece el volumen maestro"""
         self.audio_thread.set_master_volume(volume)
     
+    def open_recording_tap(self, seconds: Optional[float] = None) -> AudioRingBuffer:
+        """Búfer que recibe, sin huecos, cada bloque enviado a la salida"""
+        return self.audio_thread.open_recording_tap(seconds)
+    
+    def close_recording_tap(self) -> Optional[AudioRingBuffer]:
+        """Deja de alimentar la toma de grabación"""
+        return self.audio_thread.close_recording_tap()
+    
+    def set_sample_rate(self, sample_rate, persist: bool = True) -> int:
+        """
+        Cambia la frecuencia de muestreo (Hz o 'auto') y retorna la efectiva.
+        
+        Con `persist` la elección se guarda en la configuración.
+        """
+        effective_rate = self.audio_thread.set_sample_rate(sample_rate)
+        if persist:
+            update_audio_config(sample_rate=sample_rate)
+        return effective_rate
+    
+    def get_sample_rate(self) -> int:
+        """Retorna la frecuencia de muestreo efectiva"""
+        return self.audio_thread.sample_rate
+    
+    def set_buffer_size(self, buffer_size: int, persist: bool = True) -> None:
+        """Cambia el tamaño de bloque del stream"""
+        self.audio_thread.set_buffer_size(buffer_size)
+        if persist:
+            update_audio_config(buffer_size=int(buffer_size))
+    
+    def set_output_channels(self, channels, layout: Optional[str] = None,
+                            persist: bool = True) -> int:
+        """
+        Cambia los canales de salida (número o 'auto') y la disposición de
+        altavoces; retorna los canales efectivos.
+        """
+        effective = self.audio_thread.set_output_channels(channels, layout)
+        if persist:
+            update_audio_config(channels=channels, speaker_layout=layout)
+        return effective
+    
+    def set_realtime_mode(self, enabled: bool, cpus: Optional[list] = None,
+                          persist: bool = True) -> dict:
+        """
+        Activa el modo tiempo real y retorna el informe de ajustes
+        ({ajuste: {'applied': bool, 'detail': str}}).
+        """
+        report = self.audio_thread.set_realtime_mode(enabled, cpus)
+        if persist:
+            update_audio_config(realtime_mode=enabled, realtime_cpus=cpus)
+        return report
+    
+    def get_realtime_report(self) -> dict:
+        """Ajustes de tiempo real que tuvieron efecto"""
+        return dict(self.audio_thread.realtime_report)
+    
+    def set_latency_profile(self, profile_name: str, persist: bool = True) -> None:
+        """Aplica un perfil de latencia ('live', 'balanced', 'power_saver')"""
+        profile = self.audio_thread.set_latency_profile(profile_name)
+        if persist:
+            update_audio_config(buffer_size=profile['buffer_size'], latency=profile['latency'],
+                                latency_profile=profile_name)
+    
+    def autotune_block_size(self, persist: bool = True) -> bool:
+        """
+        Mide la escena actual en un hilo aparte, aplica el bloque elegido y
+        lo guarda en la configuración.
+        
+        El resultado llega por `autotune_finished` (None si no hay tonos que
+        medir). Retorna False si ya hay una medición en curso.
+        """
+        if self.is_autotuning():
+            return False
+        
+        parameters = self.audio_thread.capture_autotune_scene()
+        if parameters is None:
+            print("⚠️  Auto-ajuste: agregue tonos para medir la escena")
+            self.autotune_finished.emit(None)
+            return True
+        
+        self._autotune_persist = persist
+        self._autotune_worker = AutotuneWorker(self.audio_thread, parameters)
+        self._autotune_worker.measured.connect(self._on_autotune_measured)
+        self._autotune_worker.start()
+        return True
+    
+    def is_autotuning(self) -> bool:
+        """Indica si hay una medición de auto-ajuste en curso"""
+        return self._autotune_worker is not None
+    
+    def wait_autotune(self) -> None:
+        """Espera a que termine la medición en curso (p. ej. al cerrar)"""
+        if self._autotune_worker is not None:
+            self._autotune_worker.wait()
+    
+    def _on_autotune_measured(self, result: dict) -> None:
+        """Aplica el bloque medido (en el hilo del GUI)"""
+        worker, self._autotune_worker = self._autotune_worker, None
+        worker.wait()
+        if worker.sample_rate != self.audio_thread.sample_rate:
+            # Los plazos medidos ya no valen para la frecuencia actual: medir otra vez
+            self.autotune_block_size(self._autotune_persist)
+            return
+        
+        self.audio_thread.set_buffer_size(result['buffer_size'], result['latency'])
+        if self._autotune_persist:
+            update_audio_config(buffer_size=result['buffer_size'], latency=result['latency'],
+                                latency_profile='auto')
+        self.autotune_finished.emit(result)
+    
     def get_active_tone_count(self) -> int:
         """Retorna el número de tonos activos"""
         return sum(1 for tone in self._active_tones.values() if tone['active'])
     
+    def is_idle(self) -> bool:
+        """Indica si no suena ningún tono (reconfigurar el stream no se oye)"""
+        return not self.is_running or self.get_active_tone_count() == 0
+    
     def get_total_tone_count(self) -> int:
         """Retorna el número total de tonos"""
         return len(self._active_tones)
@@ -136,7 +539,8 @@ class AudioEngine(QObject):
             'total_tones': len(self._active_tones),
             'active_tones': len(active_tones),
             'is_running': self.is_running,
-            'sample_rate': AudioConstants.SAMPLE_RATE,
+            'sample_rate': self.audio_thread.sample_rate,
+            'buffer_size': self.audio_thread.buffer_size,
             'max_tones': AudioConstants.MAX_CONCURRENT_TONES,
             'wave_types_used': list(set(tone['wave_type'] for tone in active_tones)),
             'frequency_range': {
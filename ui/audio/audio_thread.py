@@ -4,9 +4,28 @@ Hilo de audio mejorado con generación real de tonos y ruidos
 
 from PySide6.QtCore import QThread, QMutex, Signal, QTimer
 import numpy as np
+import copy
 import time
 import threading
 
+from .delay import DelayChain
+from .envelope import ADSREnvelope
+from .filters import FilterChain, DCBlocker, SubsonicFilter
+from .governor import OverloadGovernor
+from .hrtf import HRIRSet, BinauralSpatializer
+from .modulation import ModulationMatrix
+from .noise import (NOISE_COLORS, CUSTOM_NOISE, SpectralNoiseGenerator, DecimatedNoise,
+                    is_noise_type, clear_shaping_cache)
+from .noise_bank import NoiseTextureBank, NoiseTextureReader
+from . import realtime
+from .reverb import ConvolutionReverb, load_impulse_response
+from .ring_buffer import AudioRingBuffer
+from .scheduler import EventScheduler
+from .spatial import MixMatrix, create_panner
+from .wavetable import has_wavetable, render_wavetable
+from ..utils.constants import AudioConstants, FileConstants
+from ..utils.app_config import get_audio_config
+
 try:
     import sounddevice as sd
     SOUNDDEVICE_AVAILABLE = True
@@ -18,64 +37,232 @@ class AudioThread(QThread):
     """Hilo de audio con generación real de sonidos"""
     
     stats_updated = Signal(dict)
+    event_notified = Signal(str)  # Nombre de un evento 'notify' ya ejecutado
+    
+    # Opciones de tono que definen un barrido de frecuencia
+    SWEEP_OPTIONS = ('sweep_start', 'sweep_end', 'sweep_duration', 'sweep_mode', 'sweep_repeat')
     
-    def __init__(self):
+    def __init__(self, sample_rate=None, buffer_size=None, negotiate=True, channels=None,
+                 audio_config=None):
         super().__init__()
         self.mutex = QMutex()
         self.tones = {}
         self.running = False
-        self.sample_rate = 44100
-        self.buffer_size = 512
         self.master_volume = 0.5
         self.audio_stream = None
         
+        # Las copias offline reciben la configuración ya leída (sin acceso a disco)
+        if audio_config is None:
+            audio_config = get_audio_config()
+        self.audio_config = audio_config
+        
+        # Canales de salida y paneo multicanal (VBAP con más de dos altavoces)
+        requested_channels = channels or audio_config.get('channels', 2)
+        self.channels = (self._negotiate_channels(requested_channels) if negotiate
+                         else int(requested_channels))
+        self.speaker_layout = audio_config.get('speaker_layout')
+        self.panner = create_panner(self.channels, self.speaker_layout)
+        self.mix_matrix = MixMatrix(self.panner)
+        
+        # Frecuencia de muestreo y bloque: argumentos, configuración o dispositivo
+        requested_rate = sample_rate or audio_config.get('sample_rate', AudioConstants.SAMPLE_RATE)
+        self.sample_rate = self._negotiate_sample_rate(requested_rate) if negotiate else int(requested_rate)
+        self.buffer_size = int(buffer_size or audio_config.get('buffer_size', AudioConstants.BUFFER_SIZE))
+        self.latency = audio_config.get('latency', 'high')
+        
+        # Modo tiempo real: los ajustes del hilo se aplican desde el callback
+        self.realtime_mode = bool(audio_config.get('realtime_mode', False))
+        self.realtime_cpus = audio_config.get('realtime_cpus')
+        self.realtime_report = {}
+        self._realtime_thread_action = None
+        self._realtime_thread_state = None
+        self._realtime_gc_state = None
+        self._realtime_memory_locked = False
+        
+        # Duración del fundido cruzado al cambiar el tipo de onda
+        self.crossfade_frames = max(1, int(AudioConstants.WAVE_CROSSFADE_TIME * self.sample_rate))
+        
+        # Reloj de muestras y eventos planificados con precisión de muestra
+        self.sample_clock = 0
+        self.scheduler = EventScheduler()
+        self._event_handlers = {
+            'set_tone_active': self._apply_tone_active,
+            'update_tone': self._apply_tone_update,
+            'remove_tone': self._apply_remove_tone,
+            'set_master_volume': self._apply_master_volume,
+            'stop_all_tones': self._apply_stop_all_tones,
+            'set_tones_active': self._apply_tones_active,
+            'update_bus': self._apply_bus_update,
+            'notify': self._apply_notify
+        }
+        self._notices = []  # Avisos vencidos, se entregan desde `update_stats`
+        
+        # Buses de mezcla: cada tono suena en uno (o directo, bus None) y cada
+        # bus aplica ganancia, silencio y solo dentro de la mezcla vectorizada
+        self.buses = {}
+        self._bus_levels = {}
+        self._bus_filters = {}
+        self._bus_delays = {}
+        self._bus_inserts = {}
+        
+        # Limpieza del maestro: continua y subsónicos fuera antes del limitador
+        self.dc_blocker = DCBlocker(self.sample_rate, self.channels, AudioConstants.DC_BLOCKER_CUTOFF)
+        self.subsonic_frequency = float(audio_config.get('subsonic_frequency',
+                                                         AudioConstants.SUBSONIC_FREQUENCY))
+        self.subsonic = self._create_subsonic_filter()
+        self._master_filters_idle = True
+        
+        # Reverberación por convolución en el bus maestro (None = desactivada)
+        self.reverb = None
+        
+        # Espacialización HRTF de los tonos posicionados (None = paneo por altavoces)
+        self.spatializer = None
+        self._bus_positions = {}
+        
+        # Matriz de modulación y su plan compilado
+        self.modulation = ModulationMatrix()
+        self.modulation_plan = self.modulation.compile([])
+        self._modulation_signals = np.zeros((0, self.buffer_size))
+        
+        # Gobernador de sobrecarga: degrada la calidad según la carga medida
+        self.governor = OverloadGovernor(**AudioConstants.OVERLOAD_GOVERNOR)
+        
+        # Tonos silenciosos omitidos desde la última estadística
+        self._skipped_tones = set()
+        self._zero_buffers = {}
+        
         # Para estadísticas
         self.stats_timer = QTimer()
         self.stats_timer.timeout.connect(self.update_stats)
         
-        # Buffer de audio
-        self.current_buffer = np.zeros((self.buffer_size, 2), dtype=np.float32)
+        # Toma de grabación: el callback copia cada bloque renderizado (None = sin grabar)
+        self.recording_tap = None
         
-        # Generadores de ruido
-        self.noise_generators = {
-            'white_noise': self._generate_white_noise,
-            'pink_noise': self._generate_pink_noise,
-            'brown_noise': self._generate_brown_noise
-        }
+        # Colores de ruido disponibles (pendiente 1/f^α); cada tono tiene su generador
+        self.noise_colors = dict(NOISE_COLORS)
+        
+        # Modo textura: los ruidos leen de un banco pregenerado compartido
+        self.noise_bank = None
+        self.noise_texture_mode = False
+        if AudioConstants.NOISE_TEXTURE_MODE and negotiate:
+            # Solo el motor real precalienta; las copias offline comparten su banco
+            self.set_noise_texture_mode(True, prewarm=True)
+        
+        if audio_config.get('reverb_ir') and negotiate:
+            try:
+                self.set_reverb(audio_config['reverb_ir'],
+                                audio_config.get('reverb_mix', AudioConstants.REVERB_MIX))
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Reverberación no cargada: {e}")
+        
+        if audio_config.get('hrtf_mode') and negotiate:
+            try:
+                self.set_hrtf_mode(True, audio_config.get('hrir_path'))
+            except (OSError, ValueError) as e:
+                print(f"⚠️  HRIR no cargadas: {e}")
+    
+    def _negotiate_sample_rate(self, requested):
+        """Elige la frecuencia pedida si el dispositivo la soporta ('auto' = la del dispositivo)"""
+        if not SOUNDDEVICE_AVAILABLE:
+            return AudioConstants.SAMPLE_RATE if requested == 'auto' else int(requested)
+        
+        try:
+            device_rate = int(sd.query_devices(kind='output')['default_samplerate'])
+        except Exception:
+            device_rate = AudioConstants.SAMPLE_RATE
+        
+        if requested == 'auto':
+            return device_rate
+        
+        try:
+            sd.check_output_settings(samplerate=int(requested), channels=self.channels, dtype='float32')
+            return int(requested)
+        except Exception as e:
+            print(f"⚠️  {requested} Hz no soportado por el dispositivo ({e}), usando {device_rate} Hz")
+            return device_rate
+    
+    def _negotiate_channels(self, requested):
+        """Limita los canales a los del dispositivo ('auto' = todos los disponibles)"""
+        if not SOUNDDEVICE_AVAILABLE:
+            return 2 if requested == 'auto' else int(requested)
+        
+        try:
+            device_channels = int(sd.query_devices(kind='output')['max_output_channels'])
+        except Exception:
+            device_channels = 2
+        if requested == 'auto':
+            return max(1, device_channels)
+        if int(requested) > device_channels:
+            print(f"⚠️  {requested} canales no soportados por el dispositivo, usando {device_channels}")
+            return max(1, device_channels)
+        return int(requested)
+    
+    def _open_stream(self):
+        """Abre el stream de salida con la frecuencia y el bloque actuales"""
+        if not SOUNDDEVICE_AVAILABLE:
+            print("🔊 Modo simulado - SoundDevice no disponible")
+            return
+
+        if self.realtime_mode:
+            # Cada stream trae su propio hilo de callback: el estado guardado era
+            # del hilo anterior (ya terminado) y el nuevo debe elevarse otra vez
+            self._realtime_thread_state = None
+            self._realtime_thread_action = 'promote'
+            for key in ('nice', 'affinity'):
+                self.realtime_report.pop(key, None)
+            self.realtime_report['scheduler'] = {'applied': False, 'detail': "pendiente del primer callback"}
+
+        # Configurar stream de audio real
+        def audio_callback(outdata, frames, time, status):
+            if status:
+                print(f"Audio status: {status}")
+            
+            if self._realtime_thread_action:
+                self._apply_realtime_thread()
+            
+            self.mutex.lock()
+            try:
+                # Generar buffer de audio
+                buffer = self._render_block(frames, underflow=bool(status.output_underflow))
+                outdata[:] = buffer
+            finally:
+                self.mutex.unlock()
+            
+            # Fuera del mutex: el búfer de grabación no usa bloqueos
+            tap = self.recording_tap
+            if tap is not None:
+                tap.push(outdata)
         
-        # Estado para ruido rosa y marrón
-        self.pink_noise_state = np.zeros(7)
-        self.brown_noise_state = 0.0
+        self.audio_stream = sd.OutputStream(
+            samplerate=self.sample_rate,
+            channels=self.channels,
+            callback=audio_callback,
+            blocksize=self.buffer_size,
+            latency=self.latency,
+            dtype='float32'
+        )
+        
+        self.audio_stream.start()
+        print(f"🔊 Stream de audio real iniciado ({self.sample_rate} Hz, bloque {self.buffer_size}, "
+              f"latencia {self.audio_stream.latency * 1000:.1f} ms)")
+    
+    def _close_stream(self):
+        """Cierra el stream de salida (sin tomar el mutex: el callback lo usa)"""
+        if self.audio_stream:
+            try:
+                self.audio_stream.stop()
+                self.audio_stream.close()
+                print("🔇 Stream de audio detenido")
+            except Exception as e:
+                print(f"Error deteniendo stream: {e}")
+            self.audio_stream = None
     
     def start_audio(self):
         """Inicia el sistema de audio"""
         try:
-            if SOUNDDEVICE_AVAILABLE:
-                # Configurar stream de audio real
-                def audio_callback(outdata, frames, time, status):
-                    if status:
-                        print(f"Audio status: {status}")
-                    
-                    self.mutex.lock()
-                    try:
-                        # Generar buffer de audio
-                        buffer = self._generate_audio_buffer(frames)
-                        outdata[:] = buffer
-                    finally:
-                        self.mutex.unlock()
-                
-                self.audio_stream = sd.OutputStream(
-                    samplerate=self.sample_rate,
-                    channels=2,
-                    callback=audio_callback,
-                    blocksize=self.buffer_size,
-                    dtype='float32'
-                )
-                
-                self.audio_stream.start()
-                print("🔊 Stream de audio real iniciado")
-            else:
-                print("🔊 Modo simulado - SoundDevice no disponible")
+            if self.realtime_mode:
+                self._enable_realtime()
+            self._open_stream()
             
             self.running = True
             self.stats_timer.start(100)  # Actualizar estadísticas cada 100ms
@@ -90,46 +277,494 @@ class AudioThread(QThread):
         """Detiene el sistema de audio"""
         self.running = False
         self.stats_timer.stop()
-        
-        if self.audio_stream:
-            try:
-                self.audio_stream.stop()
-                self.audio_stream.close()
-                print("🔇 Stream de audio detenido")
-            except Exception as e:
-                print(f"Error deteniendo stream: {e}")
+        self._close_stream()
+        self._disable_realtime()
         
         self.tones.clear()
+        self.scheduler.clear()
+        self._notices = []
+        self.governor.reset()
+        if self.reverb is not None:
+            self.reverb.reset()
+        if self.spatializer is not None:
+            self.spatializer.reset()
+        self._compile_modulation()
         self.wait()  # Esperar a que termine el hilo
         print("🔇 Audio thread detenido")
     
-    def add_tone(self, tone_id, frequency, volume, wave_type, active, panning):
-        """Agrega o actualiza un tono"""
+    def open_recording_tap(self, seconds=None):
+        """
+        Crea la toma de grabación: un búfer circular sin bloqueos que recibe
+        cada bloque entregado a la salida. Retorna el búfer para el consumidor.
+        """
+        seconds = seconds or AudioConstants.RECORDING_TAP_SECONDS
+        tap = AudioRingBuffer(int(seconds * self.sample_rate), self.channels, self.sample_rate)
+        self.recording_tap = tap
+        return tap
+    
+    def close_recording_tap(self):
+        """Deja de alimentar la toma de grabación y la retorna"""
+        tap, self.recording_tap = self.recording_tap, None
+        return tap
+    
+    def set_sample_rate(self, sample_rate, negotiate=True):
+        """
+        Cambia la frecuencia de muestreo en caliente.
+        
+        Reabre el stream y reconstruye todo lo que depende de la frecuencia
+        (fundidos, envolventes, curvas y texturas de ruido, eventos y barridos
+        pendientes). Retorna la frecuencia efectiva.
+        """
+        new_rate = self._negotiate_sample_rate(sample_rate) if negotiate else int(sample_rate)
+        if new_rate == self.sample_rate:
+            return new_rate
+        
+        stream_was_open = self.audio_stream is not None
+        self._close_stream()
+        
         self.mutex.lock()
         try:
-            self.tones[tone_id] = {
-                'frequency': frequency,
-                'volume': volume,
-                'wave_type': wave_type.lower(),
-                'active': active,
-                'panning': panning,
-                'phase': 0.0,
-                'time': 0.0
-            }
+            ratio = new_rate / self.sample_rate
+            self.sample_rate = new_rate
+            self.scheduler.rescale(self.sample_clock, ratio)
+            for tone in self.tones.values():
+                tone['sweep_pos'] = int(round(tone['sweep_pos'] * ratio))
+            self._rebuild_rate_tables()
+        finally:
+            self.mutex.unlock()
+        
+        if stream_was_open:
+            self._open_stream()
+        return new_rate
+    
+    def set_buffer_size(self, buffer_size, latency=None):
+        """Cambia el tamaño de bloque (y opcionalmente la latencia) del stream"""
+        buffer_size = int(buffer_size)
+        latency = self.latency if latency is None else latency
+        if buffer_size == self.buffer_size and latency == self.latency:
+            return
+        
+        stream_was_open = self.audio_stream is not None
+        self._close_stream()
+        self.mutex.lock()
+        try:
+            self.buffer_size = buffer_size
+            self.latency = latency
+            if self.reverb is not None:
+                self.reverb.configure(block_size=buffer_size)
+        finally:
+            self.mutex.unlock()
+        if stream_was_open:
+            self._open_stream()
+    
+    def set_output_channels(self, channels, layout=None, negotiate=True):
+        """
+        Cambia el número de canales de salida y la disposición de altavoces
+        (nombre de AudioConstants.SPEAKER_LAYOUTS o lista de acimuts).
+        Retorna los canales efectivos.
+        """
+        channels = self._negotiate_channels(channels) if negotiate else int(channels)
+        
+        stream_was_open = self.audio_stream is not None
+        self._close_stream()
+        self.mutex.lock()
+        try:
+            self.channels = channels
+            self.speaker_layout = layout
+            self.panner = create_panner(channels, layout)
+            self.mix_matrix = MixMatrix(self.panner)
+            self._zero_buffers.clear()
+            if self.reverb is not None:
+                self.reverb.configure(channels=channels)
+        finally:
+            self.mutex.unlock()
+        if stream_was_open:
+            self._open_stream()
+        return channels
+    
+    def set_realtime_mode(self, enabled, cpus=None):
+        """
+        Activa o desactiva el modo tiempo real.
+        
+        Los ajustes del proceso (memoria, GC) se aplican de inmediato si el
+        audio está en marcha; los del hilo de render (planificación,
+        afinidad) en el próximo callback. Retorna el informe actual.
+        """
+        self.realtime_cpus = cpus
+        if enabled == self.realtime_mode and not (enabled and self.running):
+            return self.realtime_report
+        
+        self.realtime_mode = enabled
+        if self.running:
+            if enabled:
+                self._disable_realtime()
+                self._enable_realtime()
+            else:
+                self._disable_realtime()
+        return self.realtime_report
+    
+    def _enable_realtime(self):
+        """Aplica los ajustes de proceso y programa los del hilo de render"""
+        report = {}
+        if AudioConstants.REALTIME_LOCK_MEMORY:
+            report['mlockall'] = realtime.lock_process_memory()
+            self._realtime_memory_locked = report['mlockall']['applied']
+        gc_report, self._realtime_gc_state = realtime.tune_garbage_collector(
+            AudioConstants.REALTIME_GC_THRESHOLDS)
+        report.update(gc_report)
+        
+        if SOUNDDEVICE_AVAILABLE:
+            self._realtime_thread_action = 'promote'
+            report['scheduler'] = {'applied': False, 'detail': "pendiente del primer callback"}
+        else:
+            report['scheduler'] = {'applied': False, 'detail': "sin stream de audio (modo simulado)"}
+        
+        self.realtime_report = report
+        print("⚡ Modo tiempo real:")
+        print(realtime.format_report(report))
+    
+    def _disable_realtime(self):
+        """Revierte los ajustes de proceso; los del hilo se revierten en su callback"""
+        if self._realtime_gc_state is not None:
+            realtime.restore_garbage_collector(self._realtime_gc_state)
+            self._realtime_gc_state = None
+        if self._realtime_memory_locked:
+            realtime.unlock_process_memory()
+            self._realtime_memory_locked = False
+        
+        if self._realtime_thread_state is not None and self.audio_stream is not None:
+            self._realtime_thread_action = 'restore'
+        else:
+            # El hilo del callback termina con el stream
+            self._realtime_thread_action = None
+            self._realtime_thread_state = None
+        self.realtime_report = {}
+    
+    def _apply_realtime_thread(self):
+        """Eleva o restaura el hilo del callback (se ejecuta en ese hilo)"""
+        action, self._realtime_thread_action = self._realtime_thread_action, None
+        if action == 'restore':
+            realtime.restore_current_thread(self._realtime_thread_state)
+            self._realtime_thread_state = None
+            return
+        
+        if self._realtime_thread_state is not None:
+            # Reaplicación (p. ej. otros núcleos): partir del estado original
+            realtime.restore_current_thread(self._realtime_thread_state)
+        report, self._realtime_thread_state = realtime.promote_current_thread(
+            AudioConstants.REALTIME_PRIORITY, AudioConstants.REALTIME_NICE, self.realtime_cpus)
+        self.realtime_report.pop('scheduler', None)
+        self.realtime_report.update(report)
+        print("⚡ Hilo de audio:")
+        print(realtime.format_report(report))
+    
+    def set_latency_profile(self, profile_name):
+        """Aplica un perfil de AudioConstants.LATENCY_PROFILES y retorna su configuración"""
+        profile = AudioConstants.LATENCY_PROFILES[profile_name]
+        self.set_buffer_size(profile['buffer_size'], profile['latency'])
+        return profile
+    
+    def autotune_block_size(self, candidates=None):
+        """
+        Elige el bloque más pequeño que cumple su plazo con la escena actual.
+        
+        Mide en el hilo que llama; la interfaz usa `capture_autotune_scene`
+        y `measure_block_sizes` por separado para medir fuera del hilo del GUI.
+        Retorna un dict con el bloque elegido y las mediciones, o None si no
+        hay tonos que medir.
+        """
+        parameters = self.capture_autotune_scene()
+        if parameters is None:
+            return None
+        return self.measure_block_sizes(parameters, candidates)
+    
+    def capture_autotune_scene(self):
+        """Copia los parámetros de la escena para medirla, o None si no hay tonos"""
+        # Con el audio bloqueado solo se copian parámetros; las escenas se construyen después
+        self.mutex.lock()
+        try:
+            if not any(not tone['removing'] for tone in self.tones.values()):
+                return None
+            return self._scene_parameters()
+        finally:
+            self.mutex.unlock()
+    
+    def measure_block_sizes(self, parameters, candidates=None):
+        """
+        Mide los bloques candidatos con una escena de `capture_autotune_scene`.
+        
+        Cada candidato renderiza una copia offline de la escena (el audio en
+        curso no se altera) durante AUTOTUNE_SECONDS; se acepta si el
+        percentil 99 del tiempo de render no supera AUTOTUNE_HEADROOM del
+        plazo del bloque. No toma el mutex: puede correr en otro hilo.
+        """
+        candidates = sorted(candidates or AudioConstants.AUTOTUNE_BLOCK_SIZES)
+        measurements = []
+        chosen = candidates[-1]
+        for size in candidates:
+            scene = self._scene_snapshot(size, parameters)
+            deadline = size / self.sample_rate
+            blocks = max(50, int(AudioConstants.AUTOTUNE_SECONDS / deadline))
+            timings = np.empty(blocks)
+            for i in range(blocks):
+                start = time.perf_counter()
+                scene._generate_audio_buffer(size)
+                timings[i] = time.perf_counter() - start
+            
+            p99 = float(np.percentile(timings, 99))
+            passed = p99 <= deadline * AudioConstants.AUTOTUNE_HEADROOM
+            measurements.append({'buffer_size': size, 'deadline': deadline,
+                                 'mean': float(timings.mean()), 'p99': p99, 'passed': passed})
+            if passed:
+                chosen = size
+                break
+        
+        latency = 'low' if chosen <= AudioConstants.LATENCY_PROFILES['live']['buffer_size'] else 'high'
+        print(f"⚙️ Auto-ajuste: bloque {chosen} ({chosen / self.sample_rate * 1000:.1f} ms)")
+        return {'buffer_size': chosen, 'latency': latency, 'measurements': measurements}
+    
+    def _scene_parameters(self):
+        """
+        Parámetros de la escena sin procesadores con estado: bandas, ajustes
+        de retardo, respuesta al impulso y copias superficiales de los tonos
+        (requiere el mutex tomado; no reserva búferes ni recalcula particiones)
+        """
+        tones = {}
+        for tone_id, tone in self.tones.items():
+            if tone['removing']:
+                continue
+            tones[tone_id] = {**tone,
+                              'envelope': copy.copy(tone['envelope']),
+                              'options': dict(tone['options']),
+                              'filters': list(tone['filters'].bands) if tone['filters'] else None,
+                              'delays': tone['delays'].settings() if tone['delays'] else None}
+        return {
+            'master_volume': self.master_volume,
+            'subsonic_frequency': self.subsonic_frequency,
+            'buses': {bus_id: dict(bus) for bus_id, bus in self.buses.items()},
+            'bus_levels': dict(self._bus_levels),
+            'bus_filters': {bus_id: list(chain.bands) for bus_id, chain in self._bus_filters.items()},
+            'bus_delays': {bus_id: chain.settings() for bus_id, chain in self._bus_delays.items()},
+            'bus_positions': dict(self._bus_positions),
+            'reverb': ((self.reverb.impulse, self.reverb.impulse_rate, self.reverb.mix)
+                       if self.reverb is not None else None),
+            'hrtf': ((self.spatializer.hrirs, self.spatializer.position_step)
+                     if self.spatializer is not None else None),
+            'noise_colors': dict(self.noise_colors),
+            'noise_bank': self.noise_bank,
+            'noise_texture_mode': self.noise_texture_mode,
+            'tones': tones,
+            'modulation': copy.deepcopy(self.modulation)
+        }
+    
+    def _scene_snapshot(self, buffer_size, parameters):
+        """Copia offline de la escena para medir el render (sin el mutex: usa `_scene_parameters`)"""
+        scene = AudioThread(sample_rate=self.sample_rate, buffer_size=buffer_size, negotiate=False,
+                            channels=self.channels, audio_config=self.audio_config)
+        scene.panner = self.panner
+        scene.mix_matrix = MixMatrix(self.panner)
+        scene.master_volume = parameters['master_volume']
+        scene.subsonic_frequency = parameters['subsonic_frequency']
+        scene.subsonic = scene._create_subsonic_filter()
+        scene.buses = {bus_id: dict(bus) for bus_id, bus in parameters['buses'].items()}
+        scene._bus_levels = dict(parameters['bus_levels'])
+        scene._bus_filters = {bus_id: FilterChain(bands, self.sample_rate)
+                              for bus_id, bands in parameters['bus_filters'].items()}
+        scene._bus_delays = {bus_id: DelayChain(effects, self.sample_rate, self.channels)
+                             for bus_id, effects in parameters['bus_delays'].items()}
+        scene._update_bus_inserts()
+        if parameters['reverb'] is not None:
+            # Las particiones dependen del bloque: se recalculan para el candidato
+            impulse, impulse_rate, mix = parameters['reverb']
+            scene.reverb = ConvolutionReverb(impulse, impulse_rate, self.sample_rate, buffer_size,
+                                             self.channels, mix)
+        if parameters['hrtf'] is not None:
+            hrirs, position_step = parameters['hrtf']
+            scene.spatializer = BinauralSpatializer(hrirs, self.sample_rate, position_step)
+        scene._bus_positions = dict(parameters['bus_positions'])
+        scene.noise_colors = dict(parameters['noise_colors'])
+        scene.noise_bank = parameters['noise_bank']
+        scene.noise_texture_mode = parameters['noise_texture_mode']
+        for tone_id, tone in parameters['tones'].items():
+            scene.tones[tone_id] = {**tone,
+                                    'envelope': copy.copy(tone['envelope']),
+                                    'options': dict(tone['options']),
+                                    'noise_generators': {},
+                                    'filters': (FilterChain(tone['filters'], self.sample_rate)
+                                                if tone['filters'] else None),
+                                    'delays': (DelayChain(tone['delays'], self.sample_rate, 1)
+                                               if tone['delays'] else None),
+                                    'stolen': False}
+            if tone['stolen'] and tone['active']:
+                # Se mide la escena completa, sin las voces silenciadas por sobrecarga
+                scene.tones[tone_id]['envelope'].gate_on()
+        scene.modulation = copy.deepcopy(parameters['modulation'])
+        scene._compile_modulation()
+        return scene
+    
+    def _rebuild_rate_tables(self):
+        """Recalcula las tablas que dependen de la frecuencia (requiere el mutex tomado)"""
+        self.crossfade_frames = max(1, int(AudioConstants.WAVE_CROSSFADE_TIME * self.sample_rate))
+        for tone in self.tones.values():
+            tone['envelope'].set_sample_rate(self.sample_rate)
+            tone['noise_generators'] = {}  # Se recrean a la nueva frecuencia
+            if tone['filters'] is not None:
+                tone['filters'].set_sample_rate(self.sample_rate)
+            if tone['delays'] is not None:
+                tone['delays'].set_sample_rate(self.sample_rate)
+        for chain in list(self._bus_filters.values()) + list(self._bus_delays.values()):
+            chain.set_sample_rate(self.sample_rate)
+        self.dc_blocker.set_sample_rate(self.sample_rate)
+        if self.subsonic is not None:
+            self.subsonic.set_sample_rate(self.sample_rate)
+        if self.reverb is not None:
+            self.reverb.configure(sample_rate=self.sample_rate)
+        if self.spatializer is not None:
+            self.spatializer.set_sample_rate(self.sample_rate)
+        
+        clear_shaping_cache()
+        if self.noise_bank is not None:
+            self.noise_bank = self._create_noise_bank()
+    
+    def _noise_segment_size(self):
+        """Segmento FFT del ruido: mantiene ~10 Hz de resolución a cualquier frecuencia"""
+        octaves = max(0, int(round(np.log2(self.sample_rate / 44100))))
+        return 4096 << octaves
+    
+    def _create_noise_bank(self):
+        return NoiseTextureBank(
+            self.sample_rate,
+            AudioConstants.NOISE_TEXTURE_SECONDS,
+            AudioConstants.NOISE_TEXTURE_CROSSFADE,
+            FileConstants.get_cache_path()
+        )
+    
+    def add_tone(self, tone_id, frequency, volume, wave_type, active, panning, options=None):
+        """Agrega o actualiza un tono (`options` contiene parámetros propios del tipo)"""
+        wave_type = wave_type.lower()
+        self.mutex.lock()
+        try:
+            tone = self.tones.get(tone_id)
+            if tone is None:
+                self.tones[tone_id] = {
+                    'frequency': frequency,
+                    'volume': volume,
+                    'wave_type': wave_type,
+                    'active': active,
+                    'panning': panning,
+                    'phase': 0.0,
+                    'time': 0.0,
+                    'crossfade_from': None,
+                    'crossfade_pos': 0,
+                    'envelope': ADSREnvelope(self.sample_rate, **AudioConstants.TONE_ENVELOPE),
+                    'removing': False,
+                    'options': dict(options or {}),
+                    'sweep_pos': 0,
+                    'sweep_offset': 0.0,
+                    'beat_phase': 0.0,
+                    'noise_generators': {},
+                    'stolen': False,
+                    'bus': None,
+                    'filters': None,
+                    'delays': None
+                }
+                if active:
+                    self.tones[tone_id]['envelope'].gate_on()
+                self._compile_modulation()
+            else:
+                self._apply_tone_update(tone_id, frequency=frequency, volume=volume,
+                                        wave_type=wave_type, active=active, panning=panning,
+                                        options=options)
             print(f"♪ Tono {tone_id}: {frequency}Hz, {wave_type}, vol:{volume:.2f}, pan:{panning:.2f}")
         finally:
             self.mutex.unlock()
     
+    def _apply_tone_update(self, tone_id, **fields):
+        """Actualiza en sitio un tono existente (requiere el mutex tomado)"""
+        tone = self.tones.get(tone_id)
+        if tone is None:
+            return
+        
+        # Se conserva la fase para evitar saltos
+        wave_type = fields.get('wave_type', tone['wave_type']).lower()
+        fields['wave_type'] = wave_type
+        if tone['wave_type'] != wave_type:
+            self._start_wave_crossfade(tone)
+            if wave_type == 'barrido' and tone['crossfade_from'] != 'barrido':
+                # El barrido entrante empieza desde la fase de la portadora; el
+                # saliente conserva su posición mientras dura el fundido
+                self._restart_sweep(tone, tone['phase'])
+            # Solo se conservan los generadores de ruido que siguen sonando
+            keep = (tone['crossfade_from'], wave_type)
+            tone['noise_generators'] = {name: generator for name, generator
+                                        in tone['noise_generators'].items() if name in keep}
+        
+        options = fields.pop('options', None)
+        if options:
+            merged = {**tone['options'], **options}
+            if any(merged.get(key) != tone['options'].get(key) for key in self.SWEEP_OPTIONS):
+                # Un barrido reconfigurado empieza de nuevo; si está sonando,
+                # desde su fase actual para no provocar un salto
+                offset = 0.0
+                if 'barrido' in (tone['wave_type'], tone['crossfade_from']):
+                    offset = float(self._sweep_phase(tone, 1)[0])
+                self._restart_sweep(tone, offset)
+            tone['options'] = merged
+        
+        active = fields.get('active', tone['active'])
+        if tone['removing'] or tone['active'] != active:
+            tone['removing'] = False
+            self._set_tone_gate(tone, active)
+        
+        tone.update(fields)
+    
+    @staticmethod
+    def _restart_sweep(tone, phase):
+        """Lleva el barrido del tono a su inicio, partiendo de la fase `phase`"""
+        tone['sweep_pos'] = 0
+        tone['sweep_offset'] = phase % (2 * np.pi)
+    
+    def _start_wave_crossfade(self, tone):
+        """Inicia el fundido cruzado desde el tipo de onda actual del tono"""
+        # Si ya había un fundido en curso, se parte del tipo que más suena
+        if tone['crossfade_from'] is None or tone['crossfade_pos'] >= self.crossfade_frames // 2:
+            tone['crossfade_from'] = tone['wave_type']
+        tone['crossfade_pos'] = 0
+    
+    def _set_tone_gate(self, tone, active):
+        """Dispara el ataque o la liberación de la envolvente del tono"""
+        if not active:
+            tone['stolen'] = False  # Un tono apagado deja de contar como voz silenciada
+            tone['envelope'].gate_off()
+        elif not tone['stolen']:
+            tone['envelope'].gate_on()
+    
     def remove_tone(self, tone_id):
-        """Elimina un tono"""
+        """Elimina un tono (tras su liberación si está sonando)"""
         self.mutex.lock()
         try:
-            if tone_id in self.tones:
-                del self.tones[tone_id]
+            if self._apply_remove_tone(tone_id):
                 print(f"🗑️ Tono {tone_id} eliminado")
         finally:
             self.mutex.unlock()
     
+    def _apply_remove_tone(self, tone_id):
+        """Elimina o libera un tono (requiere el mutex tomado)"""
+        tone = self.tones.get(tone_id)
+        if tone is None:
+            return False
+        
+        if tone['envelope'].is_idle:
+            del self.tones[tone_id]
+            self.modulation.remove_tone(tone_id)
+            self._compile_modulation()
+        else:
+            # El render lo retira cuando la liberación llega a silencio
+            tone['removing'] = True
+            tone['active'] = False
+            tone['envelope'].gate_off()
+        return True
+    
     def clear_tone_audio(self, tone_id):
         """Limpia el audio de un tono específico (para cambios de tipo)"""
         self.mutex.lock()
@@ -137,44 +772,499 @@ class AudioThread(QThread):
             if tone_id in self.tones:
                 self.tones[tone_id]['phase'] = 0.0
                 self.tones[tone_id]['time'] = 0.0
+                self.tones[tone_id]['crossfade_from'] = None
+                self.tones[tone_id]['crossfade_pos'] = 0
         finally:
             self.mutex.unlock()
     
     def set_tone_active(self, tone_id, active):
         """Activa/desactiva un tono"""
         self.mutex.lock()
+        try:
+            self._apply_tone_active(tone_id, active)
+        finally:
+            self.mutex.unlock()
+    
+    def _apply_tone_active(self, tone_id, active):
+        """Activa/desactiva un tono (requiere el mutex tomado)"""
+        tone = self.tones.get(tone_id)
+        if tone is not None and not tone['removing']:
+            tone['active'] = active
+            self._set_tone_gate(tone, active)
+    
+    def set_tones_active(self, tone_ids, active):
+        """Activa/desactiva varios tonos en una sola actualización"""
+        self.mutex.lock()
+        try:
+            self._apply_tones_active(tone_ids, active)
+        finally:
+            self.mutex.unlock()
+    
+    def _apply_tones_active(self, tone_ids, active):
+        for tone_id in tone_ids:
+            self._apply_tone_active(tone_id, active)
+    
+    def update_bus(self, bus_id, gain=None, mute=None, solo=None):
+        """Crea o actualiza un bus (ganancia, silencio y solo) en una sola operación"""
+        self.mutex.lock()
+        try:
+            self._apply_bus_update(bus_id, gain, mute, solo)
+        finally:
+            self.mutex.unlock()
+    
+    def _apply_bus_update(self, bus_id, gain=None, mute=None, solo=None):
+        """Actualiza un bus (requiere el mutex tomado)"""
+        bus = self.buses.setdefault(bus_id, {'gain': 1.0, 'mute': False, 'solo': False})
+        if gain is not None:
+            bus['gain'] = max(0.0, float(gain))
+        if mute is not None:
+            bus['mute'] = bool(mute)
+        if solo is not None:
+            bus['solo'] = bool(solo)
+    
+    def set_tone_filter(self, tone_id, bands):
+        """
+        Configura la etapa de filtros de un tono: lista de bandas
+        {'type', 'frequency', 'q', 'gain_db'} (vacía o None la quita).
+        """
+        self.mutex.lock()
+        try:
+            tone = self.tones.get(tone_id)
+            if tone is not None:
+                tone['filters'] = self._configure_filter_chain(tone['filters'], bands)
+        finally:
+            self.mutex.unlock()
+    
+    def set_bus_filter(self, bus_id, bands):
+        """Configura la etapa de filtros de un bus (se aplica a su submezcla)"""
+        self.mutex.lock()
+        try:
+            chain = self._configure_filter_chain(self._bus_filters.get(bus_id), bands)
+            if chain is None:
+                self._bus_filters.pop(bus_id, None)
+            else:
+                self.buses.setdefault(bus_id, {'gain': 1.0, 'mute': False, 'solo': False})
+                self._bus_filters[bus_id] = chain
+            self._update_bus_inserts()
+        finally:
+            self.mutex.unlock()
+    
+    def set_tone_delay(self, tone_id, effects):
+        """
+        Configura los efectos de retardo de un tono: lista de dicts
+        {'type': 'haas'|'chorus'|'echo', ...parámetros} (vacía o None los quita).
+        Con los mismos tipos, los parámetros nuevos se suavizan sin clics.
+        """
+        self.mutex.lock()
+        try:
+            tone = self.tones.get(tone_id)
+            if tone is not None:
+                tone['delays'] = self._configure_delay_chain(tone['delays'], effects, 1)
+        finally:
+            self.mutex.unlock()
+    
+    def set_bus_delay(self, bus_id, effects):
+        """Configura los efectos de retardo de un bus (tras sus filtros)"""
+        self.mutex.lock()
+        try:
+            chain = self._configure_delay_chain(self._bus_delays.get(bus_id), effects, self.channels)
+            if chain is None:
+                self._bus_delays.pop(bus_id, None)
+            else:
+                self.buses.setdefault(bus_id, {'gain': 1.0, 'mute': False, 'solo': False})
+                self._bus_delays[bus_id] = chain
+            self._update_bus_inserts()
+        finally:
+            self.mutex.unlock()
+    
+    def _configure_delay_chain(self, chain, effects, channels):
+        """Crea, actualiza o descarta una cadena de retardos"""
+        if not effects:
+            return None
+        if chain is None:
+            return DelayChain(effects, self.sample_rate, channels)
+        chain.configure(effects)
+        return chain
+    
+    def _update_bus_inserts(self):
+        """Inserciones de cada bus en orden: filtros y luego retardos (requiere el mutex tomado)"""
+        self._bus_inserts = {}
+        for bus_id in set(self._bus_filters) | set(self._bus_delays):
+            self._bus_inserts[bus_id] = [insert for insert in (self._bus_filters.get(bus_id),
+                                                               self._bus_delays.get(bus_id))
+                                         if insert is not None]
+    
+    def _tails_pending(self):
+        """Indica si algún efecto con memoria (HRTF, inserciones de bus) sigue sonando"""
+        if self.spatializer is not None and not self.spatializer.is_silent:
+            return True
+        return any(not insert.is_silent for inserts in self._bus_inserts.values()
+                   for insert in inserts)
+    
+    def _configure_filter_chain(self, chain, bands):
+        """Crea, actualiza o descarta una cadena (los coeficientes solo cambian si cambian las bandas)"""
+        if not bands:
+            return None
+        if chain is None:
+            return FilterChain(bands, self.sample_rate)
+        chain.configure(bands)
+        return chain
+    
+    def set_reverb(self, path, mix=None):
+        """
+        Carga una respuesta al impulso WAV como reverberación del bus maestro
+        (None la desactiva). Retorna la reverberación activa.
+        
+        La lectura y el cálculo de las particiones se hacen fuera del mutex;
+        solo el intercambio ocurre con el audio bloqueado.
+        """
+        reverb = None
+        if path is not None:
+            impulse, impulse_rate = load_impulse_response(path, AudioConstants.REVERB_MAX_SECONDS)
+            mix = AudioConstants.REVERB_MIX if mix is None else mix
+            reverb = ConvolutionReverb(impulse, impulse_rate, self.sample_rate, self.buffer_size,
+                                       self.channels, mix, name=str(path))
+        
+        self.mutex.lock()
+        try:
+            if reverb is not None and (reverb.sample_rate, reverb.block_size, reverb.channels) != (
+                    self.sample_rate, self.buffer_size, self.channels):
+                reverb.configure(self.sample_rate, self.buffer_size, self.channels)
+            self.reverb = reverb
+        finally:
+            self.mutex.unlock()
+        if reverb is not None:
+            print(f"🏛️ Reverberación: {reverb.seconds:.2f} s, {reverb.partitions} particiones")
+        return reverb
+    
+    def set_reverb_mix(self, mix):
+        """Proporción de señal reverberada (0-1), con rampa de un bloque"""
+        self.mutex.lock()
+        try:
+            if self.reverb is not None:
+                self.reverb.set_mix(mix)
+        finally:
+            self.mutex.unlock()
+    
+    def set_hrtf_mode(self, enabled, hrir_path=None):
+        """
+        Activa la espacialización binaural de los tonos posicionados con las
+        HRIR de `hrir_path` (directorio de WAV) o con el modelo sintético de
+        cabeza esférica. Retorna el espacializador activo.
+        """
+        spatializer = None
+        if enabled:
+            if hrir_path:
+                hrir_set = HRIRSet.from_directory(hrir_path, self.sample_rate)
+            else:
+                hrir_set = HRIRSet.spherical_head(self.sample_rate)
+            spatializer = BinauralSpatializer(hrir_set, self.sample_rate,
+                                              AudioConstants.HRTF_POSITION_STEP)
+        
+        self.mutex.lock()
+        try:
+            if spatializer is not None and spatializer.sample_rate != self.sample_rate:
+                spatializer.set_sample_rate(self.sample_rate)
+            self.spatializer = spatializer
+        finally:
+            self.mutex.unlock()
+        if spatializer is not None:
+            print(f"🎧 HRTF: {spatializer.name}, {len(spatializer.hrirs.directions)} direcciones")
+        return spatializer
+    
+    def set_bus_position(self, bus_id, azimuth, elevation=0.0):
+        """
+        Posición de un bus (grados; acimut None la quita): los tonos del bus
+        sin posición propia suenan desde ella.
+        """
+        self.mutex.lock()
+        try:
+            if azimuth is None:
+                self._bus_positions.pop(bus_id, None)
+            else:
+                self.buses.setdefault(bus_id, {'gain': 1.0, 'mute': False, 'solo': False})
+                self._bus_positions[bus_id] = (float(azimuth), float(elevation))
+        finally:
+            self.mutex.unlock()
+    
+    def set_subsonic_frequency(self, frequency):
+        """Corte del paso alto subsónico del maestro en Hz (0 lo desactiva)"""
+        self.mutex.lock()
+        try:
+            self.subsonic_frequency = max(0.0, float(frequency))
+            self.subsonic = self._create_subsonic_filter()
+        finally:
+            self.mutex.unlock()
+    
+    def _create_subsonic_filter(self):
+        """Butterworth de 4º orden sin SciPy (None si la frecuencia es 0)"""
+        if self.subsonic_frequency <= 0.0:
+            return None
+        return SubsonicFilter(self.sample_rate, self.channels, self.subsonic_frequency)
+    
+    def _tone_position(self, tone):
+        """(acimut, elevación) del tono o de su bus, o None si no está posicionado"""
+        azimuth = tone['options'].get('azimuth')
+        if azimuth is None:
+            return self._bus_positions.get(tone['bus'])
+        return float(azimuth), float(tone['options'].get('elevation', 0.0))
+    
+    def remove_bus(self, bus_id):
+        """Elimina un bus; sus tonos pasan a sonar directo"""
+        self.mutex.lock()
+        try:
+            if self.buses.pop(bus_id, None) is None:
+                return False
+            self._bus_levels.pop(bus_id, None)
+            self._bus_filters.pop(bus_id, None)
+            self._bus_delays.pop(bus_id, None)
+            self._bus_positions.pop(bus_id, None)
+            self._update_bus_inserts()
+            for tone in self.tones.values():
+                if tone['bus'] == bus_id:
+                    tone['bus'] = None
+            return True
+        finally:
+            self.mutex.unlock()
+    
+    def set_tone_bus(self, tone_ids, bus_id):
+        """Asigna varios tonos a un bus (None = directo al maestro)"""
+        self.mutex.lock()
+        try:
+            if bus_id is not None:
+                self.buses.setdefault(bus_id, {'gain': 1.0, 'mute': False, 'solo': False})
+            for tone_id in tone_ids:
+                if tone_id in self.tones:
+                    self.tones[tone_id]['bus'] = bus_id
+        finally:
+            self.mutex.unlock()
+    
+    def _bus_targets(self):
+        """Ganancia objetivo de cada bus y del envío directo (None) según silencio y solo"""
+        any_solo = any(bus['solo'] for bus in self.buses.values())
+        targets = {None: 0.0 if any_solo else 1.0}
+        for bus_id, bus in self.buses.items():
+            silenced = bus['mute'] or (any_solo and not bus['solo'])
+            targets[bus_id] = 0.0 if silenced else bus['gain']
+        return targets
+    
+    def _bus_segment_gains(self, frames):
+        """Ganancia de cada bus para el segmento: escalar o rampa si está cambiando"""
+        max_change = frames / (AudioConstants.BUS_RAMP_TIME * self.sample_rate)
+        gains = {}
+        for bus_id, target in self._bus_targets().items():
+            level = self._bus_levels.get(bus_id, target)
+            if level == target:
+                gains[bus_id] = target
+            else:
+                new_level = level + max(-max_change, min(max_change, target - level))
+                gains[bus_id] = np.linspace(level, new_level, frames + 1, dtype=np.float32)[1:]
+                level = new_level
+            self._bus_levels[bus_id] = level
+        return gains
+    
+    def _apply_notify(self, name):
+        """Anota un aviso para la interfaz (requiere el mutex tomado; no emite desde el callback)"""
+        self._notices.append(name)
+    
+    def _apply_stop_all_tones(self):
+        """Libera todos los tonos activos (requiere el mutex tomado)"""
+        for tone_id in list(self.tones.keys()):
+            self._apply_tone_active(tone_id, False)
+    
+    def set_tone_envelope(self, tone_id, attack=None, decay=None, sustain=None, release=None):
+        """Configura la envolvente ADSR de un tono"""
+        self.mutex.lock()
         try:
             if tone_id in self.tones:
-                self.tones[tone_id]['active'] = active
+                self.tones[tone_id]['envelope'].configure(attack, decay, sustain, release)
+        finally:
+            self.mutex.unlock()
+    
+    def add_modulation(self, source, target_tone_id, destination, depth):
+        """
+        Agrega una ruta de modulación y retorna su id.
+        
+        `source` es ('tone', tone_id) o ('lfo', lfo_id); `destination` es
+        'amplitude', 'frequency' o 'pan'. Lanza ValueError si la ruta crea
+        un ciclo o referencia una fuente inexistente.
+        """
+        self.mutex.lock()
+        try:
+            route_id = self.modulation.add_route(source, target_tone_id, destination,
+                                                 depth, list(self.tones.keys()))
+            self._compile_modulation()
+            return route_id
         finally:
             self.mutex.unlock()
     
+    def remove_modulation(self, route_id):
+        """Elimina una ruta de modulación"""
+        self.mutex.lock()
+        try:
+            removed = self.modulation.remove_route(route_id)
+            self._compile_modulation()
+            return removed
+        finally:
+            self.mutex.unlock()
+    
+    def set_modulation_depth(self, route_id, depth):
+        """Cambia la profundidad de una ruta existente"""
+        self.mutex.lock()
+        try:
+            changed = self.modulation.set_route_depth(route_id, depth)
+            self._compile_modulation()
+            return changed
+        finally:
+            self.mutex.unlock()
+    
+    def set_lfo(self, lfo_id, rate, shape='seno'):
+        """Crea o actualiza un LFO dedicado"""
+        self.mutex.lock()
+        try:
+            self.modulation.set_lfo(lfo_id, rate, shape)
+            self._compile_modulation()
+        finally:
+            self.mutex.unlock()
+    
+    def remove_lfo(self, lfo_id):
+        """Elimina un LFO y sus rutas"""
+        self.mutex.lock()
+        try:
+            removed = self.modulation.remove_lfo(lfo_id)
+            self._compile_modulation()
+            return removed
+        finally:
+            self.mutex.unlock()
+    
+    def _compile_modulation(self):
+        """Recompila el plan de modulación (requiere el mutex tomado)"""
+        self.modulation_plan = self.modulation.compile(list(self.tones.keys()))
+    
     def set_master_volume(self, volume):
         """Establece el volumen maestro"""
+        self._apply_master_volume(volume)
+    
+    def _apply_master_volume(self, volume):
         self.master_volume = max(0.0, min(1.0, volume))
     
-    def _generate_audio_buffer(self, frames):
-        """Genera el buffer de audio mezclando todos los tonos activos"""
-        buffer = np.zeros((frames, 2), dtype=np.float32)
+    def schedule_event(self, delay, action, **params):
+        """
+        Planifica una acción del motor a `delay` segundos del reloj de muestras.
+        
+        Acciones: set_tone_active, update_tone, remove_tone,
+        set_master_volume, stop_all_tones, set_tones_active, update_bus y
+        notify (emite `event_notified` con `name` en el hilo de la interfaz).
+        """
+        self.mutex.lock()
+        try:
+            sample_time = self.sample_clock + int(round(max(0.0, delay) * self.sample_rate))
+            return self._schedule_locked(sample_time, action, params)
+        finally:
+            self.mutex.unlock()
+    
+    def schedule_event_at(self, sample_time, action, **params):
+        """Planifica una acción en un tiempo de muestra absoluto"""
+        self.mutex.lock()
+        try:
+            return self._schedule_locked(sample_time, action, params)
+        finally:
+            self.mutex.unlock()
+    
+    def _schedule_locked(self, sample_time, action, params):
+        if action not in self._event_handlers:
+            raise ValueError(f"Acción desconocida: {action}")
+        return self.scheduler.schedule(max(sample_time, self.sample_clock), action, params)
+    
+    def cancel_event(self, event_id):
+        """Cancela un evento planificado"""
+        self.mutex.lock()
+        try:
+            return self.scheduler.cancel(event_id)
+        finally:
+            self.mutex.unlock()
+    
+    def _dispatch_due_events(self):
+        """Ejecuta los eventos que vencen en la muestra actual"""
+        for action, params in self.scheduler.pop_due(self.sample_clock):
+            self._event_handlers[action](**params)
+    
+    def _render_block(self, frames, underflow=False):
+        """Renderiza un bloque del stream y registra su carga en el gobernador"""
+        start = time.perf_counter()
+        buffer = self._generate_audio_buffer(frames)
+        render_time = time.perf_counter() - start
         
-        if not self.tones:
-            return buffer
+        voices = sum(1 for tone in self.tones.values()
+                     if tone['active'] and not tone['removing'])
+        if self.governor.record(render_time, frames / self.sample_rate, underflow, voices):
+            self._apply_governor_level()
+        return buffer
+    
+    def _apply_governor_level(self):
+        """
+        Aplica el nivel de calidad del gobernador (requiere el mutex tomado).
         
-        time_step = 1.0 / self.sample_rate
+        Corre en el callback: el cambio queda en los pasos del gobernador
+        y se informa desde `update_stats`.
+        """
+        governor = self.governor
         
-        for tone_id, tone in self.tones.items():
-            if not tone['active']:
-                continue
+        # Las voces silenciadas son las de menor nivel audible
+        candidates = [tone for tone in self.tones.values()
+                      if tone['active'] and not tone['removing']]
+        candidates.sort(key=lambda tone: tone['volume'] * tone['envelope'].level
+                        if not tone['stolen'] else tone['volume'])
+        stolen = {id(tone) for tone in candidates[:governor.stolen_voices]}
+        for tone in candidates:
+            steal = id(tone) in stolen
+            if steal != tone['stolen']:
+                tone['stolen'] = steal
+                if steal:
+                    tone['envelope'].gate_off()
+                else:
+                    tone['envelope'].gate_on()
+    
+    def _generate_audio_buffer(self, frames):
+        """Genera el buffer de audio mezclando todos los tonos activos"""
+        buffer = np.zeros((frames, self.channels), dtype=np.float32)
+        rendered = 0
+        
+        # Dividir el bloque en los límites de los eventos planificados
+        position = 0
+        while position < frames:
+            self._dispatch_due_events()
             
-            # Generar muestras para este tono
-            tone_buffer = self._generate_tone_buffer(tone, frames, time_step)
+            segment_frames = frames - position
+            next_event = self.scheduler.next_event_time()
+            if next_event is not None:
+                segment_frames = min(segment_frames, next_event - self.sample_clock)
             
-            # Aplicar panning
-            left_volume = (1.0 - max(0, tone['panning'])) * tone['volume']
-            right_volume = (1.0 + min(0, tone['panning'])) * tone['volume']
+            if self.tones or self._tails_pending():
+                rendered += self._mix_tones(buffer[position:position + segment_frames], segment_frames)
             
-            buffer[:, 0] += tone_buffer * left_volume  # Canal izquierdo
-            buffer[:, 1] += tone_buffer * right_volume  # Canal derecho
+            self.sample_clock += segment_frames
+            position += segment_frames
+        
+        reverb = self.reverb
+        if not rendered and (reverb is None or reverb.is_silent):
+            # Nada sonó: se entrega el buffer de silencio compartido
+            if not self._master_filters_idle:
+                # Tras una liberación la señal ya es nula: el estado se descarta
+                self.dc_blocker.reset()
+                if self.subsonic is not None:
+                    self.subsonic.reset()
+                self._master_filters_idle = True
+            return self._zero_buffer(frames)
+        
+        if reverb is not None:
+            buffer = reverb.process(buffer)
+        
+        # Continua y subsónicos fuera: no consumen margen del limitador
+        self._master_filters_idle = False
+        self.dc_blocker.process(buffer)
+        if self.subsonic is not None:
+            self.subsonic.process(buffer)
         
         # Aplicar volumen maestro y limitar amplitud
         buffer *= self.master_volume
@@ -182,96 +1272,420 @@ class AudioThread(QThread):
         
         return buffer
     
-    def _generate_tone_buffer(self, tone, frames, time_step):
-        """Genera buffer para un tono específico"""
-        wave_type = tone['wave_type']
-        frequency = tone['frequency']
+    def _zero_buffer(self, frames):
+        """Buffer de silencio de solo lectura, compartido entre bloques del mismo tamaño"""
+        zeros = self._zero_buffers.get(frames)
+        if zeros is None:
+            zeros = np.zeros((frames, self.channels), dtype=np.float32)
+            zeros.setflags(write=False)
+            self._zero_buffers[frames] = zeros
+        return zeros
+    
+    def _mix_tones(self, buffer, frames):
+        """
+        Mezcla en `buffer` un segmento de todos los tonos que suenan.
         
-        # Generar array de tiempo
-        t = np.arange(frames) * time_step + tone['time']
+        Retorna el número de tonos renderizados; los silenciosos (en reposo,
+        con volumen o sostenido nulos) solo avanzan su estado.
+        """
+        time_step = 1.0 / self.sample_rate
+        finished = []
+        rendered = 0
+        mix = self.mix_matrix
+        mix.begin(frames)
+        spatializer = self.spatializer
+        if spatializer is not None:
+            spatializer.begin(frames)
+        bus_gains = self._bus_segment_gains(frames)
         
-        if wave_type in self.noise_generators:
-            # Generar ruido
-            samples = self.noise_generators[wave_type](frames)
-        else:
-            # Generar formas de onda tradicionales
-            if wave_type == 'seno':
-                samples = np.sin(2 * np.pi * frequency * t)
-            elif wave_type == 'cuadrada':
-                samples = np.sign(np.sin(2 * np.pi * frequency * t))
-            elif wave_type == 'triángulo':
-                samples = 2 * np.arcsin(np.sin(2 * np.pi * frequency * t)) / np.pi
-            elif wave_type == 'sierra':
-                samples = 2 * (t * frequency - np.floor(t * frequency + 0.5))
+        # Con rutas activas se evalúa en orden topológico sobre una matriz
+        # de señales fuente compartida (LFOs + tonos moduladores)
+        plan = self.modulation_plan
+        signals = None
+        if not plan.is_empty:
+            signals = self._prepare_modulation_signals(plan, frames)
+            self.modulation.render_lfos(plan, signals, frames, self.sample_rate)
+        
+        for tone_id in plan.order:
+            tone = self.tones.get(tone_id)
+            if tone is None:
+                continue
+            envelope = tone['envelope']
+            delays = tone['delays']
+            tail = delays is not None and not delays.is_silent
+            if envelope.is_idle and not tail:
+                # Tono detenido y ya en silencio: no cuesta CPU
+                if tone['removing']:
+                    finished.append(tone_id)
+                self._skipped_tones.add(tone_id)
+                continue
+            
+            bus_gain = bus_gains.get(tone['bus'], 1.0)
+            bus_silent = np.ndim(bus_gain) == 0 and bus_gain <= 0.0
+            if ((tone['volume'] <= 0.0 or envelope.is_silent or bus_silent)
+                    and ('tone', tone_id) not in plan.source_rows and not tail):
+                # Inaudible y sin modular a otros: se avanza la fase sin generar muestras
+                envelope.process(frames)
+                self._advance_tone_state(tone, frames, time_step,
+                                         tone['phase'] + 2 * np.pi * tone['frequency'] * time_step * frames)
+                if envelope.is_idle and tone['removing']:
+                    finished.append(tone_id)
+                self._skipped_tones.add(tone_id)
+                continue
+            rendered += 1
+            
+            routes = plan.targets.get(tone_id) if signals is not None else None
+            frequency_mod = self._modulation_sum(routes, 'frequency', signals, frames)
+            
+            # Generar muestras para este tono con su envolvente
+            tone_buffer = self._generate_tone_buffer(tone, frames, time_step, frequency_mod)
+            stereo = tone_buffer.ndim == 2
+            if signals is not None:
+                row = plan.source_rows.get(('tone', tone_id))
+                if row is not None:
+                    signals[row, :frames] = tone_buffer.mean(axis=1) if stereo else tone_buffer
+            if tone['filters'] is not None:
+                tone_buffer = tone['filters'].process(tone_buffer)
+            self._apply_gain(tone_buffer, envelope.process(frames))
+            if delays is not None:
+                # Haas convierte el tono en estéreo; eco y chorus conservan la forma
+                tone_buffer = delays.process(tone_buffer)
+                stereo = tone_buffer.ndim == 2
+            
+            if envelope.is_idle and tone['removing'] and (delays is None or delays.is_silent):
+                finished.append(tone_id)
+            
+            panning = tone['panning']
+            if routes:
+                if 'amplitude' in routes:
+                    rows, depths = routes['amplitude']
+                    gain = 1.0 - 0.5 * (depths @ (1.0 - signals[rows, :frames]))
+                    self._apply_gain(tone_buffer, np.maximum(gain, 0.0))
+                pan_mod = self._modulation_sum(routes, 'pan', signals, frames)
+                if pan_mod is not None:
+                    panning = np.clip(panning + pan_mod, -1.0, 1.0)
+            
+            volume = tone['volume']
+            bus = tone['bus']
+            position = self._tone_position(tone)
+            if spatializer is not None and position is not None and not stereo:
+                # Tonos posicionados con auriculares: HRTF agrupada por posición y,
+                # si el bus tiene inserciones, por bus (su salida pasa por ellas)
+                self._apply_gain(tone_buffer, bus_gain)
+                spatializer.add(tone_id, tone_buffer, volume, *position,
+                                bus=bus if bus in self._bus_inserts else None)
+            elif np.ndim(panning):
+                # Paneo modulado por muestra: ganancias por muestra fuera del producto
+                # (este caso poco común no pasa por los filtros del bus)
+                self._apply_gain(tone_buffer, bus_gain)
+                self._mix_per_sample_pan(buffer, tone, tone_buffer, panning)
+            elif stereo:
+                # Los tonos binaurales aportan cada oído a los canales frontales L/R
+                mix.add(tone_buffer[:, 0], volume * (1.0 - max(0.0, panning)),
+                        channel=self.panner.left_channel, bus=bus)
+                mix.add(tone_buffer[:, 1], volume * (1.0 + min(0.0, panning)),
+                        channel=self.panner.right_channel, bus=bus)
             else:
-                # Tipo desconocido, usar seno por defecto
-                samples = np.sin(2 * np.pi * frequency * t)
+                mix.add(tone_buffer, volume, panning, position[0] if position else None, bus=bus)
         
-        # Actualizar tiempo para continuidad
-        tone['time'] += frames * time_step
+        # La salida binaural de los buses con inserciones se suma a su submezcla
+        submixes = {}
+        if spatializer is not None:
+            binaural = spatializer.render()
+            if binaural:
+                rendered += 1  # La cola de la convolución también cuenta como sonido
+            for bus, ears in binaural.items():
+                target = buffer
+                if bus in self._bus_inserts:
+                    target = submixes[bus] = np.zeros(buffer.shape, dtype=np.float32)
+                target[:, self.panner.left_channel] += ears[0]
+                target[:, self.panner.right_channel] += ears[1]
+        
+        # Toda la mezcla en un único producto (filas × muestras)ᵀ @ (filas × canales);
+        # las ganancias de bus se aplican dentro del mismo producto
+        rendered += mix.mix_into(buffer, bus_gains, self._bus_inserts, submixes)
+        
+        # Retirar los tonos eliminados que terminaron su liberación
+        if finished:
+            for tone_id in finished:
+                del self.tones[tone_id]
+                self.modulation.remove_tone(tone_id)
+            self._compile_modulation()
+        return rendered
+    
+    def _mix_per_sample_pan(self, buffer, tone, tone_buffer, panning):
+        """Suma un tono con paneo variable por muestra (modulación de panning)"""
+        volume = tone['volume']
+        if tone_buffer.ndim == 2:
+            buffer[:, self.panner.left_channel] += tone_buffer[:, 0] * (1.0 - np.maximum(0, panning)) * volume
+            buffer[:, self.panner.right_channel] += tone_buffer[:, 1] * (1.0 + np.minimum(0, panning)) * volume
+            return
+        gains = self.panner.gains(panning, tone['options'].get('azimuth'))
+        buffer += (tone_buffer[:, None] * gains * volume).astype(np.float32)
+    
+    @staticmethod
+    def _apply_gain(tone_buffer, gain):
+        """Multiplica en sitio un buffer mono o estéreo por una ganancia"""
+        if np.ndim(gain) and tone_buffer.ndim == 2:
+            tone_buffer *= gain[:, None]
+        else:
+            tone_buffer *= gain
+    
+    def _prepare_modulation_signals(self, plan, frames):
+        """Matriz de señales fuente preasignada (filas en cero cada bloque)"""
+        rows, capacity = self._modulation_signals.shape
+        if rows < plan.row_count or capacity < frames:
+            self._modulation_signals = np.zeros((max(rows, plan.row_count), max(capacity, frames)))
+        signals = self._modulation_signals
+        signals[:plan.row_count, :frames] = 0.0
+        return signals
+    
+    def _modulation_sum(self, routes, destination, signals, frames):
+        """Suma ponderada de las fuentes que modulan un destino"""
+        if not routes or destination not in routes:
+            return None
+        rows, depths = routes[destination]
+        return depths @ signals[rows, :frames]
+    
+    def _generate_tone_buffer(self, tone, frames, time_step, frequency_mod=None):
+        """Genera buffer para un tono específico (con FM opcional en Hz)"""
+        wave_type = tone['wave_type']
+        
+        # Fase acumulada: los cambios de frecuencia o de forma no provocan saltos
+        if frequency_mod is None:
+            phase_step = 2 * np.pi * tone['frequency'] * time_step
+            phase = tone['phase'] + phase_step * np.arange(frames)
+            end_phase = tone['phase'] + phase_step * frames
+        else:
+            # Frecuencia instantánea por muestra: la fase es su integral
+            increments = 2 * np.pi * time_step * (tone['frequency'] + frequency_mod)
+            phase = np.empty(frames)
+            phase[0] = 0.0
+            np.cumsum(increments[:-1], out=phase[1:])
+            phase += tone['phase']
+            end_phase = phase[-1] + increments[-1]
+        
+        samples = self._render_waveform(tone, wave_type, phase, frames)
+        
+        if tone['crossfade_from'] is not None:
+            # Solo durante la transición se generan ambas formas de onda
+            previous = self._render_waveform(tone, tone['crossfade_from'], phase, frames)
+            ramp = (tone['crossfade_pos'] + np.arange(frames)) / self.crossfade_frames
+            np.clip(ramp, 0.0, 1.0, out=ramp)
+            if samples.ndim == 2 or previous.ndim == 2:
+                # Fundido con un tono binaural (estéreo): el mono va a ambos canales
+                samples = samples if samples.ndim == 2 else samples[:, None]
+                previous = previous if previous.ndim == 2 else previous[:, None]
+                ramp = ramp[:, None]
+            samples = previous + (samples - previous) * ramp
         
+        self._advance_tone_state(tone, frames, time_step, end_phase)
         return samples.astype(np.float32)
     
-    def _generate_white_noise(self, frames):
-        """Genera ruido blanco"""
-        return np.random.normal(0, 0.3, frames)
+    def _advance_tone_state(self, tone, frames, time_step, end_phase):
+        """Avanza fase, fundido, barrido y pulso binaural tras `frames` muestras"""
+        if tone['crossfade_from'] is not None:
+            tone['crossfade_pos'] += frames
+            if tone['crossfade_pos'] >= self.crossfade_frames:
+                tone['crossfade_from'] = None
+                tone['crossfade_pos'] = 0
+        
+        # Actualizar fase y tiempo para continuidad
+        tone['phase'] = end_phase % (2 * np.pi)
+        tone['time'] += frames * time_step
+        rendered = (tone['wave_type'], tone['crossfade_from'])
+        if 'barrido' in rendered:
+            tone['sweep_pos'] += frames
+        if 'binaural' in rendered:
+            beat = float(tone['options'].get('beat', 0.0))
+            tone['beat_phase'] = (tone['beat_phase'] + np.pi * beat * time_step * frames) % (2 * np.pi)
     
-    def _generate_pink_noise(self, frames):
-        """Genera ruido rosa usando filtro IIR"""
-        output = np.zeros(frames)
+    def _render_waveform(self, tone, wave_type, phase, frames):
+        """Genera las muestras de una forma de onda a partir de la fase"""
+        if is_noise_type(wave_type):
+            if self.governor.level >= 2:
+                return self._decimated_noise(tone, wave_type).generate(frames)
+            return self._noise_generator(tone, wave_type).generate(frames)
         
-        for i in range(frames):
-            white = np.random.normal(0, 1)
-            
-            # Filtro IIR para ruido rosa
-            self.pink_noise_state[0] = 0.99886 * self.pink_noise_state[0] + white * 0.0555179
-            self.pink_noise_state[1] = 0.99332 * self.pink_noise_state[1] + white * 0.0750759
-            self.pink_noise_state[2] = 0.96900 * self.pink_noise_state[2] + white * 0.1538520
-            self.pink_noise_state[3] = 0.86650 * self.pink_noise_state[3] + white * 0.3104856
-            self.pink_noise_state[4] = 0.55000 * self.pink_noise_state[4] + white * 0.5329522
-            self.pink_noise_state[5] = -0.7616 * self.pink_noise_state[5] - white * 0.0168980
-            
-            output[i] = (self.pink_noise_state[0] + self.pink_noise_state[1] + 
-                        self.pink_noise_state[2] + self.pink_noise_state[3] + 
-                        self.pink_noise_state[4] + self.pink_noise_state[5] + 
-                        self.pink_noise_state[6] + white * 0.5362) * 0.11
-            
-            self.pink_noise_state[6] = white * 0.115926
+        if wave_type == 'barrido':
+            return np.sin(self._sweep_phase(tone, frames))
+        
+        if wave_type == 'binaural':
+            return self._binaural_pair(tone, phase, frames)
         
-        return output * 0.3
+        if self.governor.level >= 1 and has_wavetable(wave_type):
+            # Bajo sobrecarga: lectura de tabla en lugar de evaluar la función
+            return render_wavetable(wave_type, phase)
+        
+        if wave_type == 'seno':
+            return np.sin(phase)
+        elif wave_type == 'cuadrada':
+            return np.sign(np.sin(phase))
+        elif wave_type == 'triángulo':
+            return 2 * np.arcsin(np.sin(phase)) / np.pi
+        elif wave_type == 'sierra':
+            cycles = phase / (2 * np.pi)
+            return 2 * (cycles - np.floor(cycles + 0.5))
+        
+        # Tipo desconocido, usar seno por defecto
+        return np.sin(phase)
     
-    def _generate_brown_noise(self, frames):
-        """Genera ruido marrón (Browniano)"""
-        output = np.zeros(frames)
+    def _binaural_pair(self, tone, carrier_phase, frames):
+        """
+        Genera el par binaural izquierdo/derecho en una sola pasada.
         
-        for i in range(frames):
-            white = np.random.normal(0, 1)
-            self.brown_noise_state += white * 0.02
-            self.brown_noise_state *= 0.996  # Evitar deriva
-            output[i] = self.brown_noise_state
+        Ambos canales comparten la fase de la portadora y se separan por
+        ±la mitad de la fase del pulso, de modo que la diferencia entre
+        oídos es exactamente la frecuencia de pulso en cualquier sesión.
+        """
+        beat = float(tone['options'].get('beat', 0.0))
+        half_beat = tone['beat_phase'] + (np.pi * beat / self.sample_rate) * np.arange(frames)
         
-        return output * 0.3
+        phases = np.empty((frames, 2))
+        np.subtract(carrier_phase, half_beat, out=phases[:, 0])
+        np.add(carrier_phase, half_beat, out=phases[:, 1])
+        return np.sin(phases, out=phases)
+    
+    def _sweep_phase(self, tone, frames):
+        """
+        Fase instantánea de un barrido lineal o logarítmico en forma cerrada.
+        
+        Se evalúa a partir del contador entero de muestras, de modo que es
+        exacta para cualquier duración y no acumula error entre bloques.
+        """
+        options = tone['options']
+        f_start = max(float(options.get('sweep_start', tone['frequency'] or 20.0)), 0.01)
+        f_end = max(float(options.get('sweep_end', f_start)), 0.01)
+        sweep_frames = max(1, int(round(float(options.get('sweep_duration', 10.0)) * self.sample_rate)))
+        duration = sweep_frames / self.sample_rate
+        logarithmic = options.get('sweep_mode', 'linear') == 'log' and f_start != f_end
+        
+        def segment_phase(t):
+            # Fase acumulada desde el inicio de un barrido (t <= duration)
+            if logarithmic:
+                ratio = f_end / f_start
+                return 2 * np.pi * f_start * duration / np.log(ratio) * np.expm1(t / duration * np.log(ratio))
+            return 2 * np.pi * (f_start * t + (f_end - f_start) * t * t / (2 * duration))
+        
+        positions = tone['sweep_pos'] + np.arange(frames, dtype=np.int64)
+        full_phase = segment_phase(duration)
+        
+        if options.get('sweep_repeat', False):
+            # Cada repetición continúa desde la fase final de la anterior
+            cycles, offsets = np.divmod(positions, sweep_frames)
+            phase = segment_phase(offsets / self.sample_rate) + (cycles * full_phase) % (2 * np.pi)
+        else:
+            # Al terminar se mantiene la frecuencia final con fase continua
+            offsets = np.minimum(positions, sweep_frames)
+            held = (positions - offsets) / self.sample_rate
+            phase = segment_phase(offsets / self.sample_rate) + 2 * np.pi * f_end * held
+        return phase + tone['sweep_offset']
+    
+    def set_noise_texture_mode(self, enabled, prewarm=False):
+        """
+        Activa el modo textura de ruido.
+        
+        Las texturas se generan en segundo plano (todas con `prewarm`, o
+        cada color al usarse por primera vez); mientras no estén listas los
+        tonos usan el generador espectral en vivo.
+        """
+        self.mutex.lock()
+        try:
+            if enabled and self.noise_bank is None:
+                self.noise_bank = self._create_noise_bank()
+            self.noise_texture_mode = enabled
+            if enabled and prewarm:
+                self.noise_bank.prewarm()
+        finally:
+            self.mutex.unlock()
+    
+    def _noise_generator(self, tone, wave_type):
+        """Generador de ruido propio del tono (estado de solapamiento independiente)"""
+        if wave_type == CUSTOM_NOISE:
+            alpha = float(tone['options'].get('noise_alpha', 1.0))
+        else:
+            alpha = self.noise_colors[wave_type]
+        
+        generator = tone['noise_generators'].get(wave_type)
+        if generator is None:
+            # Con textura lista el ruido del tono cuesta una copia de rebanada;
+            # el ruido de pendiente personalizada siempre se genera en vivo
+            if self.noise_texture_mode and wave_type != CUSTOM_NOISE:
+                generator = self.noise_bank.reader(wave_type)
+            if generator is None:
+                generator = SpectralNoiseGenerator(alpha, self.sample_rate,
+                                                   segment_size=self._noise_segment_size())
+            tone['noise_generators'][wave_type] = generator
+        elif generator.alpha != alpha:
+            generator.set_alpha(alpha)
+        return generator
+    
+    def _decimated_noise(self, tone, wave_type):
+        """Generador de ruido decimado del tono (las texturas ya son baratas y se conservan)"""
+        generator = self._noise_generator(tone, wave_type)
+        if isinstance(generator, NoiseTextureReader):
+            return generator
+        
+        key = f"{wave_type}:decimated"
+        decimated = tone['noise_generators'].get(key)
+        if decimated is None:
+            decimated = DecimatedNoise(generator.alpha, self.sample_rate,
+                                       factor=AudioConstants.NOISE_DECIMATION,
+                                       segment_size=self._noise_segment_size())
+            tone['noise_generators'][key] = decimated
+        elif decimated.alpha != generator.alpha:
+            decimated.set_alpha(generator.alpha)
+        return decimated
     
     def update_stats(self):
         """Actualiza estadísticas en tiempo real"""
         self.mutex.lock()
         try:
-            active_tones = [t for t in self.tones.values() if t['active']]
+            tones = [t for t in self.tones.values() if not t['removing']]
+            active_tones = [t for t in tones if t['active']]
             
             stats = {
                 'timestamp': time.time(),
                 'active_tones': len(active_tones),
-                'total_tones': len(self.tones),
+                'total_tones': len(tones),
                 'master_volume': self.master_volume,
                 'sample_rate': self.sample_rate,
                 'buffer_size': self.buffer_size,
-                'cpu_load': self._estimate_cpu_load(),
+                'channels': self.channels,
+                'speaker_layout': self.speaker_layout,
+                'output_latency': self.audio_stream.latency if self.audio_stream else None,
+                'sample_time': self.sample_clock,
+                'scheduled_events': self.scheduler.pending_count(),
+                'cpu_load': (self.governor.load * 100 if self.governor.measured
+                             else self._estimate_cpu_load()),
+                'dsp_peak_load': self.governor.peak_load * 100,
+                'quality_level': self.governor.level,
+                'quality_mode': self.governor.mode,
+                'stolen_voices': self.governor.stolen_voices,
+                'underflows': self.governor.underflows,
+                'governor_steps': self.governor.drain_steps(),
+                'skipped_tones': len(self._skipped_tones),
+                'buses': {bus_id: {**bus, 'level': self._bus_levels.get(bus_id, bus['gain'])}
+                          for bus_id, bus in self.buses.items()},
+                'subsonic_frequency': self.subsonic_frequency,
+                'hrtf': self.spatializer.name if self.spatializer is not None else None,
+                'reverb': self.reverb.name if self.reverb is not None else None,
+                'realtime': {name: item['applied'] for name, item in self.realtime_report.items()},
                 'frequency_spectrum': self._get_frequency_spectrum(active_tones)
             }
             
+            self._skipped_tones.clear()
+            notices, self._notices = self._notices, []
             self.stats_updated.emit(stats)
         finally:
             self.mutex.unlock()
+        
+        for name in notices:
+            self.event_notified.emit(name)
+        
+        for step in stats['governor_steps']:
+            print(f"⚠️  Carga DSP {step['load'] * 100:.0f}%: calidad '{step['mode']}'"
+                  f", voces silenciadas {step['stolen_voices']}")
     
     def _estimate_cpu_load(self):
         """Estimación simple de carga de CPU"""
@@ -285,7 +1699,12 @@ class AudioThread(QThread):
         for tone in active_tones:
             freq = tone['frequency']
             wave_type = tone['wave_type']
-            if wave_type not in ['white_noise', 'pink_noise', 'brown_noise']:
+            if wave_type == 'binaural':
+                # Los dos oídos: portadora ∓ la mitad del pulso
+                half_beat = float(tone['options'].get('beat', 0.0)) / 2
+                for ear_freq in (freq - half_beat, freq + half_beat):
+                    spectrum[ear_freq] = spectrum.get(ear_freq, 0) + tone['volume']
+            elif not is_noise_type(wave_type):
                 if freq in spectrum:
                     spectrum[freq] += tone['volume']
                 else:
@@ -293,6 +1712,29 @@ class AudioThread(QThread):
         return spectrum
     
     def run(self):
-        """Loop principal del hilo"""
+        """
+        Loop principal del hilo. Sin dispositivo de salida renderiza aquí
+        los bloques al ritmo del reloj, para que la escena avance y la
+        toma de grabación reciba audio.
+        """
+        next_block = time.perf_counter()
         while self.running:
+            if not SOUNDDEVICE_AVAILABLE:
+                now = time.perf_counter()
+                if now - next_block > 1.0:
+                    next_block = now  # Tras una pausa larga no se recupera el atraso
+                while next_block <= now and self.running:
+                    self._render_simulated_block()
+                    next_block += self.buffer_size / self.sample_rate
             time.sleep(0.01)  # 10ms sleep
+    
+    def _render_simulated_block(self):
+        """Renderiza un bloque en modo simulado y lo entrega a la toma de grabación"""
+        self.mutex.lock()
+        try:
+            buffer = self._render_block(self.buffer_size)
+        finally:
+            self.mutex.unlock()
+        tap = self.recording_tap
+        if tap is not None:
+            tap.push(buffer)
@@ -0,0 +1,315 @@
+"""
+Líneas de retardo fraccionario: ensanchamiento Haas, chorus y eco para tonos y buses
+
+Los búferes circulares se reservan al crear cada efecto y las lecturas
+interpoladas se hacen por bloques completos. Los parámetros se suavizan
+entre bloques para poder cambiarlos en vivo sin clics.
+"""
+
+import numpy as np
+
+from ..utils.constants import AudioConstants
+
+DELAY_TYPES = ('haas', 'chorus', 'echo')
+
+# Nivel por debajo del cual las repeticiones del eco se consideran extinguidas (-80 dB)
+SILENCE_LEVEL = 1e-4
+
+
+class DelayLine:
+    """Búfer circular (muestras × canales) con lecturas de retardo fraccionario"""
+
+    def __init__(self, max_delay, channels, block_frames=4096):
+        self.max_delay = int(max_delay)
+        size = 1 << int(np.ceil(np.log2(self.max_delay + block_frames)))
+        self._buffer = np.zeros((size, channels), dtype=np.float32)
+        self._mask = size - 1
+        self._columns = np.arange(channels)
+        self.time = 0  # Muestra absoluta de la próxima escritura
+
+    @property
+    def channels(self):
+        return self._buffer.shape[1]
+
+    def ensure_capacity(self, frames):
+        """Amplía el búfer si un bloque no cabe junto con el retardo máximo"""
+        size = self._buffer.shape[0]
+        if self.max_delay + frames <= size:
+            return
+        grown_size = 1 << int(np.ceil(np.log2(self.max_delay + frames)))
+        times = self.time - size + np.arange(size)
+        grown = np.zeros((grown_size, self.channels), dtype=np.float32)
+        grown[times & (grown_size - 1)] = self._buffer[times & self._mask]
+        self._buffer = grown
+        self._mask = grown_size - 1
+
+    def write(self, block):
+        frames = len(block)
+        self._buffer[(self.time + np.arange(frames)) & self._mask] = block.reshape(frames, -1)
+        self.time += frames
+
+    def read(self, start, delays):
+        """
+        Lee las muestras de los tiempos `start + n - delays[n]` con
+        interpolación lineal; `delays` (muestras) es (n,) o (n × canales).
+        """
+        delays = np.asarray(delays, dtype=np.float64)
+        frames = len(delays)
+        positions = (start + np.arange(frames)).reshape((frames,) + (1,) * (delays.ndim - 1)) - delays
+        if positions.ndim == 1:
+            positions = positions[:, None]
+        index = np.floor(positions).astype(np.int64)
+        fraction = (positions - index).astype(np.float32)
+        if index.shape[1] == 1 and self.channels > 1:
+            index = np.repeat(index, self.channels, axis=1)
+            fraction = np.repeat(fraction, self.channels, axis=1)
+        first = self._buffer[index & self._mask, self._columns]
+        second = self._buffer[(index + 1) & self._mask, self._columns]
+        return first + fraction * (second - first)
+
+
+class _SmoothedValue:
+    """Parámetro que se acerca a su objetivo con una constante de tiempo fija"""
+
+    def __init__(self, value):
+        self.value = self.target = float(value)
+
+    def ramp(self, frames, coefficient):
+        """Retorna el valor por muestra del bloque (escalar si ya llegó al objetivo)"""
+        if self.value == self.target:
+            return self.value
+        start = self.value
+        self.value = self.target + (start - self.target) * coefficient
+        if abs(self.value - self.target) < 1e-6:
+            self.value = self.target
+        return np.linspace(start, self.value, frames, endpoint=False)
+
+
+class DelayEffect:
+    """
+    Un efecto de retardo:
+
+    - 'haas': retrasa un canal (`channel`) `time` segundos; una señal mono
+      se convierte en estéreo.
+    - 'chorus': retardo modulado por un LFO (`time`, `depth`, `rate`) con
+      la fase desplazada en cada canal.
+    - 'echo': repeticiones cada `time` segundos con realimentación `feedback`.
+
+    `mix` es la proporción de señal retardada.
+    """
+
+    MAX_TIME = {'haas': 0.05, 'chorus': 0.05, 'echo': AudioConstants.DELAY_MAX_SECONDS}
+    MAX_DEPTH = 0.02
+
+    DEFAULTS = {
+        'haas': {'time': 0.015, 'channel': 1, 'mix': 1.0},
+        'chorus': {'time': 0.015, 'depth': 0.003, 'rate': 0.8, 'mix': 0.5},
+        'echo': {'time': 0.35, 'feedback': 0.35, 'mix': 0.3}
+    }
+
+    def __init__(self, effect_type, sample_rate, channels=1, **params):
+        if effect_type not in DELAY_TYPES:
+            raise ValueError(f"Tipo de retardo desconocido: {effect_type}")
+        self.type = effect_type
+        self.sample_rate = sample_rate
+        values = {**self.DEFAULTS[effect_type], **params}
+        self.channel = int(values.pop('channel', 1))
+        self._params = {name: _SmoothedValue(self._clamp(name, value))
+                        for name, value in values.items()}
+        self._lfo_phase = 0.0
+        self.channels = channels
+        self.reset()
+
+    def _clamp(self, name, value):
+        value = float(value)
+        if name == 'time':
+            return min(max(value, 1.0 / self.sample_rate), self.MAX_TIME[self.type])
+        if name == 'depth':
+            return min(max(value, 0.0), self.MAX_DEPTH)
+        if name == 'feedback':
+            return min(max(value, 0.0), 0.95)
+        if name == 'mix':
+            return min(max(value, 0.0), 1.0)
+        return max(value, 0.0)
+
+    def set_params(self, **params):
+        """Nuevos objetivos; los valores se suavizan durante los próximos bloques"""
+        if 'channel' in params:
+            self.channel = int(params.pop('channel'))
+        for name, value in params.items():
+            if name in self._params:
+                self._params[name].target = self._clamp(name, value)
+
+    def settings(self):
+        """Tipo y objetivos actuales de los parámetros (para recrear el efecto)"""
+        values = {name: param.target for name, param in self._params.items()}
+        return {'type': self.type, 'channel': self.channel, **values}
+
+    def reset(self):
+        """Reserva el búfer vacío (la señal del efecto Haas es siempre un canal)"""
+        channels = 1 if self.type == 'haas' else self.channels
+        self._line = DelayLine(self._max_delay_frames(), channels)
+        self._silent_frames = 0
+        self.is_silent = True
+
+    def _max_delay_frames(self):
+        seconds = self.MAX_TIME[self.type]
+        if self.type == 'chorus':
+            seconds += self.MAX_DEPTH
+        return int(seconds * self.sample_rate) + 2
+
+    def _tail_frames(self):
+        """Muestras tras la última entrada no nula hasta que la salida se extingue"""
+        time = max(self._params['time'].value, self._params['time'].target)
+        frames = time * self.sample_rate
+        if self.type == 'chorus':
+            frames += self._params['depth'].value * self.sample_rate
+        elif self.type == 'echo':
+            feedback = self._params['feedback'].value
+            if feedback > 0.0:
+                frames *= 1 + np.ceil(np.log(SILENCE_LEVEL) / np.log(feedback))
+        return int(frames) + 2
+
+    def process(self, block):
+        """Procesa un bloque (muestras,) o (muestras × canales) y retorna el resultado"""
+        frames = len(block)
+        active = block.any()
+        if not active and self.is_silent:
+            if self.type == 'haas' and block.ndim == 1:
+                return np.zeros((frames, 2), dtype=np.float32)
+            return block
+
+        if self.type != 'haas' and self.channels != (block.shape[1] if block.ndim == 2 else 1):
+            self.channels = block.shape[1] if block.ndim == 2 else 1
+            self.reset()
+        self._line.ensure_capacity(frames)
+
+        coefficient = np.exp(-frames / (AudioConstants.DELAY_SMOOTHING_TIME * self.sample_rate))
+        time = self._params['time'].ramp(frames, coefficient)
+        mix = self._params['mix'].ramp(frames, coefficient)
+
+        if np.ndim(mix):
+            mix = mix.astype(np.float32)
+        if self.type == 'haas':
+            result = self._process_haas(block, time, mix)
+        else:
+            if self.type == 'chorus':
+                wet = self._process_chorus(block, time, coefficient)
+            else:
+                wet = self._process_echo(block, time, coefficient)
+            if np.ndim(mix) and block.ndim == 2:
+                mix = mix[:, None]
+            result = (block + mix * (wet - block)).astype(np.float32)
+
+        self._silent_frames = 0 if active else self._silent_frames + frames
+        self.is_silent = self._silent_frames > self._tail_frames()
+        return result
+
+    def _process_haas(self, block, time, mix):
+        """Retrasa un canal; la entrada mono se duplica en dos canales"""
+        output = (block.copy() if block.ndim == 2
+                  else np.repeat(block[:, None], 2, axis=1)).astype(np.float32)
+        channel = min(self.channel, output.shape[1] - 1)
+        dry = output[:, channel].copy()
+        start = self._line.time
+        self._line.write(dry)
+        delays = np.broadcast_to(np.asarray(time) * self.sample_rate, (len(block),))
+        wet = self._line.read(start, delays)[:, 0]
+        output[:, channel] = dry + mix * (wet - dry)
+        return output
+
+    def _process_chorus(self, block, time, coefficient):
+        """Retardo modulado; cada canal con su fase de LFO"""
+        frames = len(block)
+        rate = self._params['rate'].ramp(frames, coefficient)
+        depth = self._params['depth'].ramp(frames, coefficient)
+        increments = 2 * np.pi * np.broadcast_to(rate, (frames,)) / self.sample_rate
+        phase = self._lfo_phase + np.cumsum(increments) - increments
+        self._lfo_phase = float((phase[-1] + increments[-1]) % (2 * np.pi))
+
+        channels = self._line.channels
+        offsets = np.arange(channels) * (np.pi / 2)
+        lfo = np.sin(phase[:, None] + offsets)
+        delays = (np.asarray(time)[..., None] + np.asarray(depth)[..., None] * lfo) * self.sample_rate
+        delays = np.maximum(delays, 1.0)
+
+        start = self._line.time
+        self._line.write(block)
+        wet = self._line.read(start, delays)
+        return wet if block.ndim == 2 else wet[:, 0]
+
+    def _process_echo(self, block, time, coefficient):
+        """
+        Eco realimentado: se procesa en tramos no más largos que el retardo
+        para que cada tramo lea solo muestras ya escritas.
+        """
+        frames = len(block)
+        feedback = self._params['feedback'].ramp(frames, coefficient)
+        delays = np.broadcast_to(np.asarray(time) * self.sample_rate, (frames,))
+        feedback = np.broadcast_to(np.asarray(feedback, dtype=np.float32), (frames,))
+        source = block.reshape(frames, -1)
+        wet = np.empty_like(source)
+
+        position = 0
+        while position < frames:
+            chunk = max(1, min(frames - position, int(delays[position:].min()) - 1))
+            span = slice(position, position + chunk)
+            start = self._line.time
+            delayed = self._line.read(start, delays[span])
+            wet[span] = delayed
+            self._line.write(source[span] + feedback[span, None] * delayed)
+            position += chunk
+        return wet.reshape(block.shape)
+
+
+class DelayChain:
+    """
+    Cadena de efectos de retardo. Cada efecto es un dict {'type', ...parámetros};
+    si los tipos no cambian, los nuevos parámetros se suavizan sin reiniciar los búferes.
+    """
+
+    def __init__(self, effects, sample_rate, channels=1):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.effects = []
+        self.configure(effects)
+
+    @property
+    def is_silent(self):
+        return all(effect.is_silent for effect in self.effects)
+
+    def configure(self, effects):
+        effects = [dict(effect) for effect in effects]
+        types = [effect.get('type', 'echo') for effect in effects]
+        if types != [effect.type for effect in self.effects]:
+            self.effects = []
+            channels = self.channels
+            for effect in effects:
+                effect_type = effect.pop('type', 'echo')
+                self.effects.append(DelayEffect(effect_type, self.sample_rate, channels, **effect))
+                if effect_type == 'haas':
+                    channels = max(channels, 2)
+            return
+        for effect, params in zip(self.effects, effects):
+            params.pop('type', None)
+            effect.set_params(**params)
+
+    def settings(self):
+        """Lista de dicts que `configure` acepta para reproducir la cadena"""
+        return [effect.settings() for effect in self.effects]
+
+    def set_sample_rate(self, sample_rate):
+        """Los búferes dependen de la frecuencia: se recrean vacíos"""
+        self.sample_rate = sample_rate
+        for effect in self.effects:
+            effect.sample_rate = sample_rate
+            effect.reset()
+
+    def reset(self):
+        for effect in self.effects:
+            effect.reset()
+
+    def process(self, block):
+        for effect in self.effects:
+            block = effect.process(block)
+        return block
@@ -0,0 +1,69 @@
+"""
+Conversión de float a enteros con dither TPDF y conformación de ruido opcional
+
+Todo se calcula por tramos con operaciones vectorizadas. La conformación
+de ruido es realimentación de error de primer orden (el error de
+cuantización sale filtrado por 1 - z⁻¹, lejos de los graves y medios).
+Ese bucle, que en principio es muestra a muestra, se resuelve sin bucle:
+si S[n] es la suma acumulada de la entrada (en LSB) menos el error
+arrastrado, la suma acumulada de la salida entera es exactamente
+round(S[n] + dither[n]), así que la salida es la diferencia de esa serie.
+"""
+
+import numpy as np
+
+# Muestras por tramo: acota la memoria temporal y el tamaño de las sumas acumuladas
+CHUNK_FRAMES = 65536
+
+
+class Ditherer:
+    """
+    Cuantizador a enteros de `bits` bits (muestras × canales float en [-1, 1]
+    → int32 en el rango del formato). El error de la conformación se
+    arrastra entre bloques, así que la conversión es continua.
+    """
+
+    def __init__(self, bits, channels, dither=True, noise_shaping=False, seed=None):
+        self.bits = int(bits)
+        self.channels = int(channels)
+        self.scale = float((1 << (self.bits - 1)) - 1)
+        self.minimum = -(1 << (self.bits - 1))
+        self.maximum = (1 << (self.bits - 1)) - 1
+        # Por debajo de la resolución de float32 (32 bits) el dither no aporta nada
+        self.dither = dither and self.bits <= 24
+        self.noise_shaping = noise_shaping and self.dither
+        self._rng = np.random.default_rng(seed)
+        self.reset()
+
+    def reset(self):
+        self._error = np.zeros(self.channels)
+
+    def process(self, block):
+        """Retorna el bloque cuantizado (int32, muestras × canales)"""
+        block = np.asarray(block)
+        if block.ndim == 1:
+            block = block[:, None]
+        output = np.empty(block.shape, dtype=np.int32)
+        for start in range(0, len(block), CHUNK_FRAMES):
+            span = slice(start, start + CHUNK_FRAMES)
+            output[span] = self._quantize(block[span])
+        return output
+
+    def _tpdf(self, shape):
+        """Ruido de densidad triangular de ±1 LSB (diferencia de dos uniformes)"""
+        return self._rng.random(shape) - self._rng.random(shape)
+
+    def _quantize(self, chunk):
+        scaled = np.clip(chunk, -1.0, 1.0).astype(np.float64) * self.scale
+        if not self.dither:
+            values = np.round(scaled)
+        elif not self.noise_shaping:
+            values = np.round(scaled + self._tpdf(scaled.shape))
+        else:
+            sums = np.cumsum(scaled, axis=0)
+            sums -= self._error
+            output_sums = np.round(sums + self._tpdf(scaled.shape))
+            values = np.diff(output_sums, axis=0, prepend=0.0)
+            # Error de la última muestra; se acota por si hubo recorte a fondo de escala
+            self._error = np.clip(output_sums[-1] - sums[-1], -2.0, 2.0)
+        return np.clip(values, self.minimum, self.maximum)
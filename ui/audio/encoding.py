@@ -0,0 +1,240 @@
+"""
+Codificación de grabaciones en segundo plano
+
+El grabador escribe PCM flotante en un WAV intermedio y, al terminar, un
+grupo de procesos lo codifica al formato final (FLAC, y MP3 u Opus si la
+libsndfile instalada los soporta). Varias codificaciones pueden correr
+en paralelo mientras se sigue grabando; el progreso llega a la interfaz
+por señales y el WAV intermedio se elimina al terminar.
+"""
+
+import multiprocessing
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from ..utils.constants import AudioConstants
+from .dither import Ditherer
+
+try:
+    import soundfile as sf
+    SOUNDFILE_AVAILABLE = True
+except ImportError:
+    SOUNDFILE_AVAILABLE = False
+
+# Formato de la interfaz → (formato, subtipo) de soundfile
+ENCODER_FORMATS = {
+    'FLAC': ('FLAC', 'PCM_24'),
+    'MP3': ('MP3', 'MPEG_LAYER_III'),
+    'OPUS': ('OGG', 'OPUS')
+}
+
+# Frecuencias que admiten los codificadores con pérdida
+ENCODER_SAMPLE_RATES = {
+    'MP3': (8000, 11025, 12000, 16000, 22050, 24000, 32000, 44100, 48000),
+    'OPUS': (8000, 12000, 16000, 24000, 48000)
+}
+
+# Bits de los subtipos enteros a los que se aplica dither al codificar
+_SUBTYPE_BITS = {'PCM_16': 16, 'PCM_24': 24}
+
+# Extensión de los WAV intermedios que esperan codificación
+PENDING_SUFFIX = '.rec.wav'
+
+# Cola de progreso del proceso trabajador (la asigna `_init_worker`)
+_progress_queue = None
+
+
+def available_formats():
+    """Formatos de grabación utilizables: WAV siempre, el resto según libsndfile"""
+    formats = ['WAV']
+    if SOUNDFILE_AVAILABLE:
+        sf_formats = sf.available_formats()
+        for name, (sf_format, subtype) in ENCODER_FORMATS.items():
+            if sf_format in sf_formats and subtype in sf.available_subtypes(sf_format):
+                formats.append(name)
+    return formats
+
+
+def encoder_sample_rate(format_name, sample_rate):
+    """Frecuencia de grabación compatible con el codificador (MP3 y Opus no pasan de 48 kHz)"""
+    rates = ENCODER_SAMPLE_RATES.get(format_name.upper())
+    if rates is not None and sample_rate not in rates:
+        return 48000
+    return sample_rate
+
+
+def encoder_subtype(format_name, subtype):
+    """Subtipo final para la profundidad elegida: FLAC admite 16 o 24 bits"""
+    sf_format, default = ENCODER_FORMATS[format_name.upper()]
+    if sf_format == 'FLAC':
+        return 'PCM_16' if subtype == 'PCM_16' else 'PCM_24'
+    return default
+
+
+def pending_path(output_file):
+    """Ruta del WAV intermedio de una grabación que se codificará a `output_file`"""
+    return os.path.splitext(str(output_file))[0] + PENDING_SUFFIX
+
+
+def _init_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def encode_file(source, target, format_name, subtype='PCM_24', noise_shaping=False):
+    """
+    Trabajador: codifica el WAV `source` en `target` por bloques, informando
+    el progreso, y elimina `source` al terminar. Retorna `target`.
+
+    Los destinos enteros (FLAC) se cuantizan aquí con dither TPDF y se
+    entregan a libsndfile como int32 alineados arriba, que los convierte
+    sin volver a redondear.
+    """
+    sf_format = ENCODER_FORMATS[format_name.upper()][0]
+    subtype = encoder_subtype(format_name, subtype)
+    bits = _SUBTYPE_BITS.get(subtype)
+    block_frames = AudioConstants.ENCODING_BLOCK_FRAMES
+    try:
+        with sf.SoundFile(source) as reader:
+            total = max(1, reader.frames)
+            ditherer = (Ditherer(bits, reader.channels, noise_shaping=noise_shaping)
+                        if bits else None)
+            with sf.SoundFile(target, 'w', samplerate=reader.samplerate, channels=reader.channels,
+                              format=sf_format, subtype=subtype) as writer:
+                done = 0
+                reported = -1
+                for block in reader.blocks(blocksize=block_frames, dtype='float32', always_2d=True):
+                    if ditherer is not None:
+                        writer.write(ditherer.process(block) << (32 - bits))
+                    else:
+                        writer.write(block)
+                    done += len(block)
+                    percent = done * 100 // total
+                    if percent != reported and _progress_queue is not None:
+                        _progress_queue.put((target, percent))
+                        reported = percent
+    except Exception:
+        if os.path.exists(target):
+            os.remove(target)  # El WAV intermedio se conserva para reintentar
+        raise
+    os.remove(source)
+    return target
+
+
+class EncodingPipeline(QObject):
+    """
+    Cola de codificaciones sobre un ProcessPoolExecutor. Los procesos se
+    crean con la primera tarea; el estado se consulta con un QTimer en el
+    hilo de la interfaz, así que las señales nunca se emiten desde otro hilo.
+    """
+
+    encoding_started = Signal(str)        # Archivo destino
+    encoding_progress = Signal(str, int)  # Archivo destino, porcentaje
+    encoding_finished = Signal(str)       # Archivo destino
+    encoding_error = Signal(str, str)     # Archivo destino, mensaje
+    drained = Signal()                    # Ya no quedan codificaciones en curso
+
+    def __init__(self, max_workers=None, parent=None):
+        super().__init__(parent)
+        self.max_workers = max_workers or AudioConstants.ENCODING_WORKERS
+        self._executor = None
+        self._progress_queue = None
+        self._jobs = {}  # destino → Future
+        self._sources = {}  # destino → WAV intermedio
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(100)
+        self._poll_timer.timeout.connect(self._poll)
+
+    @property
+    def active_jobs(self):
+        return len(self._jobs)
+
+    def _ensure_executor(self):
+        if self._executor is None:
+            # 'spawn': no se heredan los hilos de audio ni de Qt del proceso principal
+            context = multiprocessing.get_context('spawn')
+            self._progress_queue = context.Queue()
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context,
+                                                 initializer=_init_worker,
+                                                 initargs=(self._progress_queue,))
+        return self._executor
+
+    def submit(self, source, target, format_name, subtype='PCM_24', noise_shaping=False):
+        """Encola la codificación de `source` (WAV) en `target` con la profundidad `subtype`"""
+        if not SOUNDFILE_AVAILABLE:
+            raise RuntimeError("La codificación requiere soundfile")
+        target = str(target)
+        future = self._ensure_executor().submit(encode_file, str(source), target, format_name,
+                                                subtype, noise_shaping)
+        self._jobs[target] = future
+        self._sources[target] = str(source)
+        self.encoding_started.emit(target)
+        if not self._poll_timer.isActive():
+            self._poll_timer.start()
+        print(f"🗜️  Codificando {os.path.basename(target)} ({format_name.upper()})")
+
+    def _poll(self):
+        """Reenvía el progreso de los trabajadores y el resultado de las tareas terminadas"""
+        while True:
+            try:
+                target, percent = self._progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            if target in self._jobs:
+                self.encoding_progress.emit(target, percent)
+
+        for target, future in list(self._jobs.items()):
+            if not future.done():
+                continue
+            del self._jobs[target]
+            del self._sources[target]
+            try:
+                future.result()
+            except Exception as e:
+                self.encoding_error.emit(target, str(e))
+            else:
+                self.encoding_finished.emit(target)
+
+        if not self._jobs and self._poll_timer.isActive():
+            self._poll_timer.stop()
+            self.drained.emit()
+
+    def shutdown(self, wait=True):
+        """Cierra el grupo de procesos; con `wait` termina antes las codificaciones en curso"""
+        if self._executor is None:
+            return
+        if wait and self._jobs:
+            print(f"⏳ Esperando {len(self._jobs)} codificación(es) pendiente(s)...")
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+        self._poll()
+        self._executor = None
+
+    def cancel(self):
+        """
+        Interrumpe las codificaciones sin esperar: termina los procesos, borra
+        los destinos a medio escribir y conserva los WAV intermedios para
+        reintentar. Retorna los intermedios conservados.
+        """
+        if self._executor is None:
+            return []
+        # ProcessPoolExecutor no permite terminar sus procesos hasta Python 3.14
+        for process in list((self._executor._processes or {}).values()):
+            process.terminate()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._progress_queue = None
+        self._poll_timer.stop()
+
+        kept = []
+        for target, source in self._sources.items():
+            # Sin intermedio la tarea llegó a terminar y el destino está completo
+            if os.path.exists(source):
+                if os.path.exists(target):
+                    os.remove(target)
+                kept.append(source)
+        self._jobs = {}
+        self._sources = {}
+        return kept
@@ -0,0 +1,128 @@
+"""
+Envolvente ADSR evaluada por bloques para activar/desactivar tonos sin clics
+"""
+
+import numpy as np
+
+# Nivel por debajo del cual una liberación se considera terminada (-80 dB)
+SILENCE_LEVEL = 1e-4
+
+
+class ADSREnvelope:
+    """Envolvente lineal ADSR que genera bloques completos de ganancia"""
+
+    IDLE = 'idle'
+    ATTACK = 'attack'
+    DECAY = 'decay'
+    SUSTAIN = 'sustain'
+    RELEASE = 'release'
+
+    def __init__(self, sample_rate, attack=0.02, decay=0.05, sustain=1.0, release=0.08):
+        self.sample_rate = sample_rate
+        self.stage = self.IDLE
+        self.level = 0.0
+        self._release_step = 0.0
+        self.configure(attack, decay, sustain, release)
+
+    def configure(self, attack=None, decay=None, sustain=None, release=None):
+        """Actualiza los tiempos (segundos) y el nivel de sostenido"""
+        if attack is not None:
+            self.attack = max(0.0, float(attack))
+        if decay is not None:
+            self.decay = max(0.0, float(decay))
+        if sustain is not None:
+            self.sustain = max(0.0, min(1.0, float(sustain)))
+        if release is not None:
+            self.release = max(0.0, float(release))
+
+    def set_sample_rate(self, sample_rate):
+        """Cambia la frecuencia de muestreo usada para convertir los tiempos"""
+        # Una liberación en curso conserva su duración restante en segundos
+        self._release_step *= self.sample_rate / sample_rate
+        self.sample_rate = sample_rate
+
+    def gate_on(self):
+        """Inicia el ataque desde el nivel actual"""
+        self.stage = self.ATTACK
+
+    def gate_off(self):
+        """Inicia la liberación desde el nivel actual"""
+        if self.stage == self.IDLE:
+            return
+        self.stage = self.RELEASE
+        release_frames = self.release * self.sample_rate
+        self._release_step = self.level / release_frames if release_frames >= 1 else self.level
+
+    @property
+    def is_idle(self):
+        """Indica si la envolvente terminó y el tono está en silencio"""
+        return self.stage == self.IDLE
+
+    @property
+    def is_silent(self):
+        """Indica si la ganancia es nula (en reposo o sostenido a nivel cero)"""
+        return self.stage == self.IDLE or (self.stage == self.SUSTAIN and self.sustain <= 0.0)
+
+    def process(self, frames):
+        """
+        Retorna la ganancia para los próximos `frames` muestras.
+
+        En las etapas estables retorna un escalar para no multiplicar
+        bloques completos innecesariamente.
+        """
+        if self.stage == self.SUSTAIN:
+            return self.sustain
+        if self.stage == self.RELEASE and self.level <= SILENCE_LEVEL:
+            # La cola inaudible de la liberación se corta a cero
+            self.level = 0.0
+            self.stage = self.IDLE
+        if self.stage == self.IDLE:
+            return 0.0
+
+        gain = np.empty(frames)
+        filled = 0
+        while filled < frames:
+            remaining = frames - filled
+            if self.stage == self.ATTACK:
+                filled += self._ramp(gain, filled, remaining, 1.0, self.attack)
+                if self.level >= 1.0:
+                    self.stage = self.DECAY
+            elif self.stage == self.DECAY:
+                filled += self._ramp(gain, filled, remaining, self.sustain, self.decay)
+                if self.level <= self.sustain:
+                    self.stage = self.SUSTAIN
+            elif self.stage == self.RELEASE:
+                filled += self._ramp(gain, filled, remaining, 0.0, None)
+                if self.level <= 0.0:
+                    self.stage = self.IDLE
+            else:
+                # Sostenido o silencio: el resto del bloque es constante
+                gain[filled:] = self.sustain if self.stage == self.SUSTAIN else 0.0
+                filled = frames
+        return gain
+
+    def _ramp(self, gain, start, count, target, duration):
+        """Escribe un tramo lineal hacia `target` y retorna las muestras usadas"""
+        if duration is None:
+            step = self._release_step
+        else:
+            frames_total = duration * self.sample_rate
+            step = 1.0 / frames_total if frames_total >= 1 else 1.0
+
+        distance = abs(target - self.level)
+        if step <= 0.0 or distance <= 0.0:
+            self.level = target
+            return 0
+
+        needed = int(np.ceil(distance / step))
+        used = min(count, needed)
+        direction = 1.0 if target > self.level else -1.0
+        segment = self.level + direction * step * np.arange(1, used + 1)
+        if direction > 0:
+            np.minimum(segment, target, out=segment)
+        else:
+            np.maximum(segment, target, out=segment)
+
+        gain[start:start + used] = segment
+        self.level = float(segment[-1])
+        return used
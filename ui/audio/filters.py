@@ -0,0 +1,248 @@
+"""
+Etapa de filtros biquad (RBJ) con estado entre bloques, para tonos y buses
+"""
+
+import numpy as np
+
+try:
+    from scipy.signal import sosfilt
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+    print("SciPy no disponible - Los filtros quedan desactivados")
+
+FILTER_TYPES = ('lowpass', 'highpass', 'bandpass', 'notch', 'peak', 'lowshelf', 'highshelf')
+
+# Por debajo de este valor el estado del filtro se anula (evita denormales)
+DENORMAL_THRESHOLD = 1e-15
+
+
+def biquad_sos(filter_type, frequency, sample_rate, q=0.707, gain_db=0.0):
+    """
+    Coeficientes de una sección biquad (fila SOS [b0 b1 b2 1 a1 a2]) según
+    las fórmulas del "Audio EQ Cookbook" de R. Bristow-Johnson.
+    """
+    if filter_type not in FILTER_TYPES:
+        raise ValueError(f"Tipo de filtro desconocido: {filter_type}")
+
+    frequency = min(max(float(frequency), 1.0), 0.49 * sample_rate)
+    q = max(float(q), 0.01)
+    w0 = 2 * np.pi * frequency / sample_rate
+    cos_w0 = np.cos(w0)
+    alpha = np.sin(w0) / (2 * q)
+    a = 10 ** (gain_db / 40.0)
+
+    if filter_type == 'lowpass':
+        b = [(1 - cos_w0) / 2, 1 - cos_w0, (1 - cos_w0) / 2]
+        den = [1 + alpha, -2 * cos_w0, 1 - alpha]
+    elif filter_type == 'highpass':
+        b = [(1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2]
+        den = [1 + alpha, -2 * cos_w0, 1 - alpha]
+    elif filter_type == 'bandpass':
+        b = [alpha, 0.0, -alpha]  # Ganancia 0 dB en el centro
+        den = [1 + alpha, -2 * cos_w0, 1 - alpha]
+    elif filter_type == 'notch':
+        b = [1.0, -2 * cos_w0, 1.0]
+        den = [1 + alpha, -2 * cos_w0, 1 - alpha]
+    elif filter_type == 'peak':
+        b = [1 + alpha * a, -2 * cos_w0, 1 - alpha * a]
+        den = [1 + alpha / a, -2 * cos_w0, 1 - alpha / a]
+    else:
+        sqrt_a_alpha = 2 * np.sqrt(a) * alpha
+        if filter_type == 'lowshelf':
+            b = [a * ((a + 1) - (a - 1) * cos_w0 + sqrt_a_alpha),
+                 2 * a * ((a - 1) - (a + 1) * cos_w0),
+                 a * ((a + 1) - (a - 1) * cos_w0 - sqrt_a_alpha)]
+            den = [(a + 1) + (a - 1) * cos_w0 + sqrt_a_alpha,
+                   -2 * ((a - 1) + (a + 1) * cos_w0),
+                   (a + 1) + (a - 1) * cos_w0 - sqrt_a_alpha]
+        else:
+            b = [a * ((a + 1) + (a - 1) * cos_w0 + sqrt_a_alpha),
+                 -2 * a * ((a - 1) + (a + 1) * cos_w0),
+                 a * ((a + 1) + (a - 1) * cos_w0 - sqrt_a_alpha)]
+            den = [(a + 1) - (a - 1) * cos_w0 + sqrt_a_alpha,
+                   2 * ((a - 1) - (a + 1) * cos_w0),
+                   (a + 1) - (a - 1) * cos_w0 - sqrt_a_alpha]
+
+    a0 = den[0]
+    return np.array([b[0] / a0, b[1] / a0, b[2] / a0, 1.0, den[1] / a0, den[2] / a0])
+
+
+class FilterChain:
+    """
+    Cascada de biquads procesada por bloques completos con `sosfilt`.
+
+    Cada banda es un dict {'type', 'frequency', 'q', 'gain_db'}; los
+    coeficientes se recalculan solo cuando cambian sus parámetros y el
+    estado `zi` se conserva entre callbacks.
+    """
+
+    def __init__(self, bands, sample_rate):
+        self.sample_rate = sample_rate
+        self.bands = []
+        self._sos = np.zeros((0, 6))
+        self._zi = None
+        self.configure(bands)
+
+    def configure(self, bands):
+        """Actualiza las bandas; el estado se conserva si no cambia su número"""
+        bands = [self._normalize(band) for band in bands]
+        if len(bands) != len(self.bands):
+            self._zi = None
+            self._sos = np.zeros((len(bands), 6))
+            self.bands = [None] * len(bands)
+        for index, band in enumerate(bands):
+            if band != self.bands[index]:
+                self._sos[index] = biquad_sos(band['type'], band['frequency'], self.sample_rate,
+                                              band['q'], band['gain_db'])
+                self.bands[index] = band
+
+    def set_sample_rate(self, sample_rate):
+        """Recalcula los coeficientes para otra frecuencia de muestreo"""
+        self.sample_rate = sample_rate
+        bands, self.bands = self.bands, []
+        self.configure(bands)
+        self._zi = None
+
+    @property
+    def is_silent(self):
+        """Indica si el estado interno se extinguió (sin cola pendiente)"""
+        return self._zi is None or not self._zi.any()
+
+    def reset(self):
+        self._zi = None
+
+    def process(self, block):
+        """Filtra un bloque mono (muestras,) o multicanal (muestras × canales)"""
+        if not SCIPY_AVAILABLE or not self.bands:
+            return block
+
+        state_shape = (len(self.bands), 2) + block.shape[1:]
+        if self._zi is None or self._zi.shape != state_shape:
+            self._zi = np.zeros(state_shape)
+        output, self._zi = sosfilt(self._sos, block, axis=0, zi=self._zi)
+        self._zi[np.abs(self._zi) < DENORMAL_THRESHOLD] = 0.0
+        return output.astype(np.float32)
+
+    @staticmethod
+    def _normalize(band):
+        return {
+            'type': band.get('type', 'lowpass'),
+            'frequency': float(band.get('frequency', 1000.0)),
+            'q': float(band.get('q', 0.707)),
+            'gain_db': float(band.get('gain_db', 0.0))
+        }
+
+
+class DCBlocker:
+    """
+    Bloqueador de continua y[n] = x[n] - x[n-1] + R·y[n-1], procesado en
+    el lugar y sin SciPy.
+
+    La recursión se resuelve por tramos con su forma cerrada
+    y[n] = Rⁿ·(R·y[-1] + Σ R⁻ᵏ·d[k]); los tramos cortos mantienen acotado R⁻ᵏ.
+    """
+
+    CHUNK = 256
+
+    def __init__(self, sample_rate, channels, cutoff=5.0):
+        self.cutoff = cutoff
+        self.channels = channels
+        self.set_sample_rate(sample_rate)
+
+    def set_sample_rate(self, sample_rate):
+        self.sample_rate = sample_rate
+        self.coefficient = np.exp(-2 * np.pi * self.cutoff / sample_rate)
+        powers = np.arange(self.CHUNK + 1, dtype=np.float64)
+        self._growth = self.coefficient ** powers[1:]  # R^(n+1)
+        self._decay = self.coefficient ** -powers[:-1]  # R^(-k)
+        self.reset()
+
+    def reset(self):
+        self._last_input = np.zeros(self.channels)
+        self._last_output = np.zeros(self.channels)
+
+    def process(self, buffer):
+        """Filtra `buffer` (muestras × canales) en el lugar y lo retorna"""
+        if buffer.shape[1] != self.channels:
+            self.channels = buffer.shape[1]
+            self.reset()
+        frames = len(buffer)
+        for start in range(0, frames, self.CHUNK):
+            block = buffer[start:start + self.CHUNK]
+            count = len(block)
+            difference = np.diff(block, axis=0, prepend=self._last_input[None, :].astype(block.dtype))
+            self._last_input = block[-1].astype(np.float64)
+            accumulated = np.cumsum(difference * self._decay[:count, None], axis=0)
+            output = self._growth[:count, None] * self._last_output + \
+                (self._growth[:count, None] / self.coefficient) * accumulated
+            self._last_output = output[-1]
+            self._last_output[np.abs(self._last_output) < DENORMAL_THRESHOLD] = 0.0
+            block[:] = output
+        return buffer
+
+
+class SubsonicFilter:
+    """
+    Paso alto Butterworth de 4º orden (dos biquads RBJ con los Q de
+    Butterworth) procesado en el lugar y sin SciPy.
+
+    Cada sección aplica su numerador como FIR y separa sus polos
+    conjugados p, p̄ por fracciones parciales: y[n] = 2·Re(u[n]) con
+    u[n] = A·v[n] + p·u[n-1] y A = p / (p - p̄). Esa recursión compleja de
+    primer orden se resuelve por tramos como en `DCBlocker`.
+    """
+
+    CHUNK = 256
+    SECTION_Q = (0.5412, 1.3066)
+
+    def __init__(self, sample_rate, channels, frequency):
+        self.frequency = float(frequency)
+        self.channels = channels
+        self.set_sample_rate(sample_rate)
+
+    def set_sample_rate(self, sample_rate):
+        self.sample_rate = sample_rate
+        powers = np.arange(self.CHUNK + 1, dtype=np.float64)
+        self._sections = []
+        for q in self.SECTION_Q:
+            b0, b1, b2, _, a1, a2 = biquad_sos('highpass', self.frequency, sample_rate, q)
+            pole = (-a1 + np.sqrt(complex(a1 * a1 - 4 * a2))) / 2  # Q > 0.5: polos complejos
+            self._sections.append({
+                'numerator': (b0, b1, b2),
+                'residue': pole / (pole - np.conj(pole)),
+                'growth': pole ** powers[1:],  # p^(n+1)
+                'scale': pole ** powers[:-1],  # p^n
+                'decay': pole ** -powers[:-1]  # p^(-k)
+            })
+        self.reset()
+
+    def reset(self):
+        self._inputs = [np.zeros((2, self.channels)) for _ in self._sections]
+        self._states = [np.zeros(self.channels, dtype=np.complex128) for _ in self._sections]
+
+    def process(self, buffer):
+        """Filtra `buffer` (muestras × canales) en el lugar y lo retorna"""
+        if buffer.shape[1] != self.channels:
+            self.channels = buffer.shape[1]
+            self.reset()
+        frames = len(buffer)
+        signal = buffer.astype(np.float64)
+        for index, section in enumerate(self._sections):
+            b0, b1, b2 = section['numerator']
+            extended = np.concatenate([self._inputs[index], signal])
+            self._inputs[index] = extended[-2:].copy()
+            driven = (b0 * extended[2:] + b1 * extended[1:-1] + b2 * extended[:-2]) * section['residue']
+            state = self._states[index]
+            for start in range(0, frames, self.CHUNK):
+                block = driven[start:start + self.CHUNK]
+                count = len(block)
+                accumulated = np.cumsum(block * section['decay'][:count, None], axis=0)
+                output = section['growth'][:count, None] * state + \
+                    section['scale'][:count, None] * accumulated
+                state = output[-1]
+                signal[start:start + count] = 2 * output.real
+            state[np.abs(state) < DENORMAL_THRESHOLD] = 0.0
+            self._states[index] = state
+        buffer[:] = signal
+        return buffer
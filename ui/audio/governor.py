@@ -0,0 +1,141 @@
+"""
+Gobernador de sobrecarga: degrada la calidad por pasos cuando el render no cumple su plazo
+"""
+
+import math
+import time
+
+
+class OverloadGovernor:
+    """
+    Vigila la carga DSP medida (tiempo de render / duración del bloque) y
+    decide el nivel de calidad del motor.
+
+    Niveles, en orden de degradación (cada uno incluye los anteriores):
+      0 'full'       calidad completa
+      1 'wavetable'  osciladores por tabla de ondas
+      2 'decimated'  ruidos generados a una fracción de la frecuencia
+      3 'stealing'   las voces más débiles se silencian (más en cada paso)
+
+    La carga se evalúa por ventanas de `window` segundos de audio: se baja
+    un paso si supera `high` o hubo un subdesbordamiento, y se recupera un
+    paso tras `recovery` segundos seguidos por debajo de `low`.
+    """
+
+    LEVELS = ('full', 'wavetable', 'decimated', 'stealing')
+    STEALING = 3
+
+    def __init__(self, enabled=True, high=0.8, low=0.5, window=0.5, recovery=2.0, steal_fraction=0.25):
+        self.enabled = enabled
+        self.high = high
+        self.low = low
+        self.window = window
+        self.recovery = recovery
+        self.steal_fraction = steal_fraction
+        self.reset()
+
+    def reset(self):
+        """Vuelve a calidad completa y descarta las mediciones"""
+        self.level = 0
+        self.stolen_voices = 0
+        self.load = 0.0
+        self.peak_load = 0.0
+        self.underflows = 0
+        self.measured = False
+        self._steps = []
+        self._reset_window()
+        self._calm_time = 0.0
+
+    @property
+    def mode(self):
+        return self.LEVELS[self.level]
+
+    def record(self, render_time, block_time, underflow=False, voices=0):
+        """
+        Registra el costo de un bloque.
+
+        `voices` es el número de tonos sonando (para calcular cuántos
+        silenciar). Retorna True si cambió el nivel o las voces silenciadas.
+        """
+        load = render_time / block_time
+        self.load = 0.9 * self.load + 0.1 * load if self.measured else load
+        self.measured = True
+        self._window_time += block_time
+        self._window_busy += render_time
+        self._window_peak = max(self._window_peak, load)
+        if underflow:
+            self._window_underflow = True
+            self.underflows += 1
+
+        if self._window_time < self.window:
+            return False
+
+        window_time = self._window_time
+        window_load = self._window_busy / window_time
+        overloaded = window_load > self.high or self._window_underflow
+        self.peak_load = self._window_peak
+        self._reset_window()
+
+        if not self.enabled:
+            return False
+        if overloaded:
+            self._calm_time = 0.0
+            return self._degrade(window_load, voices)
+        if window_load < self.low:
+            self._calm_time += window_time
+            if self._calm_time >= self.recovery:
+                self._calm_time = 0.0
+                return self._restore(window_load, voices)
+        else:
+            self._calm_time = 0.0
+        return False
+
+    def drain_steps(self):
+        """Retorna y descarta los cambios de nivel ocurridos desde la última llamada"""
+        steps, self._steps = self._steps, []
+        return steps
+
+    def _steal_step(self, voices):
+        return max(1, math.ceil(voices * self.steal_fraction))
+
+    def _degrade(self, load, voices):
+        # Siempre queda al menos la voz más fuerte
+        max_stolen = max(0, voices - 1)
+        if self.level < self.STEALING:
+            self.level += 1
+            if self.level == self.STEALING:
+                self.stolen_voices = min(max_stolen, self._steal_step(voices))
+        elif self.stolen_voices < max_stolen:
+            self.stolen_voices = min(max_stolen, self.stolen_voices + self._steal_step(voices))
+        else:
+            return False
+        self._log_step('down', load)
+        return True
+
+    def _restore(self, load, voices):
+        if self.level == 0:
+            return False
+        if self.level == self.STEALING:
+            self.stolen_voices = max(0, self.stolen_voices - self._steal_step(voices))
+            if self.stolen_voices == 0:
+                self.level -= 1
+        else:
+            self.level -= 1
+        self._log_step('up', load)
+        return True
+
+    def _log_step(self, direction, load):
+        self._steps.append({
+            'timestamp': time.time(),
+            'direction': direction,
+            'level': self.level,
+            'mode': self.mode,
+            'load': load,
+            'stolen_voices': self.stolen_voices
+        })
+
+    def _reset_window(self):
+        self._window_time = 0.0
+        self._window_busy = 0.0
+        self._window_peak = 0.0
+        self._window_underflow = False
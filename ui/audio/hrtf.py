@@ -0,0 +1,291 @@
+"""
+Espacialización binaural (HRTF) para sesiones con auriculares
+
+Los tonos posicionados se convolucionan con pares de HRIR por FFT. Las
+fuentes que comparten posición se agrupan: cada grupo hace una sola FFT
+directa y los grupos de un mismo bus comparten una única FFT inversa por
+oído, de modo que la salida de cada bus pueda pasar por sus inserciones.
+"""
+
+import re
+from pathlib import Path
+
+import numpy as np
+
+from .reverb import load_impulse_response, resample
+
+# Modelo de cabeza esférica (Brown y Duda): radio (m) y velocidad del sonido (m/s)
+HEAD_RADIUS = 0.0875
+SPEED_OF_SOUND = 343.0
+SYNTHETIC_LENGTH = 256  # Muestras de cada HRIR sintética a 44.1 kHz
+
+# Nombres de archivo reconocidos: MIT KEMAR compacto (H0e045a.wav) o azi_45_ele_0.wav
+_KEMAR_NAME = re.compile(r'H(-?\d+)e(\d+)a', re.IGNORECASE)
+_GENERIC_NAME = re.compile(r'azi_?(-?\d+(?:\.\d+)?)_ele_?(-?\d+(?:\.\d+)?)', re.IGNORECASE)
+
+
+def _direction_vectors(azimuth, elevation):
+    """Vectores unitarios (x = frente, y = derecha, z = arriba) para ángulos en grados"""
+    azimuth = np.radians(np.asarray(azimuth, dtype=np.float64))
+    elevation = np.radians(np.asarray(elevation, dtype=np.float64))
+    return np.stack([np.cos(elevation) * np.cos(azimuth),
+                     np.cos(elevation) * np.sin(azimuth),
+                     np.sin(elevation)], axis=-1)
+
+
+def _wrap_azimuth(azimuth):
+    """Acimut en (-180, 180] (negativo = izquierda)"""
+    return 180.0 - (180.0 - np.asarray(azimuth, dtype=np.float64)) % 360.0
+
+
+class HRIRSet:
+    """Conjunto de respuestas al impulso de cabeza (direcciones × oídos × muestras)"""
+
+    def __init__(self, directions, hrirs, sample_rate, name, synthetic=False):
+        self.directions = np.asarray(directions, dtype=np.float64)  # (n × [acimut, elevación])
+        self.hrirs = np.asarray(hrirs, dtype=np.float32)
+        self.sample_rate = int(sample_rate)
+        self.name = name
+        self.synthetic = synthetic
+        self._vectors = _direction_vectors(self.directions[:, 0], self.directions[:, 1])
+
+    @property
+    def length(self):
+        return self.hrirs.shape[2]
+
+    @classmethod
+    def spherical_head(cls, sample_rate, azimuth_step=10, elevations=range(-40, 91, 10)):
+        """
+        Conjunto sintético del modelo de cabeza esférica: diferencia de
+        tiempo interaural (Woodworth) y sombra de la cabeza como filtro de
+        un polo y un cero. No modela el pabellón auricular, así que las
+        claves de elevación son débiles.
+        """
+        grid = [(azimuth, elevation) for elevation in elevations
+                for azimuth in np.arange(-180 + azimuth_step, 181, azimuth_step)]
+        directions = np.array(grid, dtype=np.float64)
+        directions[:, 0] = _wrap_azimuth(directions[:, 0])
+
+        length = int(2 ** np.ceil(np.log2(SYNTHETIC_LENGTH * sample_rate / 44100.0)))
+        omega = 2 * np.pi * np.fft.rfftfreq(length, 1.0 / sample_rate)
+        omega_0 = SPEED_OF_SOUND / HEAD_RADIUS
+        sources = _direction_vectors(directions[:, 0], directions[:, 1])
+
+        hrirs = np.empty((len(directions), 2, length), dtype=np.float32)
+        for ear, ear_axis in enumerate(((0.0, -1.0, 0.0), (0.0, 1.0, 0.0))):
+            # Ángulo entre la fuente y el eje del oído
+            theta = np.arccos(np.clip(sources @ np.array(ear_axis), -1.0, 1.0))
+            alpha = 1.05 + 0.95 * np.cos(theta / np.radians(150.0) * np.pi)
+            delay = HEAD_RADIUS / SPEED_OF_SOUND * np.where(
+                theta < np.pi / 2, 1.0 - np.cos(theta), 1.0 + theta - np.pi / 2)
+            shadow = ((1 + 1j * alpha[:, None] * omega / (2 * omega_0))
+                      / (1 + 1j * omega / (2 * omega_0)))
+            response = shadow * np.exp(-1j * omega * delay[:, None])
+            hrirs[:, ear] = np.fft.irfft(response, n=length, axis=1)
+        return cls(directions, hrirs, sample_rate, "Cabeza esférica (sintético)", synthetic=True)
+
+    @classmethod
+    def from_directory(cls, path, sample_rate=None):
+        """
+        Carga HRIR estéreo (oído izquierdo, derecho) de un directorio de WAV
+        nombrados por dirección. Los conjuntos medidos en un solo lado
+        (acimut 0-180) se completan por simetría.
+        """
+        directions = []
+        responses = []
+        file_rate = None
+        for wav_path in sorted(Path(path).glob('*.wav')):
+            match = _KEMAR_NAME.search(wav_path.stem)
+            if match:
+                elevation, azimuth = float(match.group(1)), float(match.group(2))
+            else:
+                match = _GENERIC_NAME.search(wav_path.stem)
+                if not match:
+                    continue
+                azimuth, elevation = float(match.group(1)), float(match.group(2))
+
+            data, rate = load_impulse_response(wav_path)
+            if data.shape[1] != 2:
+                print(f"⚠️  HRIR omitida (no es estéreo): {wav_path.name}")
+                continue
+            if file_rate is not None and rate != file_rate:
+                raise ValueError(f"Frecuencias distintas en el conjunto HRIR: {wav_path.name}")
+            file_rate = rate
+            directions.append((azimuth, elevation))
+            responses.append(data.T)
+
+        if not responses:
+            raise ValueError(f"No se encontraron HRIR en {path}")
+
+        length = max(response.shape[1] for response in responses)
+        hrirs = np.zeros((len(responses), 2, length), dtype=np.float32)
+        for index, response in enumerate(responses):
+            hrirs[index, :, :response.shape[1]] = response
+        directions = np.array(directions)
+        directions[:, 0] = _wrap_azimuth(directions[:, 0])
+
+        if directions[:, 0].min() >= 0.0:
+            # Solo lado derecho medido: el izquierdo es el espejo con los oídos intercambiados
+            mirror = directions[:, 0] % 180.0 != 0.0
+            directions = np.concatenate([directions, directions[mirror] * [-1.0, 1.0]])
+            hrirs = np.concatenate([hrirs, hrirs[mirror][:, ::-1]])
+
+        # Energía unitaria por oído en la dirección frontal: el nivel no depende del conjunto
+        front = np.argmin(np.abs(directions).sum(axis=1))
+        energy = np.sqrt(np.mean(np.sum(hrirs[front].astype(np.float64) ** 2, axis=1)))
+        if energy > 0.0:
+            hrirs = hrirs / energy
+
+        hrir_set = cls(directions, hrirs, file_rate, Path(path).name)
+        return hrir_set.resampled(sample_rate) if sample_rate else hrir_set
+
+    def resampled(self, sample_rate):
+        """El mismo conjunto a otra frecuencia de muestreo"""
+        if sample_rate == self.sample_rate:
+            return self
+        if self.synthetic:
+            return HRIRSet.spherical_head(sample_rate)
+        flat = self.hrirs.reshape(-1, self.length).T
+        data = resample(flat, self.sample_rate, sample_rate).T
+        return HRIRSet(self.directions, data.reshape(len(self.directions), 2, -1),
+                       sample_rate, self.name)
+
+    def interpolate(self, azimuth, elevation=0.0):
+        """
+        Par de HRIR (2 × muestras) para una dirección: promedio de las tres
+        direcciones medidas más cercanas, ponderado por la inversa de la
+        distancia angular.
+        """
+        target = _direction_vectors(azimuth, elevation)
+        distance = np.arccos(np.clip(self._vectors @ target, -1.0, 1.0))
+        nearest = np.argsort(distance)[:3]
+        if distance[nearest[0]] < 1e-6:
+            return self.hrirs[nearest[0]].copy()
+        weights = 1.0 / distance[nearest]
+        weights /= weights.sum()
+        return np.tensordot(weights, self.hrirs[nearest], axes=1).astype(np.float32)
+
+
+class BinauralSpatializer:
+    """
+    Convolución HRTF por bloques con fuentes agrupadas por posición.
+
+    Las posiciones se cuantizan a `position_step` grados; las fuentes de
+    una misma posición y bus se suman antes de convolucionar. Cuando una
+    fuente cambia de posición o de bus, su señal se reparte con un fundido
+    entre el grupo anterior y el nuevo durante el segmento. La cola de la
+    convolución de cada bus se conserva entre segmentos (solapamiento-suma).
+    """
+
+    MAX_CACHED_FILTERS = 1024
+
+    def __init__(self, hrir_set, sample_rate, position_step=1.0):
+        self.source_set = hrir_set
+        self.position_step = float(position_step)
+        self.set_sample_rate(sample_rate)
+
+    @property
+    def name(self):
+        return self.source_set.name
+
+    @property
+    def is_silent(self):
+        """Sin fuentes pendientes ni cola de convolución"""
+        return not self._tails and not self._groups
+
+    def set_sample_rate(self, sample_rate):
+        self.sample_rate = int(sample_rate)
+        self.hrirs = self.source_set.resampled(self.sample_rate)
+        self._filters = {}
+        self._source_keys = {}
+        self.reset()
+
+    def reset(self):
+        self._tails = {}  # bus → cola (2 × muestras) que aún suena
+        self._signals = np.zeros((8, 0), dtype=np.float32)
+        self._source_keys = {}
+        self.begin(0)
+
+    def begin(self, frames):
+        """Inicia un segmento de `frames` muestras"""
+        if self._signals.shape[1] < frames:
+            self._signals = np.zeros((self._signals.shape[0], frames), dtype=np.float32)
+        self.frames = frames
+        self._groups = {}
+        self._next_keys = {}
+
+    def add(self, source_id, signal, volume, azimuth, elevation=0.0, bus=None):
+        """Agrega una fuente mono del bus `bus` en una posición (grados; acimut negativo = izquierda)"""
+        step = self.position_step
+        key = (bus, float(_wrap_azimuth(round(azimuth / step) * step)),
+               float(np.clip(round(elevation / step) * step, -90.0, 90.0)))
+        previous = self._source_keys.get(source_id, key)
+        self._next_keys[source_id] = key
+
+        if previous == key:
+            self._group_row(key)[:] += signal * volume
+        else:
+            fade = np.linspace(0.0, 1.0, self.frames, dtype=np.float32)
+            self._group_row(previous)[:] += signal * (volume * (1.0 - fade))
+            self._group_row(key)[:] += signal * (volume * fade)
+
+    def _group_row(self, key):
+        row = self._groups.get(key)
+        if row is None:
+            row = len(self._groups)
+            if row == self._signals.shape[0]:
+                grown = np.zeros((row * 2, self._signals.shape[1]), dtype=np.float32)
+                grown[:row] = self._signals[:row]
+                self._signals = grown
+            self._signals[row, :self.frames] = 0.0
+            self._groups[key] = row
+        return self._signals[row, :self.frames]
+
+    def _filter_spectrum(self, position, size):
+        """Espectro (2 × bins) de la HRIR interpolada para una posición, en caché"""
+        spectrum = self._filters.get((position, size))
+        if spectrum is None:
+            if len(self._filters) >= self.MAX_CACHED_FILTERS:
+                self._filters.clear()
+            hrir = self.hrirs.interpolate(*position)
+            spectrum = np.fft.rfft(hrir, n=size, axis=1).astype(np.complex64)
+            self._filters[(position, size)] = spectrum
+        return spectrum
+
+    def render(self):
+        """
+        Espacializa el segmento y retorna {bus: señal (2 × muestras)} con
+        las fuentes y la cola de cada bus que suena (vacío si ninguno).
+        """
+        frames = self.frames
+        self._source_keys = self._next_keys
+        if not self._groups and not self._tails:
+            return {}
+
+        tail_length = self.hrirs.length - 1
+        size = 1 << int(np.ceil(np.log2(frames + tail_length)))
+        ears = {}
+        if self._groups:
+            keys = list(self._groups)  # En el orden de las filas
+            spectra = np.fft.rfft(self._signals[:len(keys), :frames], n=size, axis=1)
+            spectra = spectra.astype(np.complex64)
+            filters = np.stack([self._filter_spectrum(key[1:], size) for key in keys])
+            buses = [key[0] for key in keys]
+            for bus in dict.fromkeys(buses):
+                rows = [row for row, row_bus in enumerate(buses) if row_bus == bus]
+                # Las posiciones del bus se suman en frecuencia: una sola IFFT por oído
+                ears[bus] = np.einsum('gb,geb->eb', spectra[rows], filters[rows])
+
+        outputs = {}
+        for bus in list(ears) + [bus for bus in self._tails if bus not in ears]:
+            output = np.zeros((2, frames + tail_length), dtype=np.float32)
+            tail = self._tails.pop(bus, None)
+            if tail is not None:
+                output[:, :tail_length] += tail
+            if bus in ears:
+                output += np.fft.irfft(ears[bus], n=size, axis=1)[:, :frames + tail_length]
+            if tail_length and np.abs(output[:, frames:]).max() > 1e-7:
+                self._tails[bus] = output[:, frames:]
+            outputs[bus] = output[:, :frames]
+        self._groups = {}
+        return outputs
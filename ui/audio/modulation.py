@@ -0,0 +1,180 @@
+"""
+Matriz de modulación (AM/FM/panorama) entre tonos y LFOs dedicados
+"""
+
+import numpy as np
+
+
+class ModulationPlan:
+    """Plan de evaluación compilado: orden topológico y rutas vectorizadas"""
+
+    def __init__(self, order, source_rows, lfo_ids, targets):
+        self.order = order              # Tonos en orden fuente -> destino
+        self.source_rows = source_rows  # ('tone'|'lfo', id) -> fila de la matriz de señales
+        self.lfo_ids = lfo_ids          # LFOs en el orden de sus filas
+        self.targets = targets          # tone_id -> {destino: (filas, profundidades)}
+        self.row_count = len(source_rows)
+
+    @property
+    def is_empty(self):
+        return not self.targets
+
+
+class ModulationMatrix:
+    """
+    Rutas de modulación de amplitud, frecuencia o panorama.
+
+    Cada ruta toma una fuente (otro tono o un LFO) y modula un tono destino
+    con una profundidad:
+      - 'amplitude': ganancia 1 - depth * (1 - fuente) / 2 (depth 1 = isocrónico)
+      - 'frequency': desviación en Hz (vibrato/FM)
+      - 'pan': desplazamiento del panorama (-1 a 1)
+    El grafo se compila a un plan cada vez que cambia.
+    """
+
+    DESTINATIONS = ('amplitude', 'frequency', 'pan')
+    LFO_SHAPES = ('seno', 'cuadrada', 'triángulo', 'sierra')
+
+    def __init__(self):
+        self.routes = {}
+        self.lfos = {}
+        self._next_route_id = 1
+
+    def add_route(self, source, target, destination, depth, tone_ids):
+        """Agrega una ruta y retorna su id; falla si crea un ciclo"""
+        kind, source_id = source
+        if kind not in ('tone', 'lfo'):
+            raise ValueError(f"Fuente de modulación desconocida: {kind}")
+        if destination not in self.DESTINATIONS:
+            raise ValueError(f"Destino de modulación desconocido: {destination}")
+        if kind == 'lfo' and source_id not in self.lfos:
+            raise ValueError(f"LFO {source_id} no existe")
+
+        route_id = self._next_route_id
+        self.routes[route_id] = {
+            'source': (kind, source_id),
+            'target': target,
+            'destination': destination,
+            'depth': float(depth)
+        }
+        try:
+            self._topological_order(tone_ids)
+        except ValueError:
+            del self.routes[route_id]
+            raise
+        self._next_route_id += 1
+        return route_id
+
+    def remove_route(self, route_id):
+        return self.routes.pop(route_id, None) is not None
+
+    def set_route_depth(self, route_id, depth):
+        if route_id in self.routes:
+            self.routes[route_id]['depth'] = float(depth)
+            return True
+        return False
+
+    def remove_tone(self, tone_id):
+        """Elimina las rutas que usan el tono como fuente o destino"""
+        for route_id in [rid for rid, route in self.routes.items()
+                         if route['target'] == tone_id or route['source'] == ('tone', tone_id)]:
+            del self.routes[route_id]
+
+    def set_lfo(self, lfo_id, rate, shape='seno'):
+        """Crea o actualiza un LFO dedicado (Hz)"""
+        if shape not in self.LFO_SHAPES:
+            raise ValueError(f"Forma de LFO desconocida: {shape}")
+        lfo = self.lfos.setdefault(lfo_id, {'phase': 0.0})
+        lfo.update({'rate': float(rate), 'shape': shape})
+
+    def remove_lfo(self, lfo_id):
+        if self.lfos.pop(lfo_id, None) is None:
+            return False
+        for route_id in [rid for rid, route in self.routes.items() if route['source'] == ('lfo', lfo_id)]:
+            del self.routes[route_id]
+        return True
+
+    def compile(self, tone_ids):
+        """Compila el grafo a un plan ordenado topológicamente"""
+        order = self._topological_order(tone_ids)
+        tone_set = set(tone_ids)
+
+        lfo_ids = sorted(self.lfos, key=str)
+        source_rows = {('lfo', lfo_id): row for row, lfo_id in enumerate(lfo_ids)}
+
+        grouped = {}
+        for route in self.routes.values():
+            kind, source_id = route['source']
+            if route['target'] not in tone_set or (kind == 'tone' and source_id not in tone_set):
+                continue
+            if route['source'] not in source_rows:
+                source_rows[route['source']] = len(source_rows)
+            destinations = grouped.setdefault(route['target'], {})
+            destinations.setdefault(route['destination'], []).append(
+                (source_rows[route['source']], route['depth']))
+
+        targets = {}
+        for target, destinations in grouped.items():
+            targets[target] = {
+                destination: (np.array([row for row, _ in pairs], dtype=np.intp),
+                              np.array([depth for _, depth in pairs]))
+                for destination, pairs in destinations.items()
+            }
+        return ModulationPlan(order, source_rows, lfo_ids, targets)
+
+    def render_lfos(self, plan, signals, frames, sample_rate):
+        """Escribe todos los LFOs en sus filas de la matriz de señales"""
+        if not plan.lfo_ids:
+            return
+        count = len(plan.lfo_ids)
+        rates = np.array([self.lfos[lfo_id]['rate'] for lfo_id in plan.lfo_ids])
+        phases = np.array([self.lfos[lfo_id]['phase'] for lfo_id in plan.lfo_ids])
+        steps = 2 * np.pi * rates / sample_rate
+
+        phase = phases[:, None] + steps[:, None] * np.arange(frames)
+        rows = signals[:count, :frames]
+        np.sin(phase, out=rows)
+
+        shapes = np.array([self.lfos[lfo_id]['shape'] for lfo_id in plan.lfo_ids])
+        square = shapes == 'cuadrada'
+        if square.any():
+            rows[square] = np.sign(rows[square])
+        triangle = shapes == 'triángulo'
+        if triangle.any():
+            rows[triangle] = 2 * np.arcsin(rows[triangle]) / np.pi
+        saw = shapes == 'sierra'
+        if saw.any():
+            cycles = phase[saw] / (2 * np.pi)
+            rows[saw] = 2 * (cycles - np.floor(cycles + 0.5))
+
+        for lfo_id, end_phase in zip(plan.lfo_ids, (phases + steps * frames) % (2 * np.pi)):
+            self.lfos[lfo_id]['phase'] = float(end_phase)
+
+    def _topological_order(self, tone_ids):
+        """Orden de Kahn: cada fuente se evalúa antes que sus destinos"""
+        tone_set = set(tone_ids)
+        dependents = {tone_id: [] for tone_id in tone_ids}
+        indegree = {tone_id: 0 for tone_id in tone_ids}
+        for route in self.routes.values():
+            kind, source_id = route['source']
+            target = route['target']
+            if kind != 'tone' or source_id not in tone_set or target not in tone_set:
+                continue
+            if source_id == target:
+                raise ValueError(f"El tono {target} no puede modularse a sí mismo")
+            dependents[source_id].append(target)
+            indegree[target] += 1
+
+        ready = [tone_id for tone_id in tone_ids if indegree[tone_id] == 0]
+        order = []
+        while ready:
+            tone_id = ready.pop(0)
+            order.append(tone_id)
+            for target in dependents[tone_id]:
+                indegree[target] -= 1
+                if indegree[target] == 0:
+                    ready.append(target)
+
+        if len(order) != len(tone_set):
+            raise ValueError("Las rutas de modulación forman un ciclo")
+        return order
@@ -0,0 +1,158 @@
+"""
+Generador de ruido de color 1/f^α en el dominio de la frecuencia
+"""
+
+import numpy as np
+
+# Pendiente α de cada color de ruido (potencia ∝ 1/f^α); 'grey' usa A-weighting inversa
+NOISE_COLORS = {
+    'white_noise': 0.0,
+    'pink_noise': 1.0,
+    'brown_noise': 2.0,
+    'blue_noise': -1.0,
+    'violet_noise': -2.0,
+    'grey_noise': 'grey'
+}
+
+# Ruido con pendiente personalizada (options['noise_alpha'])
+CUSTOM_NOISE = 'colored_noise'
+
+NOISE_LEVEL = 0.3          # Desviación estándar de salida, igual para todos los colores
+LOW_FREQUENCY_FLOOR = 20.0  # Por debajo de esta frecuencia la curva deja de crecer
+GREY_MAX_BOOST_DB = 30.0    # Límite de realce de la curva gris respecto a 1 kHz
+
+_shaping_cache = {}
+
+
+def is_noise_type(wave_type):
+    """Indica si un tipo de onda interno es un ruido"""
+    return wave_type in NOISE_COLORS or wave_type == CUSTOM_NOISE
+
+
+def spectral_shaping_curve(alpha, fft_size, sample_rate):
+    """
+    Curva de amplitud por bin (rfft) para ruido 1/f^α, normalizada a potencia unitaria.
+
+    Las curvas se calculan una sola vez por (α, tamaño, frecuencia de muestreo).
+    """
+    key = (alpha, fft_size, sample_rate)
+    curve = _shaping_cache.get(key)
+    if curve is not None:
+        return curve
+
+    freqs = np.fft.rfftfreq(fft_size, 1.0 / sample_rate)
+    curve = np.zeros_like(freqs)
+    audible = np.maximum(freqs[1:], LOW_FREQUENCY_FLOOR)
+    if alpha == 'grey':
+        curve[1:] = _inverse_a_weighting(audible)
+    else:
+        curve[1:] = audible ** (-float(alpha) / 2.0)
+
+    # Potencia media unitaria: todos los colores suenan con el mismo RMS
+    curve /= np.sqrt(np.mean(curve ** 2))
+    curve.setflags(write=False)
+    _shaping_cache[key] = curve
+    return curve
+
+
+def clear_shaping_cache():
+    """Descarta las curvas precalculadas (p. ej. al cambiar la frecuencia de muestreo)"""
+    _shaping_cache.clear()
+
+
+def _inverse_a_weighting(freqs):
+    """Curva de ruido gris: inversa de la ponderación A, limitada en los extremos"""
+    f2 = freqs ** 2
+    a_weight = (12194.0 ** 2 * f2 ** 2) / (
+        (f2 + 20.6 ** 2) * np.sqrt((f2 + 107.7 ** 2) * (f2 + 737.9 ** 2)) * (f2 + 12194.0 ** 2))
+    a_weight /= 0.7943  # 0 dB a 1 kHz
+    max_boost = 10 ** (GREY_MAX_BOOST_DB / 20.0)
+    return np.minimum(1.0 / a_weight, max_boost)
+
+
+class SpectralNoiseGenerator:
+    """
+    Ruido de color por bloques: ruido blanco filtrado por FFT y unido por
+    solapamiento-suma con ventana raíz de Hann (50 %), que mantiene la
+    potencia constante en las uniones.
+    """
+
+    def __init__(self, alpha, sample_rate, segment_size=4096, level=NOISE_LEVEL, rng=None):
+        self.alpha = alpha
+        self.sample_rate = sample_rate
+        self.segment_size = segment_size
+        self.hop = segment_size // 2
+        self.level = level
+        self.rng = rng or np.random.default_rng()
+
+        n = np.arange(segment_size)
+        self._window = np.sin(np.pi * n / segment_size)  # Raíz de Hann periódica
+        self._tail = np.zeros(self.hop)
+        self._pending = np.zeros(0)
+
+    def set_alpha(self, alpha):
+        """Cambia la pendiente; la unión se suaviza por el solapamiento"""
+        self.alpha = alpha
+
+    def set_sample_rate(self, sample_rate):
+        self.sample_rate = sample_rate
+
+    def generate(self, frames):
+        """Retorna `frames` muestras de ruido continuo entre llamadas"""
+        if self.alpha == 0.0:
+            # El ruido blanco no necesita conformado espectral
+            return self.rng.standard_normal(frames) * self.level
+
+        if len(self._pending) < frames:
+            needed = frames - len(self._pending)
+            segments = -(-needed // self.hop)
+            self._pending = np.concatenate([self._pending, self._synthesize(segments)])
+
+        output = self._pending[:frames]
+        self._pending = self._pending[frames:]
+        return output
+
+    def _synthesize(self, segments):
+        """Genera `segments` saltos de ruido conformado con solapamiento-suma"""
+        curve = spectral_shaping_curve(self.alpha, self.segment_size, self.sample_rate)
+        white = self.rng.standard_normal((segments, self.segment_size))
+        shaped = np.fft.irfft(np.fft.rfft(white, axis=1) * curve, n=self.segment_size, axis=1)
+        shaped *= self._window
+
+        hop = self.hop
+        output = shaped[:, :hop].copy()
+        output[0] += self._tail
+        output[1:] += shaped[:-1, hop:]
+        self._tail = shaped[-1, hop:].copy()
+        return output.reshape(-1) * self.level
+
+
+class DecimatedNoise:
+    """
+    Ruido generado a 1/`factor` de la frecuencia de muestreo y retenido
+    (calidad reducida: pierde agudos pero cuesta una fracción del render).
+    """
+
+    def __init__(self, alpha, sample_rate, factor=4, segment_size=4096, level=NOISE_LEVEL):
+        self.factor = factor
+        self.generator = SpectralNoiseGenerator(alpha, sample_rate / factor,
+                                                segment_size=max(256, segment_size // factor),
+                                                level=level)
+        self._pending = np.zeros(0)
+
+    @property
+    def alpha(self):
+        return self.generator.alpha
+
+    def set_alpha(self, alpha):
+        self.generator.set_alpha(alpha)
+
+    def generate(self, frames):
+        if len(self._pending) < frames:
+            coarse_frames = -(-(frames - len(self._pending)) // self.factor)
+            held = np.repeat(self.generator.generate(coarse_frames), self.factor)
+            self._pending = np.concatenate([self._pending, held])
+
+        output = self._pending[:frames]
+        self._pending = self._pending[frames:]
+        return output
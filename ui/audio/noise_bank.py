@@ -0,0 +1,130 @@
+"""
+Banco compartido de texturas de ruido pregeneradas en archivos mapeados en memoria
+"""
+
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from .noise import NOISE_COLORS, SpectralNoiseGenerator
+
+
+class NoiseTextureReader:
+    """Lee una textura en bucle desde un desplazamiento aleatorio (copia de rebanadas)"""
+
+    def __init__(self, texture, alpha, rng=None):
+        self.texture = texture
+        self.alpha = alpha
+        rng = rng or np.random.default_rng()
+        self.position = int(rng.integers(len(texture)))
+
+    def generate(self, frames):
+        length = len(self.texture)
+        output = np.empty(frames, dtype=np.float32)
+        filled = 0
+        while filled < frames:
+            count = min(frames - filled, length - self.position)
+            output[filled:filled + count] = self.texture[self.position:self.position + count]
+            filled += count
+            self.position = (self.position + count) % length
+        return output
+
+
+class NoiseTextureBank:
+    """
+    Genera (en segundo plano) varios minutos de cada color de ruido y los
+    guarda en archivos float32 mapeados en memoria y compartidos por todos
+    los tonos.
+
+    El final de cada textura se funde con su inicio, de modo que la lectura
+    en bucle no tiene costuras.
+    """
+
+    CHUNK_SECONDS = 10
+
+    def __init__(self, sample_rate, duration, crossfade, cache_dir):
+        self.sample_rate = sample_rate
+        self.duration = duration
+        self.crossfade = crossfade
+        self.cache_dir = Path(cache_dir)
+        self._textures = {}
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def texture(self, color):
+        """Retorna la textura del color si ya está lista; si no, la solicita"""
+        texture = self._textures.get(color)
+        if texture is None:
+            self.request(color)
+        return texture
+
+    def reader(self, color, rng=None):
+        """Crea un lector para un tono o None si la textura aún no existe"""
+        texture = self.texture(color)
+        if texture is None:
+            return None
+        return NoiseTextureReader(texture, NOISE_COLORS[color], rng)
+
+    def request(self, color):
+        """Genera la textura de un color en un hilo de fondo (una sola vez)"""
+        if color not in NOISE_COLORS:
+            return
+        with self._lock:
+            if color in self._textures or color in self._pending:
+                return
+            self._pending.add(color)
+        worker = threading.Thread(target=self._build, args=(color,), daemon=True)
+        worker.start()
+
+    def prewarm(self, colors=None):
+        """Solicita todas las texturas (p. ej. al iniciar)"""
+        for color in colors or NOISE_COLORS:
+            self.request(color)
+
+    def is_ready(self, color):
+        return color in self._textures
+
+    def _cache_file(self, color):
+        name = f"noise_{color}_{self.sample_rate}hz_{int(self.duration)}s.f32"
+        return self.cache_dir / name
+
+    def _build(self, color):
+        try:
+            path = self._cache_file(color)
+            length = int((self.duration - self.crossfade) * self.sample_rate)
+            if not path.exists() or path.stat().st_size != length * 4:
+                self._generate_file(color, path, length)
+            texture = np.memmap(path, dtype=np.float32, mode='r', shape=(length,))
+            with self._lock:
+                self._textures[color] = texture
+            print(f"🌫 Textura de ruido lista: {color} ({self.duration:.0f} s)")
+        except Exception as e:
+            print(f"Error generando textura de ruido {color}: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(color)
+
+    def _generate_file(self, color, path, length):
+        """Escribe la textura por trozos y funde su final con el inicio"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fade = int(self.crossfade * self.sample_rate)
+        generator = SpectralNoiseGenerator(NOISE_COLORS[color], self.sample_rate)
+        chunk = self.CHUNK_SECONDS * self.sample_rate
+
+        temp_path = path.with_suffix('.tmp')
+        texture = np.memmap(temp_path, dtype=np.float32, mode='w+', shape=(length,))
+        written = 0
+        while written < length:
+            count = min(chunk, length - written)
+            texture[written:written + count] = generator.generate(count)
+            written += count
+
+        # Fundido de igual potencia: la cola generada continúa sobre el inicio
+        tail = generator.generate(fade)
+        ramp = np.linspace(0.0, np.pi / 2, fade, endpoint=False)
+        texture[:fade] = texture[:fade] * np.sin(ramp) + tail * np.cos(ramp)
+        texture.flush()
+        del texture
+        os.replace(temp_path, path)
@@ -0,0 +1,159 @@
+"""
+Modo tiempo real: prioridad y afinidad del hilo de render, bloqueo de memoria y control del GC
+
+Cada función intenta aplicar un ajuste y retorna un informe
+`{'applied': bool, 'detail': str}`; los ajustes no permitidos por el
+sistema (permisos, plataforma) se informan en lugar de fallar.
+"""
+
+import ctypes
+import ctypes.util
+import gc
+import os
+import threading
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+MCL_CURRENT = 1
+MCL_FUTURE = 2
+
+_libc = None
+
+
+def _report(applied, detail):
+    return {'applied': applied, 'detail': detail}
+
+
+def _get_libc():
+    global _libc
+    if _libc is None:
+        name = ctypes.util.find_library('c')
+        _libc = ctypes.CDLL(name, use_errno=True) if name else False
+    return _libc or None
+
+
+def promote_current_thread(priority, nice, cpus=None):
+    """
+    Eleva el hilo que llama: SCHED_FIFO con `priority` o, si no está
+    permitido, el valor `nice`; y lo fija a los núcleos `cpus`.
+
+    Retorna (informe, estado previo para `restore_current_thread`).
+    """
+    report = {}
+    previous = {'thread_id': threading.get_native_id()}
+
+    # En Linux el pid 0 se refiere al hilo que llama, no al proceso
+    if hasattr(os, 'sched_setscheduler'):
+        try:
+            previous['policy'] = os.sched_getscheduler(0)
+            previous['param'] = os.sched_getparam(0)
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+            report['scheduler'] = _report(True, f"SCHED_FIFO prioridad {priority}")
+        except (OSError, AttributeError) as e:
+            report['scheduler'] = _report(False, f"SCHED_FIFO no permitido ({e})")
+
+    if not report.get('scheduler', {}).get('applied'):
+        try:
+            thread_id = previous['thread_id']
+            previous['nice'] = os.getpriority(os.PRIO_PROCESS, thread_id)
+            os.setpriority(os.PRIO_PROCESS, thread_id, nice)
+            report['nice'] = _report(True, f"nice {nice}")
+        except (OSError, AttributeError) as e:
+            report['nice'] = _report(False, f"nice {nice} no permitido ({e})")
+
+    if cpus:
+        if hasattr(os, 'sched_setaffinity'):
+            try:
+                available = os.sched_getaffinity(0)
+                chosen = set(cpus) & available
+                if not chosen:
+                    raise OSError(f"núcleos {sorted(cpus)} no disponibles {sorted(available)}")
+                previous['affinity'] = available
+                os.sched_setaffinity(0, chosen)
+                report['affinity'] = _report(True, f"núcleos {sorted(chosen)}")
+            except OSError as e:
+                report['affinity'] = _report(False, f"afinidad no aplicada ({e})")
+        else:
+            report['affinity'] = _report(False, "afinidad no soportada en esta plataforma")
+
+    return report, previous
+
+
+def restore_current_thread(previous):
+    """Devuelve el hilo que llama a su planificación y afinidad previas"""
+    try:
+        if 'policy' in previous:
+            os.sched_setscheduler(0, previous['policy'], previous['param'])
+        if 'nice' in previous:
+            os.setpriority(os.PRIO_PROCESS, previous['thread_id'], previous['nice'])
+        if 'affinity' in previous:
+            os.sched_setaffinity(0, previous['affinity'])
+    except (OSError, AttributeError) as e:
+        print(f"Error restaurando prioridad del hilo de audio: {e}")
+
+
+def lock_process_memory():
+    """
+    Bloquea en RAM la memoria del proceso (mlockall) para evitar fallos de página.
+
+    Solo se bloquea también la memoria futura si el límite RLIMIT_MEMLOCK es
+    ilimitado: con un límite, MCL_FUTURE haría fallar las nuevas reservas.
+    """
+    libc = _get_libc()
+    if libc is None or not hasattr(libc, 'mlockall'):
+        return _report(False, "mlockall no disponible en esta plataforma")
+
+    flags = MCL_CURRENT
+    if RESOURCE_AVAILABLE:
+        soft, _ = resource.getrlimit(resource.RLIMIT_MEMLOCK)
+        if soft == resource.RLIM_INFINITY:
+            flags |= MCL_FUTURE
+
+    if libc.mlockall(flags) != 0:
+        errno = ctypes.get_errno()
+        return _report(False, f"mlockall falló ({os.strerror(errno)})")
+    scope = "actual y futura" if flags & MCL_FUTURE else "actual"
+    return _report(True, f"memoria {scope} bloqueada")
+
+
+def unlock_process_memory():
+    libc = _get_libc()
+    if libc is not None and hasattr(libc, 'munlockall'):
+        libc.munlockall()
+
+
+def tune_garbage_collector(thresholds):
+    """
+    Congela los objetos de larga vida (gc.freeze) y eleva los umbrales del GC.
+
+    Retorna (informe, umbrales previos).
+    """
+    previous = gc.get_threshold()
+    report = {}
+
+    gc.collect()
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+        report['gc_freeze'] = _report(True, f"{gc.get_freeze_count()} objetos congelados")
+    else:
+        report['gc_freeze'] = _report(False, "gc.freeze requiere Python 3.7+")
+
+    gc.set_threshold(*thresholds)
+    report['gc_threshold'] = _report(True, f"umbrales {tuple(thresholds)}")
+    return report, previous
+
+
+def restore_garbage_collector(previous):
+    if hasattr(gc, 'unfreeze'):
+        gc.unfreeze()
+    gc.set_threshold(*previous)
+
+
+def format_report(report):
+    """Una línea por ajuste, indicando si tuvo efecto"""
+    return "\n".join(f"   {'✅' if item['applied'] else '⚠️ '} {name}: {item['detail']}"
+                     for name, item in report.items())
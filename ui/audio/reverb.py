@@ -0,0 +1,212 @@
+"""
+Reverberación por convolución FFT con particiones uniformes para el bus maestro
+"""
+
+import wave
+from math import gcd
+
+import numpy as np
+
+try:
+    import soundfile as sf
+    SOUNDFILE_AVAILABLE = True
+except ImportError:
+    SOUNDFILE_AVAILABLE = False
+
+try:
+    from scipy.signal import resample_poly
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+
+def load_impulse_response(path, max_seconds=None):
+    """
+    Lee una respuesta al impulso WAV y retorna (muestras × canales float32, frecuencia).
+
+    Sin soundfile se leen WAV PCM de 8, 16, 24 o 32 bits con el módulo `wave`.
+    """
+    try:
+        if SOUNDFILE_AVAILABLE:
+            data, rate = sf.read(str(path), dtype='float32', always_2d=True)
+        else:
+            with wave.open(str(path), 'rb') as wav_file:
+                channels = wav_file.getnchannels()
+                width = wav_file.getsampwidth()
+                rate = wav_file.getframerate()
+                raw = wav_file.readframes(wav_file.getnframes())
+            data = _pcm_to_float(raw, width).reshape(-1, channels)
+    except (wave.Error, EOFError, RuntimeError) as e:
+        # Errores de formato de wave/soundfile: se informan como ValueError
+        raise ValueError(f"WAV no válido {path}: {e}") from e
+
+    if max_seconds is not None:
+        data = data[:int(max_seconds * rate)]
+    if not len(data):
+        raise ValueError(f"Respuesta al impulso vacía: {path}")
+    return data, int(rate)
+
+
+def _pcm_to_float(raw, width):
+    """Convierte PCM entero intercalado a float32 en [-1, 1]"""
+    if width == 1:
+        return (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    if width == 2:
+        return np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768.0
+    if width == 3:
+        bytes_ = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = bytes_[:, 0] | (bytes_[:, 1] << 8) | (bytes_[:, 2] << 16)
+        values = np.where(values >= 1 << 23, values - (1 << 24), values)
+        return values.astype(np.float32) / float(1 << 23)
+    if width == 4:
+        return (np.frombuffer(raw, dtype='<i4') / float(1 << 31)).astype(np.float32)
+    raise ValueError(f"Ancho de muestra no soportado: {width * 8} bits")
+
+
+def resample(data, source_rate, target_rate):
+    """Remuestrea la respuesta al impulso a la frecuencia del motor"""
+    if source_rate == target_rate:
+        return data
+    if SCIPY_AVAILABLE:
+        divisor = gcd(source_rate, target_rate)
+        return resample_poly(data, target_rate // divisor, source_rate // divisor, axis=0)
+    frames = int(round(len(data) * target_rate / source_rate))
+    positions = np.arange(frames) * (source_rate / target_rate)
+    return np.stack([np.interp(positions, np.arange(len(data)), data[:, channel])
+                     for channel in range(data.shape[1])], axis=1)
+
+
+class ConvolutionReverb:
+    """
+    Convolución por solapamiento-descarte con particiones uniformes del
+    tamaño del bloque.
+
+    La respuesta al impulso se divide en particiones cuyos espectros se
+    precalculan; cada bloque hace una FFT de entrada, una suma de
+    productos sobre la línea de retardo de espectros y una FFT inversa.
+    Con bloques del tamaño de la partición no añade latencia; si llega un
+    bloque desalineado pasa a una latencia fija de una partición.
+    """
+
+    def __init__(self, impulse, impulse_rate, sample_rate, block_size, channels, mix=0.25, name=None):
+        self.impulse = np.asarray(impulse, dtype=np.float32)
+        if self.impulse.ndim == 1:
+            self.impulse = self.impulse[:, None]
+        self.impulse_rate = int(impulse_rate)
+        self.name = name
+        self.mix = float(np.clip(mix, 0.0, 1.0))
+        self._applied_mix = self.mix
+        self.sample_rate = int(sample_rate)
+        self.block_size = int(block_size)
+        self.channels = int(channels)
+        self.configure()
+
+    @property
+    def seconds(self):
+        return len(self.impulse) / self.impulse_rate
+
+    @property
+    def is_silent(self):
+        """
+        Indica si la cola terminó: la línea de retardo y las colas de los
+        bloques desalineados solo contienen silencio
+        """
+        return (self._silent_blocks >= self.partitions and not self._in_fifo.any()
+                and not self._out_fifo.any())
+
+    def configure(self, sample_rate=None, block_size=None, channels=None):
+        """Recalcula los espectros de las particiones y reinicia el estado"""
+        if sample_rate is not None:
+            self.sample_rate = int(sample_rate)
+        if block_size is not None:
+            self.block_size = int(block_size)
+        if channels is not None:
+            self.channels = int(channels)
+
+        impulse = resample(self.impulse, self.impulse_rate, self.sample_rate)
+        # Energía unitaria en el canal más fuerte: la cola suena al nivel de la señal seca
+        energy = np.sqrt(np.max(np.sum(impulse.astype(np.float64) ** 2, axis=0)))
+        if energy > 0.0:
+            impulse = impulse / energy
+        # Canal de salida c ← canal c (módulo) de la respuesta al impulso
+        impulse = impulse[:, np.arange(self.channels) % impulse.shape[1]]
+
+        block = self.block_size
+        self.partitions = max(1, -(-len(impulse) // block))
+        padded = np.zeros((self.partitions * block, self.channels))
+        padded[:len(impulse)] = impulse
+        segments = padded.reshape(self.partitions, block, self.channels)
+        spectra = np.fft.rfft(segments, n=2 * block, axis=1).astype(np.complex64)
+        # Orden inverso: la partición más tardía se multiplica por la entrada más antigua
+        self._spectra = spectra[::-1].reshape(self.partitions, -1).copy()
+        self.reset()
+
+    def reset(self):
+        bins = (self.block_size + 1) * self.channels
+        # Línea de retardo duplicada: siempre hay una vista contigua de las últimas particiones
+        self._history = np.zeros((2 * self.partitions, bins), dtype=np.complex64)
+        self._products = np.empty((self.partitions, bins), dtype=np.complex64)
+        self._position = 0
+        self._window = np.zeros((2 * self.block_size, self.channels), dtype=np.float32)
+        self._in_fifo = np.zeros((0, self.channels), dtype=np.float32)
+        self._out_fifo = np.zeros((0, self.channels), dtype=np.float32)
+        self._silent_blocks = self.partitions
+
+    def set_mix(self, mix):
+        self.mix = float(np.clip(mix, 0.0, 1.0))
+
+    def process(self, block):
+        """Mezcla la reverberación en un bloque (muestras × canales) y lo retorna"""
+        frames = len(block)
+        if self.is_silent and not block.any():
+            return block
+
+        if frames == self.block_size and not len(self._in_fifo) and not len(self._out_fifo):
+            wet = self._convolve(block)
+        else:
+            wet = self._process_buffered(block)
+
+        if self._applied_mix != self.mix:
+            mix = np.linspace(self._applied_mix, self.mix, frames, dtype=np.float32)[:, None]
+            self._applied_mix = self.mix
+        else:
+            mix = self.mix
+        return block + mix * (wet - block)
+
+    def _process_buffered(self, block):
+        """Bloques desalineados: acumula particiones completas con una partición de latencia"""
+        frames = len(block)
+        if not len(self._in_fifo) and not len(self._out_fifo):
+            self._out_fifo = np.zeros((self.block_size, self.channels), dtype=np.float32)
+        self._in_fifo = np.concatenate([self._in_fifo, block])
+        outputs = [self._out_fifo]
+        while len(self._in_fifo) >= self.block_size:
+            outputs.append(self._convolve(self._in_fifo[:self.block_size]))
+            self._in_fifo = self._in_fifo[self.block_size:]
+        output = np.concatenate(outputs)
+        self._out_fifo = output[frames:]
+        return output[:frames]
+
+    def _convolve(self, block):
+        """Una partición: FFT, suma de productos espectrales e IFFT (solapamiento-descarte)"""
+        size = self.block_size
+        window = self._window
+        window[:size] = window[size:]
+        window[size:] = block
+
+        if block.any():
+            self._silent_blocks = 0
+        else:
+            self._silent_blocks += 1
+
+        spectrum = np.fft.rfft(window, axis=0).astype(np.complex64).reshape(-1)
+        position = self._position
+        self._history[position] = spectrum
+        self._history[position + self.partitions] = spectrum
+        self._position = (position + 1) % self.partitions
+
+        recent = self._history[position + 1:position + 1 + self.partitions]
+        np.multiply(recent, self._spectra, out=self._products)
+        output = np.fft.irfft(self._products.sum(axis=0).reshape(size + 1, self.channels),
+                              n=2 * size, axis=0)
+        return output[size:].astype(np.float32)
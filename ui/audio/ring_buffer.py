@@ -0,0 +1,72 @@
+"""
+Búfer circular de un productor y un consumidor (SPSC) sin bloqueos
+
+El callback de audio escribe y el grabador lee. Cada lado solo modifica
+su propio índice (contadores absolutos de muestras) y el productor
+publica el índice de escritura después de copiar los datos, así que no
+se necesita ningún mutex.
+"""
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Búfer preasignado de `capacity` muestras × `channels` canales"""
+
+    def __init__(self, capacity, channels, sample_rate=None):
+        self.capacity = int(capacity)
+        self.channels = int(channels)
+        self.sample_rate = sample_rate
+        self._data = np.zeros((self.capacity, self.channels), dtype=np.float32)
+        self._write_index = 0  # Solo lo modifica el productor
+        self._read_index = 0  # Solo lo modifica el consumidor
+        self.dropped_frames = 0  # Muestras descartadas por desbordamiento (productor)
+        self.mismatched_channels = None  # Canales del primer bloque incompatible (productor)
+
+    @property
+    def available(self):
+        """Muestras pendientes de leer"""
+        return self._write_index - self._read_index
+
+    def push(self, block):
+        """
+        Productor: copia un bloque (muestras × canales). Si no cabe entero se
+        descarta y se cuenta en `dropped_frames`; nunca espera al consumidor.
+        Un bloque con otro número de canales no se copia y queda anotado en
+        `mismatched_channels` para que el consumidor termine la toma.
+        """
+        frames = len(block)
+        if block.ndim != 2 or block.shape[1] != self.channels:
+            if self.mismatched_channels is None:
+                self.mismatched_channels = block.shape[1] if block.ndim == 2 else 1
+            return False
+        write = self._write_index
+        if frames > self.capacity - (write - self._read_index):
+            self.dropped_frames += frames
+            return False
+
+        start = write % self.capacity
+        first = min(frames, self.capacity - start)
+        self._data[start:start + first] = block[:first]
+        if first < frames:
+            self._data[:frames - first] = block[first:]
+        self._write_index = write + frames  # Publicar tras copiar
+        return True
+
+    def pop(self, max_frames=None):
+        """Consumidor: retira y retorna (copia) hasta `max_frames` muestras pendientes"""
+        read = self._read_index
+        frames = self._write_index - read
+        if max_frames is not None:
+            frames = min(frames, max_frames)
+        if frames <= 0:
+            return np.zeros((0, self.channels), dtype=np.float32)
+
+        start = read % self.capacity
+        first = min(frames, self.capacity - start)
+        if first == frames:
+            chunk = self._data[start:start + frames].copy()
+        else:
+            chunk = np.concatenate([self._data[start:], self._data[:frames - first]])
+        self._read_index = read + frames  # Liberar el espacio tras copiar
+        return chunk
@@ -0,0 +1,65 @@
+"""
+Planificador de eventos con precisión de muestra para automatización temporizada
+"""
+
+import heapq
+import itertools
+
+
+class EventScheduler:
+    """Cola de prioridad de eventos indexados por tiempo de muestra"""
+
+    def __init__(self):
+        self._queue = []
+        self._ids = itertools.count(1)
+        self._cancelled = set()
+
+    def schedule(self, sample_time, action, params=None):
+        """Agrega un evento y retorna su identificador"""
+        event_id = next(self._ids)
+        heapq.heappush(self._queue, (int(sample_time), event_id, action, params or {}))
+        return event_id
+
+    def cancel(self, event_id):
+        """Cancela un evento pendiente"""
+        if any(event[1] == event_id for event in self._queue):
+            self._cancelled.add(event_id)
+            return True
+        return False
+
+    def clear(self):
+        """Descarta todos los eventos pendientes"""
+        self._queue.clear()
+        self._cancelled.clear()
+
+    def next_event_time(self):
+        """Retorna el tiempo de muestra del próximo evento o None"""
+        self._discard_cancelled()
+        return self._queue[0][0] if self._queue else None
+
+    def pop_due(self, sample_time):
+        """Extrae en orden los eventos con tiempo <= sample_time"""
+        due = []
+        self._discard_cancelled()
+        while self._queue and self._queue[0][0] <= sample_time:
+            _, event_id, action, params = heapq.heappop(self._queue)
+            if event_id in self._cancelled:
+                self._cancelled.discard(event_id)
+                continue
+            due.append((action, params))
+        return due
+
+    def rescale(self, reference_time, ratio):
+        """Reescala los tiempos pendientes respecto a `reference_time` (cambio de frecuencia)"""
+        self._queue = [(reference_time + int(round((sample_time - reference_time) * ratio)),
+                        event_id, action, params)
+                       for sample_time, event_id, action, params in self._queue]
+        heapq.heapify(self._queue)
+    
+    def pending_count(self):
+        """Número de eventos pendientes"""
+        return len(self._queue) - len(self._cancelled)
+
+    def _discard_cancelled(self):
+        while self._queue and self._queue[0][1] in self._cancelled:
+            self._cancelled.discard(heapq.heappop(self._queue)[1])
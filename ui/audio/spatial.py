@@ -0,0 +1,245 @@
+"""
+Paneo multicanal: vectores de ganancia por tono para cualquier número de altavoces
+"""
+
+import numpy as np
+
+from ..utils.constants import AudioConstants
+
+
+def layout_for_channels(channels):
+    """
+    Acimuts (grados, 0 = frente, negativo = izquierda) de la disposición
+    estándar con ese número de canales; None marca un canal LFE.
+
+    Sin disposición estándar los altavoces se reparten en anillo.
+    """
+    for azimuths in AudioConstants.SPEAKER_LAYOUTS.values():
+        if len(azimuths) == channels:
+            return list(azimuths)
+    return [float(az) for az in (np.arange(channels) * 360.0 / channels - 180.0 + 180.0 / channels)]
+
+
+def create_panner(channels, layout=None):
+    """Panoramizador para `channels` salidas (`layout` = nombre o lista de acimuts)"""
+    if isinstance(layout, str):
+        layout = AudioConstants.SPEAKER_LAYOUTS.get(layout)
+    if layout is None or len(layout) != channels:
+        layout = layout_for_channels(channels)
+    if channels == 2:
+        return StereoPanner(layout)
+    return VBAPPanner(layout)
+
+
+class StereoPanner:
+    """Ley de balance estéreo: el centro suena a plena ganancia en ambos canales"""
+
+    def __init__(self, azimuths):
+        self.azimuths = list(azimuths)
+        self.channels = 2
+        self.left_channel = 0
+        self.right_channel = 1
+
+    def gains(self, pan, azimuth=None):
+        """Ganancias (k × 2) para `pan` en [-1, 1]; el acimut se convierte a balance"""
+        pan = np.atleast_1d(np.asarray(pan, dtype=np.float64))
+        if azimuth is not None:
+            pan = _azimuth_to_pan(np.atleast_1d(azimuth), pan)
+        gains = np.empty((len(pan), 2))
+        gains[:, 0] = 1.0 - np.maximum(0.0, pan)
+        gains[:, 1] = 1.0 + np.minimum(0.0, pan)
+        return gains
+
+
+class VBAPPanner:
+    """
+    Paneo por amplitud de vectores base (VBAP) en el plano horizontal.
+
+    Cada fuente se reparte entre el par de altavoces adyacentes que la
+    rodean, con ganancias normalizadas en potencia. Las matrices inversas
+    de todos los pares se precalculan y las ganancias de muchas fuentes se
+    resuelven en una sola operación vectorizada.
+    """
+
+    def __init__(self, azimuths):
+        self.azimuths = list(azimuths)
+        self.channels = len(azimuths)
+        speakers = [(az % 360.0, channel) for channel, az in enumerate(azimuths) if az is not None]
+        speakers.sort()
+        self._angles = np.array([angle for angle, _ in speakers])
+        self._speaker_channels = np.array([channel for _, channel in speakers])
+
+        # El paneo L/R recorre el arco frontal hasta los altavoces izquierdo/derecho
+        front = [abs(az) for az in azimuths if az is not None and 0 < abs(az) < 90]
+        self.front_width = min(front) if front else 90.0
+        self.left_channel = self._nearest_channel(-self.front_width)
+        self.right_channel = self._nearest_channel(self.front_width)
+
+        count = len(speakers)
+        if count >= 2:
+            # Par i: altavoz i y el siguiente en sentido creciente (con vuelta)
+            first = np.radians(self._angles)
+            second = np.roll(first, -1)
+            bases = np.stack([np.stack([np.cos(first), np.sin(first)], axis=1),
+                              np.stack([np.cos(second), np.sin(second)], axis=1)], axis=1)
+            self._inverses = np.linalg.pinv(bases)  # (pares × 2 × 2)
+
+    def _nearest_channel(self, azimuth):
+        distance = np.abs((self._angles - azimuth % 360.0 + 180.0) % 360.0 - 180.0)
+        return int(self._speaker_channels[np.argmin(distance)])
+
+    def gains(self, pan, azimuth=None):
+        """Ganancias (k × canales) para `pan` en [-1, 1] o `azimuth` en grados"""
+        pan = np.atleast_1d(np.asarray(pan, dtype=np.float64))
+        if azimuth is None:
+            azimuth = pan * self.front_width
+        else:
+            azimuth = _merge_azimuth(np.atleast_1d(azimuth), pan * self.front_width)
+        count = len(azimuth)
+        gains = np.zeros((count, self.channels))
+
+        speakers = len(self._angles)
+        if speakers == 1:
+            gains[:, self._speaker_channels[0]] = 1.0
+            return gains
+
+        angle = azimuth % 360.0
+        pair = (np.searchsorted(self._angles, angle, side='right') - 1) % speakers
+        radians = np.radians(angle)
+        direction = np.stack([np.cos(radians), np.sin(radians)], axis=1)
+        pair_gains = np.einsum('kj,kji->ki', direction, self._inverses[pair])
+        np.maximum(pair_gains, 0.0, out=pair_gains)
+        norm = np.sqrt(np.sum(pair_gains ** 2, axis=1, keepdims=True))
+        pair_gains /= np.where(norm > 0.0, norm, 1.0)
+
+        rows = np.arange(count)
+        gains[rows, self._speaker_channels[pair]] += pair_gains[:, 0]
+        gains[rows, self._speaker_channels[(pair + 1) % speakers]] += pair_gains[:, 1]
+        return gains
+
+
+def _merge_azimuth(azimuth, fallback):
+    """Acimut por fuente, usando el derivado del balance donde no hay uno explícito"""
+    azimuth = np.asarray(azimuth, dtype=np.float64)
+    if azimuth.shape != fallback.shape:
+        azimuth = np.broadcast_to(azimuth, fallback.shape)
+    return np.where(np.isnan(azimuth), fallback, azimuth)
+
+
+def _azimuth_to_pan(azimuth, pan):
+    """Proyección de un acimut sobre el eje izquierda/derecha (estéreo)"""
+    azimuth = _merge_azimuth(azimuth, np.full(pan.shape, np.nan))
+    return np.where(np.isnan(azimuth), pan, np.sin(np.radians(azimuth)))
+
+
+class MixMatrix:
+    """
+    Acumula las señales de un segmento (una fila por tono, o por oído en
+    los binaurales) y las mezcla con un único producto
+    (filas × muestras)ᵀ @ (filas × canales), cuyo costo apenas crece con
+    el número de canales.
+    """
+
+    def __init__(self, panner):
+        self.panner = panner
+        self._signals = np.zeros((16, 0), dtype=np.float32)
+        self.begin(0)
+
+    def begin(self, frames):
+        """Inicia un segmento de `frames` muestras"""
+        if self._signals.shape[1] < frames:
+            self._signals = np.zeros((self._signals.shape[0], frames), dtype=np.float32)
+        self.frames = frames
+        self.rows = 0
+        self._pans = []
+        self._azimuths = []
+        self._volumes = []
+        self._channels = []
+        self._buses = []
+
+    def add(self, signal, volume, pan=0.0, azimuth=None, channel=None, bus=None):
+        """Agrega una fila paneada (o fija a `channel`) con su volumen y su bus"""
+        if self.rows == self._signals.shape[0]:
+            grown = np.zeros((self.rows * 2, self._signals.shape[1]), dtype=np.float32)
+            grown[:self.rows] = self._signals[:self.rows]
+            self._signals = grown
+        self._signals[self.rows, :self.frames] = signal
+        self._pans.append(pan)
+        self._azimuths.append(np.nan if azimuth is None else float(azimuth))
+        self._volumes.append(volume)
+        self._channels.append(-1 if channel is None else channel)
+        self._buses.append(bus)
+        self.rows += 1
+
+    def mix_into(self, buffer, bus_gains=None, bus_inserts=None, submixes=None):
+        """
+        Suma la mezcla de todas las filas en `buffer` (muestras × canales).
+
+        `bus_gains` asigna a cada bus una ganancia escalar (que se pliega en
+        la matriz de ganancias) o una rampa por muestra (que escala sus filas).
+        Los buses con inserciones (`bus_inserts`: lista de procesadores con
+        `process` e `is_silent`, como filtros y retardos) se mezclan en su
+        propio producto y se procesan ya en canales de salida; sus colas
+        siguen sonando aunque el bus no tenga filas. `submixes` aporta a
+        esos buses señales ya en canales de salida (p. ej. la salida binaural
+        de sus tonos posicionados), que se suman antes de las inserciones.
+        Retorna el número de buses que solo aportaron cola.
+        """
+        tails = 0
+        submixes = submixes or {}
+        if bus_inserts:
+            for bus, inserts in bus_inserts.items():
+                if bus in self._buses:
+                    continue
+                if bus in submixes:
+                    buffer += _process_inserts(inserts, submixes[bus])
+                elif not all(insert.is_silent for insert in inserts):
+                    buffer += _process_inserts(inserts, np.zeros(buffer.shape, dtype=np.float32))
+                    tails += 1
+        if not self.rows:
+            return tails
+        volumes = np.array(self._volumes, dtype=np.float64)
+        signals = self._signals[:self.rows, :self.frames]
+        if bus_gains:
+            buses = self._buses
+            for bus, bus_gain in bus_gains.items():
+                if np.ndim(bus_gain) == 0 and bus_gain == 1.0:
+                    continue
+                rows = [row for row, row_bus in enumerate(buses) if row_bus == bus]
+                if not rows:
+                    continue
+                if np.ndim(bus_gain):
+                    signals[rows] *= bus_gain
+                else:
+                    volumes[rows] *= bus_gain
+
+        gains = self.panner.gains(np.array(self._pans), np.array(self._azimuths))
+        channels = np.array(self._channels)
+        fixed = channels >= 0
+        if fixed.any():
+            gains[fixed] = 0.0
+            gains[np.flatnonzero(fixed), channels[fixed]] = 1.0
+        gains *= volumes[:, None]
+        gains = gains.astype(np.float32)
+
+        if bus_inserts:
+            remaining = np.ones(self.rows, dtype=bool)
+            for bus, inserts in bus_inserts.items():
+                rows = np.array([row_bus == bus for row_bus in self._buses])
+                if rows.any():
+                    submix = signals[rows].T @ gains[rows]
+                    if bus in submixes:
+                        submix += submixes[bus]
+                    buffer += _process_inserts(inserts, submix)
+                    remaining &= ~rows
+            signals = signals[remaining]
+            gains = gains[remaining]
+        buffer += signals.T @ gains
+        return tails
+
+
+def _process_inserts(inserts, submix):
+    """Aplica en orden las inserciones de un bus a su submezcla (muestras × canales)"""
+    for insert in inserts:
+        submix = insert.process(submix)
+    return submix
@@ -0,0 +1,232 @@
+"""
+Escritura incremental de WAV para grabaciones largas
+
+Los bloques se escriben en disco a medida que llegan y los tamaños de la
+cabecera se actualizan periódicamente, así que la memoria usada no
+depende de la duración y un cierre inesperado deja un archivo legible
+con todo lo grabado hasta la última actualización.
+
+Los datos se copian en ventanas del archivo mapeadas en memoria y, si
+el archivo va a superar el límite de 4 GB del formato RIFF, la cabecera
+se convierte en RF64 (EBU Tech 3306) sin reescribir los datos.
+"""
+
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from ..utils.constants import AudioConstants
+from .dither import Ditherer
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Subtipos (mismos nombres que soundfile): (formato, bits por muestra)
+SUBTYPES = {
+    'PCM_16': (WAVE_FORMAT_PCM, 16),
+    'PCM_24': (WAVE_FORMAT_PCM, 24),
+    'PCM_32': (WAVE_FORMAT_PCM, 32),
+    'FLOAT': (WAVE_FORMAT_IEEE_FLOAT, 32)
+}
+
+# Tamaño de cada ventana mapeada del bloque de datos
+MAP_SEGMENT_BYTES = 32 << 20
+
+# Tamaño máximo de un archivo RIFF (campos de 32 bits)
+RIFF_LIMIT = 0xFFFFFFFF
+
+# Carga útil del bloque ds64 de RF64: tamaños RIFF, datos y muestras (64 bits) y tabla vacía
+_DS64_SIZE = 28
+
+# Cola del GUID KSDATAFORMAT_SUBTYPE_* (los dos primeros bytes son el formato)
+_SUBFORMAT_TAIL = b'\x00\x00\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71'
+
+
+class StreamingWavWriter:
+    """
+    WAV que crece bloque a bloque (muestras × canales float32 en [-1, 1]).
+
+    Con más de dos canales se usa WAVE_FORMAT_EXTENSIBLE; los formatos no
+    PCM llevan el bloque 'fact' con el número de muestras. Un bloque 'JUNK'
+    reserva el espacio del 'ds64' para pasar a RF64 al superar `riff_limit`.
+
+    Los subtipos enteros se cuantizan con dither TPDF (16 y 24 bits) y,
+    con `noise_shaping`, con conformación de ruido de primer orden.
+    """
+
+    def __init__(self, path, sample_rate, channels, subtype='PCM_16', header_interval=None,
+                 riff_limit=RIFF_LIMIT, dither=True, noise_shaping=False):
+        if subtype not in SUBTYPES:
+            raise ValueError(f"Subtipo WAV no soportado: {subtype}")
+        self.path = str(path)
+        self.sample_rate = int(sample_rate)
+        self.channels = int(channels)
+        self.subtype = subtype
+        self.format_tag, self.bits = SUBTYPES[subtype]
+        self.frame_bytes = self.channels * self.bits // 8
+        self._ditherer = None
+        if self.format_tag == WAVE_FORMAT_PCM:
+            self._ditherer = Ditherer(self.bits, self.channels, dither, noise_shaping)
+        if header_interval is None:
+            header_interval = AudioConstants.RECORDING_HEADER_INTERVAL
+        self._header_interval_frames = max(1, int(header_interval * self.sample_rate))
+        self.riff_limit = riff_limit
+        self.rf64 = False
+        self.frames = 0
+        self._patched_frames = 0
+        self._map = None
+        self._map_start = 0
+        self._file = open(self.path, 'w+b')
+        try:
+            self._write_header()
+        except Exception:
+            self._file.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def _write_header(self):
+        """Cabecera con tamaños provisionales; guarda los desplazamientos a actualizar"""
+        extensible = self.channels > 2
+        block_align = self.frame_bytes
+        byte_rate = self.sample_rate * block_align
+        fmt = struct.pack('<HHIIHH', WAVE_FORMAT_EXTENSIBLE if extensible else self.format_tag,
+                          self.channels, self.sample_rate, byte_rate, block_align, self.bits)
+        if extensible:
+            # Sin máscara de altavoces: el orden de canales es el del motor
+            fmt += struct.pack('<HHI', 22, self.bits, 0)
+            fmt += struct.pack('<H', self.format_tag) + _SUBFORMAT_TAIL
+        elif self.format_tag != WAVE_FORMAT_PCM:
+            fmt += struct.pack('<H', 0)
+
+        header = b'RIFF' + struct.pack('<I', 0) + b'WAVE'
+        self._ds64_offset = len(header)
+        header += b'JUNK' + struct.pack('<I', _DS64_SIZE) + bytes(_DS64_SIZE)
+        header += b'fmt ' + struct.pack('<I', len(fmt)) + fmt
+        self._fact_offset = None
+        if self.format_tag != WAVE_FORMAT_PCM:
+            self._fact_offset = len(header) + 8
+            header += b'fact' + struct.pack('<I', 4) + struct.pack('<I', 0)
+        self._data_size_offset = len(header) + 4
+        header += b'data' + struct.pack('<I', 0)
+        self._data_offset = len(header)
+        self._end = self._data_offset  # Posición de la próxima muestra en el archivo
+        self._file.write(header)
+        self._patch_header()
+
+    def write(self, block):
+        """Agrega un bloque y actualiza la cabecera cada `header_interval` segundos"""
+        block = np.asarray(block, dtype=np.float32)
+        if block.ndim == 1:
+            block = block[:, None]
+        if block.shape[1] != self.channels:
+            raise ValueError(f"Se esperaban {self.channels} canales, llegaron {block.shape[1]}")
+        if not len(block):
+            return
+        data = self._encode(block)
+        if not self.rf64 and self._riff_size(self.frames + len(block)) > self.riff_limit:
+            self.rf64 = True
+            print(f"📼 Grabación: se supera el límite de RIFF, la cabecera pasa a RF64 ({os.path.basename(self.path)})")
+            self._patch_header()
+        self._write_data(data)
+        self.frames += len(block)
+        if self.frames - self._patched_frames >= self._header_interval_frames:
+            self._patch_header()
+
+    def _encode(self, block):
+        """Convierte un bloque a los bytes del subtipo (little-endian intercalado)"""
+        if self.format_tag == WAVE_FORMAT_IEEE_FLOAT:
+            return block.astype('<f4').reshape(-1).view(np.uint8)
+        samples = self._ditherer.process(block)
+        if self.bits == 16:
+            return samples.astype('<i2').reshape(-1).view(np.uint8)
+        if self.bits == 24:
+            # Los tres bytes bajos de cada int32 little-endian
+            return samples.astype('<i4').view(np.uint8).reshape(-1, 4)[:, :3].reshape(-1)
+        return samples.astype('<i4').reshape(-1).view(np.uint8)
+
+    def _write_data(self, data):
+        """Copia los bytes en las ventanas mapeadas, creando la siguiente al llenarse una"""
+        position = 0
+        while position < len(data):
+            if self._map is None or self._end >= self._map_start + len(self._map):
+                self._map_next_segment()
+            offset = self._end - self._map_start
+            count = min(len(data) - position, len(self._map) - offset)
+            self._map[offset:offset + count] = data[position:position + count]
+            position += count
+            self._end += count
+
+    def _map_next_segment(self):
+        """Amplía el archivo y mapea la ventana que contiene la posición actual"""
+        if self._map is not None:
+            self._map.close()
+        start = self._end - self._end % mmap.ALLOCATIONGRANULARITY
+        end = start + MAP_SEGMENT_BYTES
+        if os.fstat(self._file.fileno()).st_size < end:
+            os.ftruncate(self._file.fileno(), end)
+        self._map = mmap.mmap(self._file.fileno(), MAP_SEGMENT_BYTES, offset=start)
+        self._map_start = start
+
+    def _riff_size(self, frames):
+        data_bytes = frames * self.frame_bytes
+        return self._data_offset - 8 + data_bytes + (data_bytes & 1)
+
+    def flush(self):
+        """Sincroniza con el disco la ventana mapeada y la cabecera actualizada"""
+        if self._map is not None:
+            self._map.flush()
+        self._patch_header()
+
+    def _patch_header(self):
+        """
+        Escribe los tamaños actuales. En RF64 los campos de 32 bits valen
+        0xFFFFFFFF y los tamaños reales van en el bloque ds64.
+        """
+        data_bytes = self.frames * self.frame_bytes
+        riff_size = self._riff_size(self.frames)
+        if self.rf64:
+            # El ds64 se completa antes de cambiar el identificador RIFF → RF64
+            self._file.seek(self._ds64_offset)
+            self._file.write(b'ds64' + struct.pack('<IQQQI', _DS64_SIZE, riff_size,
+                                                    data_bytes, self.frames, 0))
+            riff_size = data_bytes = frames = 0xFFFFFFFF
+        else:
+            frames = self.frames
+        if self._fact_offset is not None:
+            self._file.seek(self._fact_offset)
+            self._file.write(struct.pack('<I', frames))
+        self._file.seek(self._data_size_offset)
+        self._file.write(struct.pack('<I', data_bytes))
+        self._file.seek(0)
+        self._file.write((b'RF64' if self.rf64 else b'RIFF') + struct.pack('<I', riff_size))
+        self._file.flush()
+        self._patched_frames = self.frames
+
+    def close(self):
+        """
+        Libera la ventana mapeada, recorta el archivo a su tamaño real (con
+        el byte de relleno si los datos son impares) y cierra
+        """
+        if self._file.closed:
+            return
+        try:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            data_bytes = self.frames * self.frame_bytes
+            os.ftruncate(self._file.fileno(), self._data_offset + data_bytes + (data_bytes & 1))
+            self._patch_header()
+        finally:
+            self._file.close()
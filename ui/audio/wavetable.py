@@ -0,0 +1,30 @@
+"""
+Osciladores por tabla de ondas (calidad reducida y más barata que la evaluación directa)
+"""
+
+import numpy as np
+
+WAVETABLE_SIZE = 2048  # Potencia de dos: el índice se envuelve con una máscara
+
+_phase_grid = 2 * np.pi * np.arange(WAVETABLE_SIZE) / WAVETABLE_SIZE
+_cycles = np.arange(WAVETABLE_SIZE) / WAVETABLE_SIZE
+
+WAVETABLES = {
+    'seno': np.sin(_phase_grid),
+    'cuadrada': np.sign(np.sin(_phase_grid)),
+    'triángulo': 2 * np.arcsin(np.sin(_phase_grid)) / np.pi,
+    'sierra': 2 * (_cycles - np.floor(_cycles + 0.5))
+}
+for _table in WAVETABLES.values():
+    _table.setflags(write=False)
+
+
+def has_wavetable(wave_type):
+    return wave_type in WAVETABLES
+
+
+def render_wavetable(wave_type, phase):
+    """Lectura sin interpolación de la tabla para una fase en radianes"""
+    index = (phase * (WAVETABLE_SIZE / (2 * np.pi))).astype(np.int64)
+    index &= WAVETABLE_SIZE - 1
+    return WAVETABLES[wave_type][index]
@@ -3,8 +3,11 @@ Controles globales de audio
 """
 
 from PySide6.QtWidgets import (QGroupBox, QVBoxLayout, QHBoxLayout, 
-                              QPushButton, QSlider, QLabel)
+                              QPushButton, QSlider, QLabel, QComboBox, QCheckBox)
 from PySide6.QtCore import Qt, Signal
+from ..utils.constants import AudioConstants
+from ..utils.app_config import get_audio_config
+from ..audio.realtime import format_report
 
 class AudioControls(QGroupBox):
     """Controles globales del sistema de audio"""
@@ -37,6 +40,47 @@ class AudioControls(QGroupBox):
         
         layout.addLayout(vol_layout)
         
+        # Frecuencia de muestreo del motor
+        rate_layout = QHBoxLayout()
+        rate_layout.addWidget(QLabel("🎚️ Frecuencia de muestreo:"))
+        
+        self.sample_rate_combo = QComboBox()
+        self.sample_rate_combo.addItem("Auto (dispositivo)", 'auto')
+        for rate in AudioConstants.SUPPORTED_SAMPLE_RATES:
+            self.sample_rate_combo.addItem(f"{rate / 1000:g} kHz", rate)
+        audio_config = get_audio_config()
+        configured_rate = audio_config.get('sample_rate')
+        index = self.sample_rate_combo.findData(configured_rate)
+        self.sample_rate_combo.setCurrentIndex(max(0, index))
+        rate_layout.addWidget(self.sample_rate_combo)
+        
+        # Perfil de latencia y auto-ajuste del bloque
+        rate_layout.addWidget(QLabel("⏱️ Latencia:"))
+        self.latency_combo = QComboBox()
+        for key, profile in AudioConstants.LATENCY_PROFILES.items():
+            self.latency_combo.addItem(f"{profile['name']} ({profile['buffer_size']})", key)
+        self.latency_combo.addItem("Auto-ajustado", 'auto')
+        self._select_latency_item(audio_config.get('latency_profile'), audio_config.get('buffer_size'))
+        rate_layout.addWidget(self.latency_combo)
+        
+        # Disposición de altavoces de la salida
+        rate_layout.addWidget(QLabel("🔈 Salida:"))
+        self.output_layout_combo = QComboBox()
+        for name, azimuths in AudioConstants.SPEAKER_LAYOUTS.items():
+            self.output_layout_combo.addItem(f"{name} ({len(azimuths)} canales)", name)
+        layout_index = self.output_layout_combo.findData(audio_config.get('speaker_layout'))
+        if layout_index < 0:
+            layout_index = self.output_layout_combo.findData('stereo')
+        self.output_layout_combo.setCurrentIndex(layout_index)
+        rate_layout.addWidget(self.output_layout_combo)
+        
+        self.autotune_button = QPushButton("⚙️ Auto-ajustar")
+        self.autotune_button.setToolTip("Mide la escena actual y elige el bloque más pequeño estable")
+        rate_layout.addWidget(self.autotune_button)
+        rate_layout.addStretch()
+        
+        layout.addLayout(rate_layout)
+        
         # Botones de control
         buttons_layout = QHBoxLayout()
         
@@ -58,6 +102,11 @@ class AudioControls(QGroupBox):
         self.info_label.setStyleSheet("font-size: 10px; color: #666;")
         info_layout.addWidget(self.info_label)
         
+        self.realtime_checkbox = QCheckBox("⚡ Modo tiempo real")
+        self.realtime_checkbox.setToolTip("Prioridad del hilo de audio, bloqueo de memoria y control del GC")
+        self.realtime_checkbox.setChecked(bool(audio_config.get('realtime_mode')))
+        info_layout.addWidget(self.realtime_checkbox)
+        
         layout.addLayout(info_layout)
     
     def connect_signals(self):
@@ -70,12 +119,18 @@ class AudioControls(QGroupBox):
         self.start_audio_button.clicked.connect(self.start_audio_system)
         self.stop_audio_button.clicked.connect(self.stop_audio_system)
         self.clear_all_button.clicked.connect(self.clear_all_requested.emit)
+        self.sample_rate_combo.currentIndexChanged.connect(self.change_sample_rate)
+        self.latency_combo.currentIndexChanged.connect(self.change_latency_profile)
+        self.autotune_button.clicked.connect(self.autotune_block_size)
+        self.realtime_checkbox.toggled.connect(self.toggle_realtime_mode)
+        self.output_layout_combo.currentIndexChanged.connect(self.change_output_layout)
         self.theme_button.clicked.connect(self.toggle_theme)
         
         # Señales del motor de audio
         if self.audio_engine:
             self.audio_engine.audio_started.connect(self.on_audio_started)
             self.audio_engine.audio_stopped.connect(self.on_audio_stopped)
+            self.audio_engine.autotune_finished.connect(self.on_autotune_finished)
     
     def update_volume_label(self):
         volume = self.master_volume_slider.value()
@@ -90,6 +145,79 @@ class AudioControls(QGroupBox):
             self.audio_engine.stop_audio()
             self.audio_system_toggled.emit(False)
     
+    def change_sample_rate(self):
+        if self.audio_engine:
+            rate = self.audio_engine.set_sample_rate(self.sample_rate_combo.currentData())
+            self._update_info_label()
+            print(f"🎚️ Frecuencia de muestreo: {rate} Hz")
+    
+    def change_output_layout(self):
+        if not self.audio_engine:
+            return
+        layout = self.output_layout_combo.currentData()
+        channels = len(AudioConstants.SPEAKER_LAYOUTS[layout])
+        effective = self.audio_engine.set_output_channels(channels, layout)
+        if effective != channels:
+            self.info_label.setText(f"⚠️ El dispositivo solo admite {effective} canales")
+        else:
+            self._update_info_label()
+    
+    def toggle_realtime_mode(self, enabled):
+        if not self.audio_engine:
+            return
+        report = self.audio_engine.set_realtime_mode(enabled, self.audio_engine.audio_thread.realtime_cpus)
+        self.realtime_checkbox.setToolTip(format_report(report) if report else
+                                          "Se aplicará al iniciar el audio")
+    
+    def change_latency_profile(self):
+        profile = self.latency_combo.currentData()
+        if not self.audio_engine:
+            return
+        if profile == 'auto':
+            self.autotune_block_size()
+        else:
+            self.audio_engine.set_latency_profile(profile)
+            self._update_info_label()
+    
+    def autotune_block_size(self):
+        if not self.audio_engine or self.audio_engine.is_autotuning():
+            return
+        # La medición corre en otro hilo; el resultado llega por `autotune_finished`
+        self.autotune_button.setEnabled(False)
+        self.latency_combo.setEnabled(False)
+        self.autotune_button.setText("⏳ Midiendo...")
+        self.info_label.setText("⏳ Auto-ajuste: midiendo la escena...")
+        self.audio_engine.autotune_block_size()
+    
+    def on_autotune_finished(self, result):
+        self.autotune_button.setEnabled(True)
+        self.latency_combo.setEnabled(True)
+        self.autotune_button.setText("⚙️ Auto-ajustar")
+        if result is None:
+            self.info_label.setText("⚠️ Auto-ajuste: agregue tonos para medir la escena")
+            return
+        self._select_latency_item('auto', result['buffer_size'])
+        self._update_info_label()
+    
+    def _select_latency_item(self, profile, buffer_size):
+        """Selecciona el perfil sin volver a aplicarlo"""
+        index = self.latency_combo.findData(profile)
+        if index < 0:
+            index = self.latency_combo.findData(AudioConstants.DEFAULT_LATENCY_PROFILE)
+        self.latency_combo.blockSignals(True)
+        self.latency_combo.setItemText(self.latency_combo.findData('auto'),
+                                       f"Auto-ajustado ({buffer_size})" if profile == 'auto'
+                                       else "Auto-ajustado")
+        self.latency_combo.setCurrentIndex(index)
+        self.latency_combo.blockSignals(False)
+    
+    def _update_info_label(self):
+        if self.audio_engine and self.audio_engine.is_running:
+            thread = self.audio_engine.audio_thread
+            block_ms = thread.buffer_size / thread.sample_rate * 1000
+            self.info_label.setText(f"🔊 Sistema de audio: Activo ({thread.sample_rate / 1000:g} kHz, "
+                                    f"bloque {thread.buffer_size} = {block_ms:.1f} ms)")
+    
     def toggle_theme(self):
         if self.theme_manager:
             self.theme_manager.toggle_theme()
@@ -97,6 +225,7 @@ class AudioControls(QGroupBox):
     def on_audio_started(self):
         self.info_label.setText("🔊 Sistema de audio: Activo")
         self.info_label.setStyleSheet("font-size: 10px; color: #28a745; font-weight: bold;")
+        self._update_info_label()
         self.start_audio_button.setEnabled(False)
         self.stop_audio_button.setEnabled(True)
     
@@ -14,10 +14,15 @@ class PomodoroControl(QGroupBox):
     long_break_finished = Signal()
     pomodoro_cycle_completed = Signal()
     pomodoro_tick = Signal(str, str)  # phase, time_remaining
+    phase_countdown_started = Signal()  # La cuenta de la fase actual corre (inicio, reanudación, cambio)
+    phase_countdown_stopped = Signal()  # La cuenta se detuvo (pausa, reinicio)
     
     def __init__(self):
         super().__init__("🍅 Sistema Pomodoro Avanzado")
         self.timer = QTimer()
+        # Si es True, el fin de fase lo marca un reloj externo (el motor de audio)
+        # llamando a `advance_phase`; el QTimer solo actualiza la pantalla
+        self.external_phase_clock = False
         self.current_phase = "work"  # "work", "short_break", "long_break"
         self.remaining_time = 25 * 60
         self.cycles_completed = 0
@@ -239,6 +244,7 @@ class PomodoroControl(QGroupBox):
         
         self.update_ui_for_phase()
         self.status_info.setText("▶ Pomodoro en progreso...")
+        self.phase_countdown_started.emit()
     
     def pause_pomodoro(self):
         if self.timer.isActive():
@@ -246,19 +252,30 @@ class PomodoroControl(QGroupBox):
             self.pause_button.setText("▶ Continuar")
             self.start_button.setEnabled(True)
             self.status_info.setText("⏸ Pomodoro pausado")
+            self.phase_countdown_stopped.emit()
         else:
             self.timer.start(1000)
             self.pause_button.setText("⏸ Pausar")
             self.start_button.setEnabled(False)
             self.status_info.setText("▶ Pomodoro continuando...")
+            self.phase_countdown_started.emit()
     
     def skip_phase(self):
         """Salta a la siguiente fase"""
-        self.remaining_time = 0
-        self.update_timer()  # Esto provocará el cambio de fase
+        self.advance_phase()
+    
+    def advance_phase(self):
+        """Termina la fase actual ya (fin marcado por el reloj externo o salto manual)"""
+        self.switch_phase()
+        if self.timer.isActive():
+            self.timer.start(1000)  # Alinear los segundos con el inicio de la fase
+        
+        self.update_display()
+        self.pomodoro_tick.emit(self.get_phase_name(), self.format_time(self.remaining_time))
     
     def reset_pomodoro(self):
         self.timer.stop()
+        self.phase_countdown_stopped.emit()
         self.is_running = False
         self.cycles_completed = 0
         self.current_phase = "work"
@@ -277,9 +294,10 @@ class PomodoroControl(QGroupBox):
         self.status_info.setText("🔄 Pomodoro reiniciado")
     
     def update_timer(self):
-        self.remaining_time -= 1
+        if self.remaining_time > 0:
+            self.remaining_time -= 1
         
-        if self.remaining_time <= 0:
+        if self.remaining_time <= 0 and not self.external_phase_clock:
             self.switch_phase()
         
         self.update_display()
@@ -317,6 +335,8 @@ class PomodoroControl(QGroupBox):
         self.total_phase_time = self.remaining_time
         self.update_ui_for_phase()
         self.update_cycle_display()
+        if self.timer.isActive():
+            self.phase_countdown_started.emit()
     
     def update_ui_for_phase(self):
         if self.current_phase == "work":
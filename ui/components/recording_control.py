@@ -3,44 +3,51 @@ Sistema de grabación de audio para sesiones de timer y pomodoro
 """
 
 import os
-import numpy as np
 from pathlib import Path
 from datetime import datetime
 from PySide6.QtWidgets import (QGroupBox, QVBoxLayout, QHBoxLayout, QGridLayout,
                               QLabel, QPushButton, QComboBox, QSpinBox, QCheckBox,
-                              QFileDialog, QMessageBox, QProgressBar)
+                              QFileDialog, QProgressBar)
 from PySide6.QtCore import Qt, Signal, QThread, QTimer
-
-try:
-    import soundfile as sf
-    SOUNDFILE_AVAILABLE = True
-except ImportError:
-    SOUNDFILE_AVAILABLE = False
+from ..utils.constants import AudioConstants
+from ..audio.wav_writer import StreamingWavWriter
+from ..audio.encoding import (EncodingPipeline, PENDING_SUFFIX, available_formats,
+                              encoder_sample_rate, pending_path)
 
 class AudioRecorder(QThread):
     """Hilo para grabación de audio"""
     
     recording_progress = Signal(int)  # Progreso en segundos
-    recording_finished = Signal(str)  # Archivo generado
+    recording_finished = Signal(str)  # Archivo generado (WAV final o intermedio)
     recording_error = Signal(str)     # Error en grabación
     
     def __init__(self):
         super().__init__()
         self.is_recording = False
-        self.audio_data = []
         self.sample_rate = 44100
         self.output_file = ""
+        self.recorded_file = ""
         self.format = "wav"
+        self.subtype = "PCM_16"
+        self.noise_shaping = False
         self.duration = 0
-        self.audio_callback = None
+        self.tap = None
     
-    def start_recording(self, output_file, format_type, expected_duration, audio_callback):
-        """Inicia la grabación"""
+    def start_recording(self, output_file, format_type, expected_duration, tap,
+                        subtype="PCM_16", noise_shaping=False):
+        """
+        Inicia la grabación vaciando la toma de grabación del motor (`tap`);
+        `subtype` es la profundidad del WAV final (ver RECORDING_BIT_DEPTHS)
+        """
         self.output_file = output_file
         self.format = format_type.lower()
+        self.subtype = subtype
+        self.noise_shaping = noise_shaping
+        # Los formatos comprimidos se graban en un WAV intermedio y se codifican después
+        self.recorded_file = output_file if self.format == "wav" else pending_path(output_file)
         self.duration = expected_duration
-        self.audio_callback = audio_callback
-        self.audio_data = []
+        self.tap = tap
+        self.sample_rate = tap.sample_rate or self.sample_rate
         self.is_recording = True
         self.start()
     
@@ -50,78 +57,86 @@ class AudioRecorder(QThread):
         self.wait()
     
     def run(self):
-        """Loop de grabación"""
-        start_time = datetime.now()
+        """
+        Loop de grabación: vacía la toma sin huecos mientras el audio suena y
+        escribe cada tramo directamente en el archivo (memoria constante)
+        """
+        recorded_frames = 0
+        writer = None
         
         try:
+            writer = self._open_writer()
+            
             while self.is_recording:
-                # Capturar audio del callback
-                if self.audio_callback:
-                    audio_chunk = self.audio_callback()
-                    if audio_chunk is not None:
-                        self.audio_data.append(audio_chunk)
+                # Se lee antes de vaciar: lo anterior al cambio ya está publicado
+                mismatched_channels = self.tap.mismatched_channels
+                audio_chunk = self.tap.pop()
+                if len(audio_chunk):
+                    writer.write(audio_chunk)
+                    recorded_frames += len(audio_chunk)
+                if mismatched_channels is not None:
+                    raise RuntimeError(f"la salida pasó de {self.tap.channels} a {mismatched_channels} "
+                                       f"canales; se conserva lo grabado hasta el cambio")
                 
-                # Calcular progreso
-                elapsed = (datetime.now() - start_time).total_seconds()
+                # Progreso según el audio capturado, no según el reloj
+                elapsed = recorded_frames / self.sample_rate
                 self.recording_progress.emit(int(elapsed))
                 
                 # Verificar si se alcanzó la duración esperada
                 if self.duration > 0 and elapsed >= self.duration:
                     break
                 
-                self.msleep(100)  # 100ms entre capturas
+                self.msleep(50)  # El búfer circular cubre varios segundos
+            
+            # Lo que quedó en la toma al detener
+            audio_chunk = self.tap.pop()
+            if len(audio_chunk):
+                writer.write(audio_chunk)
+                recorded_frames += len(audio_chunk)
+            writer.close()
+            if self.tap.dropped_frames:
+                print(f"⚠️  Grabación: {self.tap.dropped_frames} muestras descartadas por desbordamiento")
             
-            # Guardar archivo
-            if self.audio_data:
-                self._save_audio_file()
-                self.recording_finished.emit(self.output_file)
+            if recorded_frames:
+                self.recording_finished.emit(self.recorded_file)
             else:
+                os.remove(self.recorded_file)
                 self.recording_error.emit("No se capturó audio")
                 
         except Exception as e:
+            if writer is not None:
+                try:
+                    writer.close()  # Conserva lo grabado hasta el error
+                except Exception:
+                    pass
             self.recording_error.emit(f"Error en grabación: {str(e)}")
     
-    def _save_audio_file(self):
-        """Guarda el archivo de audio"""
-        if not self.audio_data:
-            raise Exception("No hay datos de audio para guardar")
-        
-        # Concatenar todos los chunks de audio
-        audio_array = np.concatenate(self.audio_data, axis=0)
-        
-        if SOUNDFILE_AVAILABLE:
-            # Usar soundfile para guardar
-            sf.write(self.output_file, audio_array, self.sample_rate)
-        else:
-            # Implementación básica para WAV sin dependencias
-            self._save_wav_basic(audio_array)
-    
-    def _save_wav_basic(self, audio_data):
-        """Guarda WAV básico sin soundfile"""
-        import struct
-        import wave
-        
-        # Normalizar y convertir a 16-bit
-        audio_data = np.clip(audio_data, -1.0, 1.0)
-        audio_16bit = (audio_data * 32767).astype(np.int16)
-        
-        with wave.open(self.output_file, 'wb') as wav_file:
-            wav_file.setnchannels(2 if len(audio_16bit.shape) > 1 else 1)
-            wav_file.setsampwidth(2)  # 16-bit
-            wav_file.setframerate(self.sample_rate)
-            wav_file.writeframes(audio_16bit.tobytes())
+    def _open_writer(self):
+        """
+        Abre el WAV de salida para escritura incremental; el intermedio de
+        los formatos comprimidos guarda PCM flotante sin pérdidas (la
+        profundidad final se aplica al codificar)
+        """
+        subtype = self.subtype if self.format == "wav" else 'FLOAT'
+        return StreamingWavWriter(self.recorded_file, self.sample_rate, self.tap.channels, subtype,
+                                  noise_shaping=self.noise_shaping)
 
 class RecordingControl(QGroupBox):
     """Control de grabación para timer y pomodoro"""
     
     recording_started = Signal()
     recording_stopped = Signal()
+    ready_to_close = Signal()  # Terminaron las codificaciones que retenían el cierre
     
     def __init__(self, audio_engine):
         super().__init__("🎙️ Sistema de Grabación")
         self.audio_engine = audio_engine
         self.recorder = AudioRecorder()
+        self.encoder = EncodingPipeline(parent=self)
+        self._pending_encode = None  # (WAV intermedio, destino, formato, subtipo, conformación)
+        self._previous_sample_rate = None  # Frecuencia del motor a restaurar al terminar
         self.is_recording = False
+        self._closing = False
         self.timer_active = False
         self.pomodoro_active = False
         self.setup_ui()
@@ -137,25 +152,37 @@ class RecordingControl(QGroupBox):
         # Formato de archivo
         config_layout.addWidget(QLabel("Formato:"), 0, 0)
         self.format_combo = QComboBox()
-        self.format_combo.addItems(["WAV", "MP3", "FLAC"])
+        self.format_combo.addItems([fmt for fmt in AudioConstants.EXPORT_FORMATS
+                                    if fmt in available_formats()])
         self.format_combo.setCurrentText("WAV")
         config_layout.addWidget(self.format_combo, 0, 1)
         
-        # Calidad/Bitrate
+        # Calidad: frecuencia de muestreo y profundidad por defecto
         config_layout.addWidget(QLabel("Calidad:"), 0, 2)
         self.quality_combo = QComboBox()
-        self.quality_combo.addItems(["Estándar", "Alta", "Máxima"])
+        self.quality_combo.addItems(list(AudioConstants.RECORDING_QUALITY))
         config_layout.addWidget(self.quality_combo, 0, 3)
         
+        # Profundidad de bits y conformación de ruido del dither
+        config_layout.addWidget(QLabel("Profundidad:"), 1, 0)
+        self.bit_depth_combo = QComboBox()
+        self.bit_depth_combo.addItems(list(AudioConstants.RECORDING_BIT_DEPTHS))
+        config_layout.addWidget(self.bit_depth_combo, 1, 1)
+        
+        self.noise_shaping_checkbox = QCheckBox("Conformación de ruido")
+        self.noise_shaping_checkbox.setToolTip("Dither con el ruido desplazado a los agudos (16 y 24 bits)")
+        config_layout.addWidget(self.noise_shaping_checkbox, 1, 2, 1, 2)
+        self.on_quality_changed(self.quality_combo.currentText())
+        
         # Directorio de salida
-        config_layout.addWidget(QLabel("Carpeta:"), 1, 0)
+        config_layout.addWidget(QLabel("Carpeta:"), 2, 0)
         self.output_dir_label = QLabel("./recordings")
         self.output_dir_label.setStyleSheet("border: 1px solid #ccc; padding: 4px; background: #f9f9f9;")
-        config_layout.addWidget(self.output_dir_label, 1, 1, 1, 2)
+        config_layout.addWidget(self.output_dir_label, 2, 1, 1, 2)
         
         self.browse_button = QPushButton("📁 Examinar")
         self.browse_button.clicked.connect(self.browse_output_dir)
-        config_layout.addWidget(self.browse_button, 1, 3)
+        config_layout.addWidget(self.browse_button, 2, 3)
         
         layout.addWidget(config_frame)
         
@@ -210,12 +237,19 @@ class RecordingControl(QGroupBox):
     def connect_signals(self):
         """Conecta señales de la interfaz y grabadora"""
         self.start_button.clicked.connect(self.start_manual_recording)
+        self.quality_combo.currentTextChanged.connect(self.on_quality_changed)
         self.stop_button.clicked.connect(self.stop_recording)
         
         # Señales de la grabadora
         self.recorder.recording_progress.connect(self.update_progress)
         self.recorder.recording_finished.connect(self.on_recording_finished)
         self.recorder.recording_error.connect(self.on_recording_error)
+        
+        # Señales de la codificación en segundo plano
+        self.encoder.encoding_progress.connect(self.on_encoding_progress)
+        self.encoder.encoding_finished.connect(self.on_encoding_finished)
+        self.encoder.encoding_error.connect(self.on_encoding_error)
+        self.encoder.drained.connect(self.on_encoding_drained)
     
     def browse_output_dir(self):
         """Selecciona directorio de salida"""
@@ -225,6 +259,12 @@ class RecordingControl(QGroupBox):
         if directory:
             self.output_dir_label.setText(directory)
     
+    def on_quality_changed(self, quality_name):
+        """La calidad elegida propone su profundidad de bits"""
+        quality = AudioConstants.RECORDING_QUALITY.get(quality_name)
+        if quality:
+            self.bit_depth_combo.setCurrentText(quality['bit_depth'])
+    
     def start_manual_recording(self):
         """Inicia grabación manual"""
         self.start_recording("manual")
@@ -241,16 +281,26 @@ class RecordingControl(QGroupBox):
             
             # Generar nombre de archivo
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            format_ext = self.format_combo.currentText().lower()
+            format_name = self.format_combo.currentText()
+            format_ext = format_name.lower()
             filename = f"{session_type}_{timestamp}.{format_ext}"
             output_file = output_dir / filename
             
-            # Configurar callback de audio
-            audio_callback = self.create_audio_callback()
+            # La calidad elegida fija la frecuencia del motor durante la grabación
+            self._switch_sample_rate(format_name)
+            
+            # El callback de audio alimenta la toma con cada bloque renderizado
+            tap = self.audio_engine.open_recording_tap()
             
             # Iniciar grabación
             expected_duration = 0  # 0 = duración indefinida para manual
-            self.recorder.start_recording(str(output_file), format_ext, expected_duration, audio_callback)
+            subtype = AudioConstants.RECORDING_BIT_DEPTHS[self.bit_depth_combo.currentText()]
+            noise_shaping = self.noise_shaping_checkbox.isChecked()
+            self.recorder.start_recording(str(output_file), format_ext, expected_duration, tap,
+                                          subtype, noise_shaping)
+            if format_ext != "wav":
+                self._pending_encode = (self.recorder.recorded_file, str(output_file), format_name,
+                                        subtype, noise_shaping)
             
             self.is_recording = True
             self.update_ui_recording_state(True)
@@ -258,30 +308,46 @@ class RecordingControl(QGroupBox):
             self.recording_started.emit()
             
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo iniciar grabación: {str(e)}")
+            self._restore_sample_rate()
+            self.show_file_message(f"❌ No se pudo iniciar grabación: {str(e)}", error=True)
+    
+    def _switch_sample_rate(self, format_name):
+        """
+        Pone el motor a la frecuencia de la calidad elegida y recuerda la
+        anterior. Con tonos sonando el cambio reabriría el stream en plena
+        sesión, así que se graba a la frecuencia actual salvo que el
+        codificador no la admita.
+        """
+        quality = AudioConstants.RECORDING_QUALITY[self.quality_combo.currentText()]
+        sample_rate = encoder_sample_rate(format_name, quality['sample_rate'])
+        current_rate = self.audio_engine.get_sample_rate()
+        if current_rate == sample_rate:
+            return
+        if not self.audio_engine.is_idle() and encoder_sample_rate(format_name, current_rate) == current_rate:
+            print(f"🎙️  Grabación a {current_rate} Hz: el motor está sonando, no se cambia a {sample_rate} Hz")
+            return
+        self._previous_sample_rate = current_rate
+        self.audio_engine.set_sample_rate(sample_rate, persist=False)
+    
+    def _restore_sample_rate(self):
+        """Devuelve el motor a la frecuencia que tenía antes de grabar"""
+        if self._previous_sample_rate is None:
+            return
+        sample_rate, self._previous_sample_rate = self._previous_sample_rate, None
+        self.audio_engine.set_sample_rate(sample_rate, persist=False)
     
     def stop_recording(self):
         """Detiene grabación"""
         if not self.is_recording:
             return
         
+        self.audio_engine.close_recording_tap()
         self.recorder.stop_recording()
+        self._restore_sample_rate()
         self.is_recording = False
         self.update_ui_recording_state(False)
         self.recording_stopped.emit()
     
-    def create_audio_callback(self):
-        """Crea callback para capturar audio del motor"""
-        def audio_callback():
-            if self.audio_engine and hasattr(self.audio_engine, 'audio_thread'):
-                # Obtener buffer actual del hilo de audio
-                thread = self.audio_engine.audio_thread
-                if hasattr(thread, 'current_buffer'):
-                    return thread.current_buffer.copy()
-            return np.zeros((512, 2), dtype=np.float32)  # Silencio si no hay audio
-        
-        return audio_callback
-    
     def update_ui_recording_state(self, recording):
         """Actualiza UI según estado de grabación"""
         if recording:
@@ -304,20 +370,101 @@ class RecordingControl(QGroupBox):
         time_str = f"{hours:02d}:{minutes:02d}:{secs:02d}"
         self.status_label.setText(f"🔴 GRABANDO - {time_str}")
     
-    def on_recording_finished(self, output_file):
-        """Maneja finalización de grabación"""
+    def show_file_message(self, text, error=False):
+        """Informa en la etiqueta de archivo (sin diálogos modales)"""
+        color = "#dc3545" if error else "#666"
+        self.file_info_label.setStyleSheet(f"font-size: 10px; color: {color}; font-style: italic;")
+        self.file_info_label.setText(text)
+    
+    def on_recording_finished(self, recorded_file):
+        """Maneja finalización de grabación; los formatos comprimidos pasan al codificador"""
+        self.audio_engine.close_recording_tap()
+        self._restore_sample_rate()
+        self.is_recording = False
         self.update_ui_recording_state(False)
-        file_size = Path(output_file).stat().st_size / (1024 * 1024)  # MB
-        self.file_info_label.setText(f"✅ Guardado: {Path(output_file).name} ({file_size:.1f} MB)")
-        
-        QMessageBox.information(self, "Grabación Completa", 
-                               f"Archivo guardado:{output_file}")
+        if recorded_file.endswith(PENDING_SUFFIX):
+            self._submit_pending_encode(recorded_file)
+            return
+        file_size = Path(recorded_file).stat().st_size / (1024 * 1024)  # MB
+        self.show_file_message(f"✅ Guardado: {Path(recorded_file).name} ({file_size:.1f} MB)")
+    
+    def _submit_pending_encode(self, recorded_file=None):
+        """Envía al codificador la grabación pendiente (si sigue pendiente)"""
+        if self._pending_encode is None:
+            return
+        source, target, format_name, subtype, noise_shaping = self._pending_encode
+        if recorded_file is not None and recorded_file != source:
+            return
+        self._pending_encode = None
+        if not os.path.exists(source):
+            return
+        try:
+            self.encoder.submit(source, target, format_name, subtype, noise_shaping)
+        except Exception as e:
+            self.show_file_message(f"❌ No se pudo codificar, se conserva {Path(source).name}: {e}",
+                                   error=True)
+            return
+        self.show_file_message(f"⏳ Codificando {Path(target).name}...")
     
     def on_recording_error(self, error_msg):
         """Maneja errores de grabación"""
+        self.audio_engine.close_recording_tap()
+        self._restore_sample_rate()
+        self.is_recording = False
+        self._pending_encode = None
         self.update_ui_recording_state(False)
-        self.file_info_label.setText(f"❌ Error: {error_msg}")
-        QMessageBox.critical(self, "Error de Grabación", error_msg)
+        self.show_file_message(f"❌ Error: {error_msg}", error=True)
+    
+    def on_encoding_progress(self, target, percent):
+        """Actualiza el progreso de una codificación (si no se está grabando otra sesión)"""
+        if not self.is_recording:
+            self.show_file_message(f"⏳ Codificando {Path(target).name}: {percent}%")
+    
+    def on_encoding_finished(self, target):
+        """Maneja el fin de una codificación"""
+        file_size = Path(target).stat().st_size / (1024 * 1024)  # MB
+        print(f"✅ Codificación terminada: {target}")
+        if not self.is_recording:
+            self.show_file_message(f"✅ Guardado: {Path(target).name} ({file_size:.1f} MB)")
+    
+    def on_encoding_error(self, target, error_msg):
+        """Maneja errores de codificación; el WAV intermedio se conserva"""
+        print(f"❌ Error codificando {target}: {error_msg}")
+        self.show_file_message(f"❌ Error codificando {Path(target).name} "
+                               f"(se conserva {Path(pending_path(target)).name}): {error_msg}",
+                               error=True)
+    
+    def on_encoding_drained(self):
+        """Al vaciarse la cola durante el cierre, la ventana ya puede cerrarse"""
+        if self._closing:
+            self.encoder.shutdown()
+            self.ready_to_close.emit()
+    
+    def shutdown(self):
+        """
+        Detiene la grabación antes de salir. Retorna True si ya se puede
+        cerrar; si quedan codificaciones siguen en segundo plano con su
+        progreso visible y `ready_to_close` avisa al terminar. Llamarla otra
+        vez mientras tanto las cancela conservando los WAV intermedios.
+        """
+        if self.is_recording:
+            self.stop_recording()
+        # La señal de fin de la grabación aún no se ha entregado: se encola aquí
+        self._submit_pending_encode()
+        jobs = self.encoder.active_jobs
+        if not jobs:
+            self.encoder.shutdown()
+            return True
+        if self._closing:
+            kept = self.encoder.cancel()
+            print(f"⏹ Codificación cancelada, se conservan {len(kept)} WAV intermedio(s): "
+                  f"{', '.join(kept)}")
+            return True
+        self._closing = True
+        print(f"⏳ Esperando {jobs} codificación(es) antes de salir...")
+        self.show_file_message(f"⏳ Terminando {jobs} codificación(es) antes de salir "
+                               f"(cierre otra vez para cancelar)")
+        return False
     
     def on_timer_started(self):
         """Maneja inicio de timer"""
@@ -12,6 +12,8 @@ class TimerControl(QGroupBox):
     timer_finished = Signal()
     timer_started = Signal()
     timer_stopped = Signal()
+    timer_paused = Signal()
+    timer_resumed = Signal()
     timer_tick = Signal(str)  # Para estadísticas en tiempo real
     
     def __init__(self):
@@ -180,11 +182,13 @@ class TimerControl(QGroupBox):
             self.pause_button.setText("▶ Continuar")
             self.start_button.setEnabled(True)
             self.status_label.setText("⏸ Timer pausado")
+            self.timer_paused.emit()
         else:
             self.timer.start(1000)
             self.pause_button.setText("⏸ Pausar")
             self.start_button.setEnabled(False)
             self.status_label.setText("▶ Timer continuando...")
+            self.timer_resumed.emit()
     
     def stop_timer(self):
         self.timer.stop()
@@ -3,7 +3,8 @@ Control de tono mejorado - UI corregida y funcional
 """
 
 from PySide6.QtWidgets import (QFrame, QVBoxLayout, QHBoxLayout, QGridLayout,
-                              QLabel, QPushButton, QSpinBox, QSlider, QComboBox, QCheckBox)
+                              QLabel, QPushButton, QSpinBox, QDoubleSpinBox, QSlider,
+                              QComboBox, QCheckBox)
 from PySide6.QtCore import Qt, Signal
 from ..utils.constants import UIConstants, WaveTypes, AudioConstants
 
@@ -38,6 +39,9 @@ class ToneControl(QFrame):
         # Grid de controles principales con mejor espaciado
         self._create_enhanced_controls_grid(layout, initial_frequency)
         
+        # Parámetros propios de algunos tipos de onda (ocultos por defecto)
+        self._create_wave_options_section(layout)
+        
         # Checkbox de habilitación mejorado
         self._create_enhanced_enable_section(layout)
     
@@ -342,9 +346,8 @@ class ToneControl(QFrame):
         grid.addWidget(wave_label, 0, 2)
         
         self.wave_type_combo = QComboBox()
-        # Agregar todos los tipos incluyendo ruidos
-        all_wave_types = WaveTypes.get_all_types() + ["Ruido Blanco", "Ruido Rosa", "Ruido Marrón"]
-        self.wave_type_combo.addItems(all_wave_types)
+        # Agregar todos los tipos incluyendo barrido y ruidos
+        self.wave_type_combo.addItems(WaveTypes.get_all_types())
         self.wave_type_combo.setMinimumWidth(140)
         self.wave_type_combo.setMinimumHeight(35)
         self.wave_type_combo.setStyleSheet("""
@@ -394,6 +397,117 @@ class ToneControl(QFrame):
         self.status_label.setAlignment(Qt.AlignCenter)
         grid.addWidget(self.status_label, 3, 2)
     
+    def _create_wave_options_section(self, parent_layout: QVBoxLayout) -> None:
+        """Parámetros del barrido de frecuencia: inicio, fin, duración y modo"""
+        self.sweep_frame = QFrame()
+        sweep_layout = QGridLayout(self.sweep_frame)
+        sweep_layout.setContentsMargins(15, 5, 15, 5)
+        sweep_layout.setSpacing(10)
+        
+        sweep_layout.addWidget(QLabel("🎚 Inicio"), 0, 0)
+        self.sweep_start_spinbox = QSpinBox()
+        self.sweep_start_spinbox.setRange(AudioConstants.MIN_FREQUENCY, AudioConstants.MAX_FREQUENCY)
+        self.sweep_start_spinbox.setValue(20)
+        self.sweep_start_spinbox.setSuffix(" Hz")
+        sweep_layout.addWidget(self.sweep_start_spinbox, 1, 0)
+        
+        sweep_layout.addWidget(QLabel("🎚 Fin"), 0, 1)
+        self.sweep_end_spinbox = QSpinBox()
+        self.sweep_end_spinbox.setRange(AudioConstants.MIN_FREQUENCY, AudioConstants.MAX_FREQUENCY)
+        self.sweep_end_spinbox.setValue(20000)
+        self.sweep_end_spinbox.setSuffix(" Hz")
+        sweep_layout.addWidget(self.sweep_end_spinbox, 1, 1)
+        
+        sweep_layout.addWidget(QLabel("⏱ Duración"), 0, 2)
+        self.sweep_duration_spinbox = QDoubleSpinBox()
+        self.sweep_duration_spinbox.setRange(0.1, 3600.0)
+        self.sweep_duration_spinbox.setDecimals(1)
+        self.sweep_duration_spinbox.setValue(10.0)
+        self.sweep_duration_spinbox.setSuffix(" s")
+        sweep_layout.addWidget(self.sweep_duration_spinbox, 1, 2)
+        
+        sweep_layout.addWidget(QLabel("📈 Modo"), 0, 3)
+        self.sweep_mode_combo = QComboBox()
+        self.sweep_mode_combo.addItems(list(WaveTypes.SWEEP_MODES.keys()))
+        sweep_layout.addWidget(self.sweep_mode_combo, 1, 3)
+        
+        self.sweep_repeat_checkbox = QCheckBox("🔁 Repetir")
+        sweep_layout.addWidget(self.sweep_repeat_checkbox, 1, 4)
+        
+        self.sweep_frame.setVisible(False)
+        parent_layout.addWidget(self.sweep_frame)
+        
+        # Parámetros del par binaural: la frecuencia del tono es la portadora
+        self.binaural_frame = QFrame()
+        binaural_layout = QGridLayout(self.binaural_frame)
+        binaural_layout.setContentsMargins(15, 5, 15, 5)
+        binaural_layout.setSpacing(10)
+        
+        binaural_layout.addWidget(QLabel("🧠 Pulso binaural"), 0, 0)
+        self.beat_spinbox = QDoubleSpinBox()
+        self.beat_spinbox.setRange(0.1, 100.0)
+        self.beat_spinbox.setDecimals(1)
+        self.beat_spinbox.setValue(10.0)
+        self.beat_spinbox.setSuffix(" Hz")
+        binaural_layout.addWidget(self.beat_spinbox, 1, 0)
+        binaural_layout.addWidget(QLabel("🎧 Usar auriculares: cada oído recibe portadora ∓ pulso/2"), 1, 1)
+        
+        self.binaural_frame.setVisible(False)
+        parent_layout.addWidget(self.binaural_frame)
+        
+        # Pendiente del ruido personalizado 1/f^α
+        self.noise_alpha_frame = QFrame()
+        alpha_layout = QGridLayout(self.noise_alpha_frame)
+        alpha_layout.setContentsMargins(15, 5, 15, 5)
+        alpha_layout.setSpacing(10)
+        
+        alpha_layout.addWidget(QLabel("📉 Pendiente α"), 0, 0)
+        self.noise_alpha_spinbox = QDoubleSpinBox()
+        self.noise_alpha_spinbox.setRange(-3.0, 3.0)
+        self.noise_alpha_spinbox.setDecimals(2)
+        self.noise_alpha_spinbox.setSingleStep(0.1)
+        self.noise_alpha_spinbox.setValue(1.0)
+        alpha_layout.addWidget(self.noise_alpha_spinbox, 1, 0)
+        alpha_layout.addWidget(QLabel("0 = blanco, 1 = rosa, 2 = marrón, -1 = azul, -2 = violeta"), 1, 1)
+        
+        self.noise_alpha_frame.setVisible(False)
+        parent_layout.addWidget(self.noise_alpha_frame)
+    
+    def _update_wave_options_visibility(self, wave_type: str) -> None:
+        """Muestra solo los parámetros del tipo de onda seleccionado"""
+        option_frames = {
+            WaveTypes.SWEEP_TYPE: self.sweep_frame,
+            WaveTypes.BINAURAL_TYPE: self.binaural_frame,
+            WaveTypes.CUSTOM_NOISE_TYPE: self.noise_alpha_frame
+        }
+        for frame_wave_type, frame in option_frames.items():
+            frame.setVisible(frame_wave_type == wave_type)
+        
+        extra_height = UIConstants.TONE_OPTIONS_HEIGHT if wave_type in option_frames else 0
+        self.setFixedHeight(UIConstants.TONE_CONTROL_HEIGHT + 50 + extra_height)
+    
+    def _get_wave_options(self, wave_type: str) -> dict:
+        """Retorna los parámetros propios del tipo de onda actual"""
+        if wave_type == WaveTypes.SWEEP_TYPE:
+            return {
+                'sweep_start': self.sweep_start_spinbox.value(),
+                'sweep_end': self.sweep_end_spinbox.value(),
+                'sweep_duration': self.sweep_duration_spinbox.value(),
+                'sweep_mode': WaveTypes.SWEEP_MODES[self.sweep_mode_combo.currentText()],
+                'sweep_repeat': self.sweep_repeat_checkbox.isChecked()
+            }
+        if wave_type == WaveTypes.BINAURAL_TYPE:
+            return {'beat': self.beat_spinbox.value()}
+        if wave_type == WaveTypes.CUSTOM_NOISE_TYPE:
+            return {'noise_alpha': self.noise_alpha_spinbox.value()}
+        return {}
+    
+    def _get_frequency_value(self, wave_type: str) -> int:
+        """Frecuencia a informar: la de inicio en barridos, 0 en ruidos"""
+        if wave_type == WaveTypes.SWEEP_TYPE:
+            return self.sweep_start_spinbox.value()
+        return self.frequency_spinbox.value() if self.frequency_spinbox.isEnabled() else 0
+    
     def _create_enhanced_enable_section(self, parent_layout: QVBoxLayout) -> None:
         """Sección de habilitación mejorada"""
         enable_frame = QFrame()
@@ -447,6 +561,17 @@ class ToneControl(QFrame):
         self.panning_slider.valueChanged.connect(self._emit_parameter_changes)
         self.wave_type_combo.currentTextChanged.connect(self._on_wave_type_changed)
         self.enable_checkbox.toggled.connect(self._emit_parameter_changes)
+        
+        # Parámetros del barrido
+        self.sweep_start_spinbox.valueChanged.connect(self._emit_parameter_changes)
+        self.sweep_end_spinbox.valueChanged.connect(self._emit_parameter_changes)
+        self.sweep_duration_spinbox.valueChanged.connect(self._emit_parameter_changes)
+        self.sweep_mode_combo.currentTextChanged.connect(self._emit_parameter_changes)
+        self.sweep_repeat_checkbox.toggled.connect(self._emit_parameter_changes)
+        
+        # Parámetros binaurales
+        self.beat_spinbox.valueChanged.connect(self._emit_parameter_changes)
+        self.noise_alpha_spinbox.valueChanged.connect(self._emit_parameter_changes)
     
     def _toggle_play_pause(self) -> None:
         """Alterna entre play y pause"""
@@ -468,11 +593,13 @@ class ToneControl(QFrame):
         """Maneja el cambio de tipo de onda"""
         wave_type = self.wave_type_combo.currentText()
         
-        # Si es un tipo de ruido, deshabilitar frecuencia
-        is_noise = wave_type in ["Ruido Blanco", "Ruido Rosa", "Ruido Marrón"]
-        self.frequency_spinbox.setEnabled(not is_noise)
+        # Si es un tipo de ruido o un barrido, deshabilitar frecuencia fija
+        is_noise = WaveTypes.is_noise_type(wave_type)
+        fixed_frequency = not is_noise and wave_type != WaveTypes.SWEEP_TYPE
+        self.frequency_spinbox.setEnabled(fixed_frequency)
+        self._update_wave_options_visibility(wave_type)
         
-        if is_noise:
+        if not fixed_frequency:
             self.frequency_spinbox.setStyleSheet("""
                 QSpinBox {
                     background-color: #f8f9fa;
@@ -584,24 +711,20 @@ class ToneControl(QFrame):
     
     def _emit_parameter_changes(self) -> None:
         """Emite los cambios de parámetros"""
-        wave_type = self.wave_type_combo.currentText().lower()
+        wave_label = self.wave_type_combo.currentText()
+        wave_type = wave_label.lower()
         
         # Convertir nombres de ruido a formato interno
-        noise_mapping = {
-            "ruido blanco": "white_noise",
-            "ruido rosa": "pink_noise", 
-            "ruido marrón": "brown_noise"
-        }
-        
-        if wave_type in noise_mapping:
-            wave_type = noise_mapping[wave_type]
+        if wave_type in WaveTypes.NOISE_MAPPING:
+            wave_type = WaveTypes.NOISE_MAPPING[wave_type]
         
         parameters = {
-            'frequency': self.frequency_spinbox.value() if self.frequency_spinbox.isEnabled() else 0,
+            'frequency': self._get_frequency_value(wave_label),
             'volume': self.volume_slider.value() / 100.0,
             'panning': self.panning_slider.value() / 100.0,
             'wave_type': wave_type,
-            'active': self.enable_checkbox.isChecked() and self.is_playing
+            'active': self.enable_checkbox.isChecked() and self.is_playing,
+            'options': self._get_wave_options(wave_label)
         }
         self.tone_parameters_changed.emit(self.tone_id, parameters)
     
@@ -626,29 +749,34 @@ class ToneControl(QFrame):
         """Deshabilita el tono externamente"""
         self.enable_checkbox.setChecked(False)
     
+    def set_playing(self, playing: bool) -> None:
+        """
+        Actualiza el estado de reproducción sin emitir señales (el llamador
+        ya aplicó el cambio al motor, p. ej. en una operación de grupo).
+        """
+        self.is_playing = playing
+        self._update_play_button_state()
+        self._update_status_display()
+    
     def is_enabled(self) -> bool:
         """Retorna si el tono está habilitado"""
         return self.enable_checkbox.isChecked()
     
     def get_current_parameters(self) -> dict:
         """Retorna los parámetros actuales del tono"""
-        wave_type = self.wave_type_combo.currentText().lower()
+        wave_label = self.wave_type_combo.currentText()
+        wave_type = wave_label.lower()
         
         # Convertir nombres de ruido
-        noise_mapping = {
-            "ruido blanco": "white_noise",
-            "ruido rosa": "pink_noise",
-            "ruido marrón": "brown_noise"
-        }
-        
-        if wave_type in noise_mapping:
-            wave_type = noise_mapping[wave_type]
+        if wave_type in WaveTypes.NOISE_MAPPING:
+            wave_type = WaveTypes.NOISE_MAPPING[wave_type]
         
         return {
-            'frequency': self.frequency_spinbox.value() if self.frequency_spinbox.isEnabled() else 0,
+            'frequency': self._get_frequency_value(wave_label),
             'volume': self.volume_slider.value() / 100.0,
             'panning': self.panning_slider.value() / 100.0,
             'wave_type': wave_type,
+            'options': self._get_wave_options(wave_label),
             'active': self.enable_checkbox.isChecked() and self.is_playing,
             'is_playing': self.is_playing,
             'is_enabled': self.enable_checkbox.isChecked()
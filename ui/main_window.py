@@ -33,6 +33,11 @@ class MainWindow(QMainWindow):
         self.tone_controls = {}
         self.next_tone_id = 1
         
+        # Eventos del motor: fin de sesión del timer y fin de fase del pomodoro
+        self._timer_end_event = None
+        self._pomodoro_phase_event = None
+        self._pomodoro_phase_token = 0
+        
         # Timer para actualizaciones
         self.update_timer = QTimer()
         self.update_timer.timeout.connect(self._update_statistics)
@@ -261,17 +266,28 @@ class MainWindow(QMainWindow):
         self.audio_engine.audio_started.connect(self._on_audio_started)
         self.audio_engine.audio_stopped.connect(self._on_audio_stopped)
         self.audio_engine.audio_stats_updated.connect(self.statistics_panel.update_audio_stats)
+        self.audio_engine.event_notified.connect(self._on_engine_event)
         
         # Señales de controles globales
         self.audio_controls.clear_all_requested.connect(self._clear_all_tones)
         
+        # Cierre diferido hasta que terminen las codificaciones
+        self.recording_control.ready_to_close.connect(self.close)
+        
         # Señales de timer
         self.timer_control.timer_started.connect(self.recording_control.on_timer_started)
         self.timer_control.timer_stopped.connect(self.recording_control.on_timer_stopped)
         self.timer_control.timer_tick.connect(self._on_timer_tick)
+        self.timer_control.timer_started.connect(self._schedule_timer_end)
+        self.timer_control.timer_resumed.connect(self._schedule_timer_end)
+        self.timer_control.timer_paused.connect(self._cancel_timer_end)
+        self.timer_control.timer_stopped.connect(self._cancel_timer_end)
+        self.timer_control.timer_finished.connect(self._on_timer_finished)
         
         # Señales de pomodoro
         self.pomodoro_control.pomodoro_tick.connect(self._on_pomodoro_tick)
+        self.pomodoro_control.phase_countdown_started.connect(self._schedule_pomodoro_phase_end)
+        self.pomodoro_control.phase_countdown_stopped.connect(self._cancel_pomodoro_phase_end)
     
     def _setup_keyboard_shortcuts(self) -> None:
         """Configura atajos de teclado"""
@@ -330,7 +346,8 @@ class MainWindow(QMainWindow):
             parameters['frequency'],
             parameters['volume'],
             parameters['wave_type'],
-            parameters['panning']
+            parameters['panning'],
+            parameters.get('options')
         )
         
         self.audio_engine.set_tone_active(tone_id, parameters['active'])
@@ -341,18 +358,27 @@ class MainWindow(QMainWindow):
     
     def _play_all_tones(self) -> None:
         """Reproduce todos los tonos"""
+        started = []
         for control in self.tone_controls.values():
             if not control.is_playing and control.is_enabled():
-                control._toggle_play_pause()
+                control.set_playing(True)
+                started.append(control.tone_id)
+        
+        # Una sola actualización del motor para todo el grupo
+        self.audio_engine.set_tones_active(started, True)
         
         self.main_status_label = "▶ Reproduciendo todos los tonos"
         self._update_status_bar()
     
     def _stop_all_tones(self) -> None:
         """Detiene todos los tonos"""
+        stopped = []
         for control in self.tone_controls.values():
             if control.is_playing:
-                control._stop_tone()
+                control.set_playing(False)
+                stopped.append(control.tone_id)
+        
+        self.audio_engine.set_tones_active(stopped, False)
         
         self.main_status_label = "⏹ Todos los tonos detenidos"
         self._update_status_bar()
@@ -370,11 +396,77 @@ class MainWindow(QMainWindow):
         """Maneja el inicio del audio"""
         self.audio_status_label = "Audio: Activo"
         self._update_status_bar()
+        
+        # El reloj del motor empieza ahora: anclar las cuentas que ya corrían
+        if self.timer_control.timer.isActive():
+            self._schedule_timer_end()
+        if self.pomodoro_control.timer.isActive():
+            self._schedule_pomodoro_phase_end()
     
     def _on_audio_stopped(self) -> None:
         """Maneja la detención del audio"""
         self.audio_status_label = "Audio: Detenido"
         self._update_status_bar()
+        
+        # Detener el motor vacía su planificador; los QTimer vuelven a mandar
+        self._timer_end_event = None
+        self._pomodoro_phase_event = None
+        self.pomodoro_control.external_phase_clock = False
+    
+    def _schedule_timer_end(self) -> None:
+        """
+        Planifica en el motor el fin exacto de la sesión del timer.
+        
+        Los eventos solo avanzan mientras se generan bloques: sin audio no
+        se planifica nada (no hay tonos que detener) y `_on_audio_started`
+        vuelve a anclar el fin con el tiempo restante.
+        """
+        self._cancel_timer_end()
+        remaining = self.timer_control.remaining_seconds
+        if remaining > 0 and self.audio_engine.is_running:
+            self._timer_end_event = self.audio_engine.schedule_event(remaining, 'stop_all_tones')
+    
+    def _cancel_timer_end(self) -> None:
+        """Cancela el fin de sesión planificado"""
+        if self._timer_end_event is not None:
+            self.audio_engine.cancel_scheduled_event(self._timer_end_event)
+            self._timer_end_event = None
+    
+    def _schedule_pomodoro_phase_end(self) -> None:
+        """
+        Planifica en el motor el fin de la fase actual del pomodoro.
+        
+        El cambio de fase llega por `event_notified` desde las estadísticas
+        del hilo de audio (unos 100 ms de latencia como máximo). Con el
+        audio detenido el QTimer del pomodoro cambia de fase él mismo.
+        """
+        self._cancel_pomodoro_phase_end()
+        remaining = self.pomodoro_control.remaining_time
+        external = self.audio_engine.is_running and remaining > 0
+        self.pomodoro_control.external_phase_clock = external
+        if external:
+            # El token descarta avisos de fases ya canceladas
+            self._pomodoro_phase_token += 1
+            self._pomodoro_phase_event = self.audio_engine.schedule_event(
+                remaining, 'notify', name=f"pomodoro_phase_end:{self._pomodoro_phase_token}")
+    
+    def _cancel_pomodoro_phase_end(self) -> None:
+        """Cancela el fin de fase planificado"""
+        if self._pomodoro_phase_event is not None:
+            self.audio_engine.cancel_scheduled_event(self._pomodoro_phase_event)
+            self._pomodoro_phase_event = None
+        self._pomodoro_phase_token += 1
+    
+    def _on_engine_event(self, name: str) -> None:
+        """Atiende los avisos 'notify' que el motor ejecutó a su hora"""
+        if name == f"pomodoro_phase_end:{self._pomodoro_phase_token}":
+            self._pomodoro_phase_event = None
+            self.pomodoro_control.advance_phase()
+    
+    def _on_timer_finished(self) -> None:
+        """Sincroniza la UI cuando el motor ya detuvo los tonos"""
+        self._timer_end_event = None
+        self._stop_all_tones()
     
     def _on_timer_tick(self, time_remaining: str) -> None:
         """Maneja tick del timer para estadísticas"""
@@ -405,12 +497,20 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event) -> None:
         """Maneja el cierre de la aplicación"""
         # Detener grabación si está activa
-        if hasattr(self.recording_control, 'is_recording') and self.recording_control.is_recording:
-            self.recording_control.stop_recording()
+        ready = self.recording_control.shutdown()
         
-        # Detener sistema de audio
+        # Detener sistema de audio (y esperar una medición de auto-ajuste en curso)
+        self.audio_engine.wait_autotune()
         self.audio_engine.stop_audio()
         
+        if not ready:
+            # Quedan codificaciones: la ventana sigue abierta con su progreso
+            # y se cierra sola al terminar (un segundo cierre las cancela)
+            self.main_status_label = "⏳ Terminando codificaciones - cierre otra vez para cancelar"
+            self._update_status_bar()
+            event.ignore()
+            return
+        
         # Detener timers
         self.update_timer.stop()
         
@@ -0,0 +1,68 @@
+"""
+Configuración persistente de la aplicación (config/app_config.json)
+"""
+
+import copy
+import json
+from pathlib import Path
+
+from .constants import AudioConstants, FileConstants
+
+DEFAULT_CONFIG = {
+    'audio': {
+        'sample_rate': AudioConstants.SAMPLE_RATE,  # Hz o 'auto' (el del dispositivo)
+        'buffer_size': AudioConstants.BUFFER_SIZE,
+        'channels': 2,  # Canales de salida o 'auto' (los del dispositivo)
+        'speaker_layout': None,  # Nombre en SPEAKER_LAYOUTS o None (según los canales)
+        'latency': 'high',  # 'low', 'high' o segundos (sounddevice)
+        'latency_profile': AudioConstants.DEFAULT_LATENCY_PROFILE,  # o 'auto' tras el auto-ajuste
+        'realtime_mode': False,
+        'realtime_cpus': None,  # Lista de núcleos para el hilo de render o None
+        'subsonic_frequency': AudioConstants.SUBSONIC_FREQUENCY,  # Hz; 0 lo desactiva
+        'reverb_ir': None,  # Ruta del WAV de respuesta al impulso o None (sin reverberación)
+        'reverb_mix': AudioConstants.REVERB_MIX,
+        'hrtf_mode': False,  # Espacialización binaural HRTF para auriculares
+        'hrir_path': None  # Directorio de HRIR WAV o None (modelo de cabeza esférica)
+    }
+}
+
+
+def load_config():
+    """Carga la configuración combinada con los valores por defecto"""
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    path = Path(FileConstants.get_config_path())
+    if path.exists():
+        try:
+            stored = json.loads(path.read_text(encoding='utf-8'))
+            for section, values in stored.items():
+                if isinstance(values, dict):
+                    config.setdefault(section, {}).update(values)
+                else:
+                    config[section] = values
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Configuración no válida, usando valores por defecto: {e}")
+    return config
+
+
+def save_config(config):
+    """Guarda la configuración completa"""
+    path = Path(FileConstants.get_config_path())
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(config, indent=2, ensure_ascii=False), encoding='utf-8')
+        return True
+    except OSError as e:
+        print(f"Error guardando configuración: {e}")
+        return False
+
+
+def get_audio_config():
+    """Retorna la sección de audio"""
+    return load_config()['audio']
+
+
+def update_audio_config(**values):
+    """Actualiza y guarda valores de la sección de audio"""
+    config = load_config()
+    config['audio'].update(values)
+    return save_config(config)
@@ -10,6 +10,7 @@ class UIConstants:
     MIN_WINDOW_HEIGHT = 700
     TONE_CONTROL_HEIGHT = 250  # Más alto para nuevos controles
     TONE_CONTROL_MIN_WIDTH = 500  # Más ancho
+    TONE_OPTIONS_HEIGHT = 70  # Alto extra para parámetros del tipo de onda
     BUTTON_HEIGHT = 35
     CONTROL_BUTTON_SIZE = 40  # Botones más grandes
     LAYOUT_MARGIN = 15
@@ -21,18 +22,101 @@ class AudioConstants:
     MAX_CONCURRENT_TONES = 32  # Más tonos simultáneos
     MIN_FREQUENCY = 1  # Frecuencia mínima más baja
     MAX_FREQUENCY = 22000  # Frecuencia máxima más alta
-    SAMPLE_RATE = 44100
+    SAMPLE_RATE = 44100  # Por defecto; la configuración puede pedir otra o 'auto'
     BUFFER_SIZE = 512
+    SUPPORTED_SAMPLE_RATES = [44100, 48000, 96000, 192000]
     
-    # Configuraciones de calidad de grabación
+    # Disposiciones de altavoces: acimut en grados (0 = frente, negativo = izquierda);
+    # None marca el canal LFE, que no recibe paneo
+    SPEAKER_LAYOUTS = {
+        'mono': [0],
+        'stereo': [-30, 30],
+        'quad': [-45, 45, -135, 135],
+        '5.1': [-30, 30, 0, None, -110, 110],
+        '7.1': [-30, 30, 0, None, -135, 135, -90, 90]
+    }
+    
+    # Perfiles de latencia: tamaño de bloque y latencia sugerida a sounddevice
+    LATENCY_PROFILES = {
+        'live': {'name': 'En vivo', 'buffer_size': 128, 'latency': 'low'},
+        'balanced': {'name': 'Equilibrado', 'buffer_size': 512, 'latency': 'high'},
+        'power_saver': {'name': 'Ahorro de energía', 'buffer_size': 2048, 'latency': 'high'}
+    }
+    DEFAULT_LATENCY_PROFILE = 'balanced'
+    
+    # Auto-ajuste del bloque: candidatos, audio medido por candidato y fracción
+    # del plazo que puede ocupar el percentil 99 del render
+    AUTOTUNE_BLOCK_SIZES = [64, 128, 256, 512, 1024, 2048]
+    AUTOTUNE_SECONDS = 0.5
+    AUTOTUNE_HEADROOM = 0.5
+    
+    # Gobernador de sobrecarga: umbrales de carga DSP (fracción del plazo),
+    # ventana de evaluación y tiempo de calma para recuperar calidad (segundos)
+    OVERLOAD_GOVERNOR = {'enabled': True, 'high': 0.8, 'low': 0.5, 'window': 0.5,
+                         'recovery': 2.0, 'steal_fraction': 0.25}
+    NOISE_DECIMATION = 4  # Factor de los ruidos decimados bajo sobrecarga
+    
+    # Modo tiempo real (opcional): prioridad SCHED_FIFO o nice de respaldo para
+    # el hilo de render, bloqueo de memoria y umbrales del GC durante la reproducción
+    REALTIME_PRIORITY = 70
+    REALTIME_NICE = -10
+    REALTIME_LOCK_MEMORY = True
+    REALTIME_GC_THRESHOLDS = (50000, 50, 100)
+    WAVE_CROSSFADE_TIME = 0.03  # Segundos de fundido al cambiar tipo de onda
+    BUS_RAMP_TIME = 0.01  # Segundos de rampa al cambiar ganancia, silencio o solo de un bus
+    
+    # Reverberación por convolución en el bus maestro (opcional)
+    REVERB_MIX = 0.25  # Proporción de señal reverberada
+    REVERB_MAX_SECONDS = 10.0  # Las respuestas al impulso más largas se recortan
+    
+    # Espacialización HRTF para auriculares: resolución (grados) con la que se
+    # agrupan las fuentes que comparten posición
+    HRTF_POSITION_STEP = 1.0
+    
+    # Limpieza del maestro: bloqueador de continua (siempre activo) y
+    # paso alto subsónico de 4º orden configurable (Hz, 0 = desactivado)
+    DC_BLOCKER_CUTOFF = 5.0
+    SUBSONIC_FREQUENCY = 20.0
+    
+    # Líneas de retardo (Haas, chorus, eco): retardo máximo del eco y constante
+    # de tiempo con la que los parámetros siguen a sus nuevos valores (segundos)
+    DELAY_MAX_SECONDS = 2.0
+    DELAY_SMOOTHING_TIME = 0.05
+    
+    # Envolvente por defecto al activar/desactivar tonos (segundos y nivel)
+    TONE_ENVELOPE = {'attack': 0.02, 'decay': 0.05, 'sustain': 1.0, 'release': 0.08}
+    
+    # Banco de texturas de ruido pregeneradas (desactivado por defecto)
+    NOISE_TEXTURE_MODE = False
+    NOISE_TEXTURE_SECONDS = 180  # Duración de cada textura
+    NOISE_TEXTURE_CROSSFADE = 0.5  # Fundido del bucle en segundos
+    
+    # Capacidad (segundos) del búfer circular entre el callback y el grabador
+    RECORDING_TAP_SECONDS = 4.0
+    # Cada cuántos segundos se actualiza la cabecera del WAV que se está grabando
+    RECORDING_HEADER_INTERVAL = 2.0
+    
+    # Codificación en segundo plano (procesos y muestras por bloque leído)
+    ENCODING_WORKERS = 2
+    ENCODING_BLOCK_FRAMES = 65536
+    
+    # Profundidades de grabación → subtipo del archivo (nombres de soundfile)
+    RECORDING_BIT_DEPTHS = {
+        '16 bits': 'PCM_16',
+        '24 bits': 'PCM_24',
+        '32 bits': 'PCM_32',
+        '32 bits float': 'FLOAT'
+    }
+    
+    # Configuraciones de calidad de grabación: frecuencia y profundidad reales
     RECORDING_QUALITY = {
-        'Estándar': {'bitrate': 128, 'sample_rate': 44100},
-        'Alta': {'bitrate': 256, 'sample_rate': 48000},
-        'Máxima': {'bitrate': 320, 'sample_rate': 48000}
+        'Estándar': {'sample_rate': 44100, 'bit_depth': '16 bits'},
+        'Alta': {'sample_rate': 48000, 'bit_depth': '24 bits'},
+        'Máxima': {'sample_rate': 96000, 'bit_depth': '32 bits float'}
     }
     
     # Formatos de exportación soportados
-    EXPORT_FORMATS = ['WAV', 'MP3', 'FLAC']
+    EXPORT_FORMATS = ['WAV', 'MP3', 'FLAC', 'OPUS']
 
 class WaveTypes:
     """Tipos de onda disponibles expandidos"""
@@ -40,8 +124,28 @@ class WaveTypes:
     # Tipos tradicionales
     TRADITIONAL_WAVES = ["Seno", "Cuadrada", "Triángulo", "Sierra"]
     
-    # Tipos de ruido
-    NOISE_TYPES = ["Ruido Blanco", "Ruido Rosa", "Ruido Marrón"]
+    # Barrido de frecuencia (chirp) lineal o logarítmico
+    SWEEP_TYPE = "Barrido"
+    SWEEP_MODES = {"Lineal": "linear", "Logarítmico": "log"}
+    
+    # Par binaural: portadora + frecuencia de pulso entre oídos
+    BINAURAL_TYPE = "Binaural"
+    
+    # Tipos de ruido (conformados espectralmente como 1/f^α)
+    NOISE_TYPES = ["Ruido Blanco", "Ruido Rosa", "Ruido Marrón", "Ruido Azul",
+                   "Ruido Violeta", "Ruido Gris", "Ruido 1/f^α"]
+    CUSTOM_NOISE_TYPE = "Ruido 1/f^α"
+    
+    # Nombres internos de los ruidos
+    NOISE_MAPPING = {
+        "ruido blanco": "white_noise",
+        "ruido rosa": "pink_noise",
+        "ruido marrón": "brown_noise",
+        "ruido azul": "blue_noise",
+        "ruido violeta": "violet_noise",
+        "ruido gris": "grey_noise",
+        "ruido 1/f^α": "colored_noise"
+    }
     
     # Mapeo para conversión interna
     WAVE_MAPPING = {
@@ -49,15 +153,16 @@ class WaveTypes:
         "cuadrada": "square",
         "triángulo": "triangle",
         "sierra": "sawtooth",
-        "ruido blanco": "white_noise",
-        "ruido rosa": "pink_noise",
-        "ruido marrón": "brown_noise"
+        "barrido": "sweep",
+        "binaural": "binaural",
+        **NOISE_MAPPING
     }
     
     @staticmethod
     def get_all_types():
         """Retorna todos los tipos de onda disponibles"""
-        return WaveTypes.TRADITIONAL_WAVES + WaveTypes.NOISE_TYPES
+        return (WaveTypes.TRADITIONAL_WAVES + [WaveTypes.SWEEP_TYPE, WaveTypes.BINAURAL_TYPE]
+                + WaveTypes.NOISE_TYPES)
     
     @staticmethod
     def get_traditional_types():
@@ -199,6 +304,7 @@ class FileConstants:
     RECORDINGS_DIR = "recordings"
     PRESETS_DIR = "presets"
     LOGS_DIR = "logs"
+    CACHE_DIR = "cache"
     
     # Extensiones de archivo
     CONFIG_EXTENSION = ".json"
@@ -215,6 +321,11 @@ class FileConstants:
         """Retorna ruta del archivo de configuración principal"""
         return f"{FileConstants.CONFIG_DIR}/{FileConstants.MAIN_CONFIG_FILE}"
     
+    @staticmethod
+    def get_cache_path():
+        """Retorna ruta del directorio de caché (texturas de ruido, etc.)"""
+        return FileConstants.CACHE_DIR
+    
     @staticmethod
     def get_recordings_path():
         """Retorna ruta del directorio de grabaciones"""